@@ -0,0 +1,94 @@
+import json
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.measure import run_scenarios, compare
+from benchmarks.scenarios import SCENARIOS, Fixture, ScenarioError
+
+BASELINE = Path(__file__).resolve().parent.parent.parent / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = 'Run the benchmark scenarios against a freshly seeded test database and compare with the baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000,
+                            help='Number of requests to seed.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--scenario', action='append', dest='scenarios', default=None,
+                            help='Only run the named scenario; may be repeated.')
+        parser.add_argument('--output', default=None,
+                            help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', default=str(BASELINE))
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed relative growth of latency, rows and memory over the baseline.')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Store the results as the new baseline instead of comparing.')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive')
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - {scenario.name for scenario in SCENARIOS}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}.")
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in options['scenarios']]
+
+        results = {
+            'dataset': {'requests': options['requests'], 'seed': options['seed']},
+            'iterations': options['iterations'],
+            'vendor': connection.vendor,
+            'scenarios': self.run(scenarios, options),
+        }
+
+        for name, metrics in results['scenarios'].items():
+            self.stdout.write(
+                f"{name:<26} p50 {metrics['p50_ms']:>9.2f} ms  p99 {metrics['p99_ms']:>9.2f} ms  "
+                f"{metrics['queries']:>3} queries  {metrics['rows']:>6} rows  {metrics['peak_kib']:>9.1f} KiB"
+            )
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            if options['scenarios'] and baseline_path.exists():
+                # A partial run only replaces the scenarios it measured.
+                results['scenarios'] = {**json.loads(baseline_path.read_text())['scenarios'], **results['scenarios']}
+            baseline_path.write_text(json.dumps(results, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}.'))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}, nothing to compare.'))
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        if baseline['dataset'] != results['dataset']:
+            self.stdout.write(self.style.WARNING('The baseline was recorded on a different dataset.'))
+        regressions = compare(results['scenarios'], baseline['scenarios'], options['threshold'])
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def run(self, scenarios, options):
+        # Scenarios write to the database, so they run against a throwaway test
+        # database rather than whatever the settings point at.
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=not options['interactive'], serialize=False)
+        try:
+            call_command(
+                'seed_helpdesk', requests=options['requests'], seed=options['seed'], end='2024-01-01',
+                stdout=StringIO(),
+            )
+            return run_scenarios(scenarios, Fixture(), options['iterations'])
+        except ScenarioError as e:
+            raise CommandError(str(e))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,110 @@
+import math
+import time
+import tracemalloc
+
+from django.db import connection
+
+# Latency differences below this are noise on any machine and never count as regressions.
+LATENCY_FLOOR_MS = 1.0
+
+
+class QueryRecorder:
+    """
+    Execute wrapper counting the queries issued and the rows fetched back.
+
+    Rows are counted by shadowing the fetch methods on each cursor, so it
+    covers everything the ORM reads, including chunked iteration.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        cursor = context['cursor']
+        if 'fetchmany' not in vars(cursor):
+            cursor.fetchone = self.counting(cursor.fetchone, single=True)
+            cursor.fetchmany = self.counting(cursor.fetchmany)
+            cursor.fetchall = self.counting(cursor.fetchall)
+        return execute(sql, params, many, context)
+
+    def counting(self, fetch, single=False):
+        def wrapper(*args, **kwargs):
+            result = fetch(*args, **kwargs)
+            if single:
+                self.rows += result is not None
+            else:
+                self.rows += len(result)
+            return result
+        return wrapper
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def run_scenario(scenario, fixture, iterations):
+    fixture.reset()
+    # One untimed request first, so URL resolution, template loading and
+    # cold caches are not part of the numbers.
+    scenario.check(scenario.prepare(fixture)())
+
+    timings, queries, rows = [], [], []
+    for _ in range(iterations):
+        send = scenario.prepare(fixture)
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            started = time.perf_counter()
+            response = send()
+            timings.append((time.perf_counter() - started) * 1000)
+        scenario.check(response)
+        queries.append(recorder.queries)
+        rows.append(recorder.rows)
+
+    # Tracing allocations slows everything down, so memory gets its own pass.
+    send = scenario.prepare(fixture)
+    tracemalloc.start()
+    try:
+        send()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'queries': max(queries),
+        'rows': max(rows),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_scenarios(scenarios, fixture, iterations):
+    return {scenario.name: run_scenario(scenario, fixture, iterations) for scenario in scenarios}
+
+
+def compare(results, baseline, threshold):
+    """
+    Return a description of every metric in `results` worse than `baseline`.
+
+    Query counts are deterministic, so any increase is reported; the other
+    metrics may grow by `threshold` (a fraction) before they are.
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        measured = results.get(name)
+        if measured is None:
+            continue
+        for metric, limit in expected.items():
+            value = measured[metric]
+            if metric == 'queries':
+                allowed = limit
+            else:
+                allowed = limit * (1 + threshold)
+                if metric.endswith('_ms'):
+                    allowed = max(allowed, limit + LATENCY_FLOOR_MS)
+            if value > allowed:
+                regressions.append(f"{name}: {metric} {value} > {limit} (allowed {round(allowed, 3)})")
+    return regressions
@@ -0,0 +1,183 @@
+from functools import partial
+
+from django.test import Client
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from help_request import response_cache
+from help_request.models import HelpRequest, DeclinedRequest, StatusChoices, PriorityChoices
+from user_app.models import MyUser
+
+PASSWORD = 'password'
+
+
+class ScenarioError(Exception):
+    pass
+
+
+class Fixture:
+    """
+    Users, clients and target requests picked from a seeded database.
+
+    Clients are created per scenario, so every scenario starts with a fresh
+    token that cannot expire for inactivity half way through.
+    """
+
+    def __init__(self):
+        self.user = MyUser.objects.filter(is_superuser=False).order_by('id').first()
+        self.admin = MyUser.objects.filter(is_superuser=True).order_by('id').first()
+        if self.user is None or self.admin is None:
+            raise ScenarioError('The database needs at least one regular user and one admin.')
+        for user in (self.user, self.admin):
+            user.set_password(PASSWORD)
+            user.save(update_fields=['password'])
+
+        own = HelpRequest.objects.filter(requester=self.user)
+        self.own_request = self.first_or_create(own)
+        self.thread = own.order_by('-comment_count', 'id').first()
+        self.in_process = self.first_or_create(own.filter(status=StatusChoices.IN_PROCESS), StatusChoices.IN_PROCESS)
+        self.clients = {}
+
+    def first_or_create(self, queryset, status=StatusChoices.ACTIVE):
+        return queryset.order_by('id').first() or self.create_request(status)
+
+    def create_request(self, status):
+        help_request = HelpRequest.objects.create(
+            subject='benchmark',
+            text='benchmark',
+            priority=PriorityChoices.MEDIUM,
+            requester=self.user,
+            status=status,
+        )
+        if status == StatusChoices.DECLINED:
+            DeclinedRequest.objects.create(declined_request=help_request, comment='benchmark')
+        return help_request
+
+    def reset(self):
+        Token.objects.filter(user__in=[self.user, self.admin]).delete()
+        self.clients = {}
+
+    def invalidate_responses(self):
+        response_cache.bump_for_requesters([self.user.pk, self.admin.pk])
+
+    def client(self, actor, auth):
+        if (actor, auth) not in self.clients:
+            user = getattr(self, actor) if actor else None
+            if auth == 'token':
+                client = Client(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+            else:
+                client = Client()
+                if user is not None:
+                    client.force_login(user)
+            self.clients[actor, auth] = client
+        return self.clients[actor, auth]
+
+
+class Scenario:
+    def __init__(self, name, url_name, method='get', actor='user', auth='token', target=None, query='',
+                 data=None, expected_status=200):
+        self.name = name
+        self.url_name = url_name
+        self.method = method
+        self.actor = actor
+        self.auth = auth
+        # Called before every iteration, outside the timed section, with the
+        # fixture; returns the request the URL points at.
+        self.target = target
+        self.query = query
+        self.data = data
+        self.expected_status = expected_status
+
+    def __repr__(self):
+        return f'<Scenario {self.name}>'
+
+    def prepare(self, fixture):
+        # Every iteration misses the response cache, so the numbers are those
+        # of the queries behind a response rather than of a cache lookup.
+        fixture.invalidate_responses()
+        kwargs = {'pk': self.target(fixture).pk} if self.target else {}
+        path = reverse(self.url_name, kwargs=kwargs) + self.query
+        client = fixture.client(self.actor, self.auth)
+        if self.method == 'get':
+            return partial(client.get, path)
+        data = self.data(fixture) if callable(self.data) else self.data
+        if self.auth == 'token':
+            return partial(client.post, path, data, content_type='application/json')
+        return partial(client.post, path, data)
+
+    def check(self, response):
+        if response.status_code != self.expected_status:
+            raise ScenarioError(
+                f'{self.name}: expected status {self.expected_status}, got {response.status_code}.'
+            )
+
+
+def fresh(status):
+    return lambda fixture: fixture.create_request(status)
+
+
+SCENARIOS = [
+    # REST lists and details.
+    Scenario('rest_list_user', 'requests:helprequest-list'),
+    Scenario('rest_list_admin', 'requests:helprequest-list', actor='admin'),
+    Scenario('rest_list_filtered', 'requests:helprequest-list', actor='admin',
+             query=f'?status_type={StatusChoices.ACTIVE}&priority_type={PriorityChoices.HIGH}'),
+    Scenario('rest_list_activity', 'requests:helprequest-list', actor='admin',
+             query='?ordering=-last_activity_at&min_comments=1'),
+    Scenario('rest_active', 'requests:rest_active', actor='admin'),
+    Scenario('rest_for_restoration', 'requests:rest_for_restoration', actor='admin'),
+    Scenario('rest_detail', 'requests:helprequest-detail', target=lambda fixture: fixture.own_request),
+
+    # Comments.
+    Scenario('rest_comment_list', 'requests:create_comment', target=lambda fixture: fixture.thread),
+    Scenario('rest_comment_post', 'requests:create_comment', method='post',
+             target=lambda fixture: fixture.in_process, data={'message': 'benchmark'}, expected_status=201),
+    Scenario('rest_bulk_comments', 'requests:rest_bulk_comments', method='post',
+             data=lambda fixture: {'comments': [
+                 {'help_request': fixture.in_process.pk, 'message': f'benchmark {index}'} for index in range(100)
+             ]}),
+
+    # Status transitions, each on a request freshly put into its source status.
+    Scenario('rest_approve', 'requests:rest_approve', actor='admin', target=fresh(StatusChoices.ACTIVE)),
+    Scenario('rest_decline', 'requests:rest_decline', method='post', actor='admin',
+             target=fresh(StatusChoices.ACTIVE), data={'comment': 'benchmark'}, expected_status=201),
+    Scenario('rest_start_processing', 'requests:rest_init_processing', actor='admin',
+             target=fresh(StatusChoices.APPROVED)),
+    Scenario('rest_complete_processing', 'requests:rest_complete_processing', actor='admin',
+             target=fresh(StatusChoices.IN_PROCESS)),
+    Scenario('rest_resend_review', 'requests:rest_resend_review', target=fresh(StatusChoices.DECLINED)),
+
+    # Review queue: every iteration claims the next free request.
+    Scenario('rest_claim_next', 'requests:rest_claim_next', method='post', actor='admin', expected_status=201),
+
+    # Full-text search, a common word so the ranking covers many matches.
+    Scenario('rest_search', 'requests:helprequest-search', actor='admin', query='?q=printer'),
+    Scenario('rest_search_user', 'requests:helprequest-search', query='?q=printer'),
+
+    # Status history: a request's timeline and a month of approval medians.
+    Scenario('rest_request_history', 'requests:rest_request_history', target=lambda fixture: fixture.thread),
+    Scenario('rest_transition_stats', 'requests:rest_transition_stats', actor='admin',
+             query=f'?from_status={StatusChoices.ACTIVE}&to_status={StatusChoices.APPROVED}'),
+
+    # Precomputed request counts for the landing pages.
+    Scenario('rest_dashboard_user', 'requests:rest_dashboard'),
+    Scenario('rest_dashboard_admin', 'requests:rest_dashboard', actor='admin'),
+    Scenario('html_main', 'main_view', actor='admin', auth='session'),
+
+    # Changes feed, one full batch from the start.
+    Scenario('rest_changes', 'requests:rest_changes', actor='admin'),
+
+    # Token authentication.
+    Scenario('token_obtain', 'api_token_auth', method='post', actor=None, auth=None,
+             data=lambda fixture: {'username': fixture.user.username, 'password': PASSWORD}),
+
+    # HTML views.
+    Scenario('html_list_user', 'requests:users_request_list_view', auth='session'),
+    Scenario('html_all_requests', 'requests:all_request_view', actor='admin', auth='session'),
+    Scenario('html_board_column', 'requests:all_request_view', actor='admin', auth='session',
+             query=f'?column={PriorityChoices.LOW}'),
+    Scenario('html_to_check', 'requests:request_to_check_view', actor='admin', auth='session'),
+    Scenario('html_detail', 'requests:request_detail_view', auth='session', target=lambda fixture: fixture.thread),
+    Scenario('html_comment_post', 'requests:request_detail_view', method='post', auth='session',
+             target=lambda fixture: fixture.in_process, data={'comment': 'benchmark'}, expected_status=302),
+]
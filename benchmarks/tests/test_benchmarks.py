@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from benchmarks.measure import QueryRecorder, compare, percentile, run_scenarios
+from benchmarks.scenarios import SCENARIOS, Fixture
+from help_request.models import HelpRequest
+
+
+class MeasureTest(TestCase):
+    def test_query_recorder_counts_queries_and_rows(self):
+        call_command('seed_helpdesk', users=2, admins=1, requests=30, end='2024-01-01', stdout=StringIO())
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(HelpRequest.objects.all()[:10])
+            HelpRequest.objects.count()
+        self.assertEqual(recorder.queries, 2)
+        self.assertEqual(recorder.rows, 11)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare(self):
+        baseline = {'list': {'p50_ms': 10.0, 'p99_ms': 20.0, 'queries': 2, 'rows': 50, 'peak_kib': 100.0}}
+        within = {'list': {'p50_ms': 12.0, 'p99_ms': 24.0, 'queries': 2, 'rows': 60, 'peak_kib': 120.0}}
+        self.assertEqual(compare(within, baseline, threshold=0.25), [])
+
+        worse = {'list': {'p50_ms': 14.0, 'p99_ms': 20.0, 'queries': 3, 'rows': 50, 'peak_kib': 100.0}}
+        regressions = compare(worse, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('list: p50_ms'))
+        self.assertTrue(regressions[1].startswith('list: queries'))
+
+    def test_latency_floor(self):
+        baseline = {'detail': {'p50_ms': 0.5}}
+        self.assertEqual(compare({'detail': {'p50_ms': 1.2}}, baseline, threshold=0.25), [])
+
+
+class ScenariosTest(TestCase):
+    def test_every_scenario_runs(self):
+        call_command('seed_helpdesk', users=3, admins=1, requests=60, end='2024-01-01', stdout=StringIO())
+        results = run_scenarios(SCENARIOS, Fixture(), iterations=2)
+        self.assertEqual(list(results), [scenario.name for scenario in SCENARIOS])
+        for metrics in results.values():
+            self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+            self.assertGreater(metrics['queries'], 0)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_alter_comment_author_alter_comment_help_request'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['help_request', 'created_at', 'id'], name='comment_request_created_idx'),
+        ),
+    ]
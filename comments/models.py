@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from user_app.models import MyUser
 from help_request.models import HelpRequest
 from django.utils import timezone
@@ -10,5 +10,16 @@ class Comment(models.Model):
     help_request = models.ForeignKey(HelpRequest, on_delete=models.CASCADE, related_name='comments')
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['help_request', 'created_at', 'id'], name='comment_request_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The request's comment counters are updated by a post_save receiver
+        # and must commit together with the comment.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"comment -- {self.author} -- {self.help_request.subject}"
@@ -3,8 +3,13 @@ from .models import Comment
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    author = serializers.CharField(read_only=True)
+    author = serializers.CharField(source='author.username', read_only=True)
 
     class Meta:
         model = Comment
-        fields = ['message', 'author']
+        fields = ['id', 'message', 'author', 'created_at']
+        read_only_fields = ['created_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('author')
@@ -26,7 +26,9 @@ class CommentSerializerTest(TestCase):
     def test_comment_serializer(self):
         serializer = CommentSerializer(instance=self.comment)
         expected_data = {
+            'id': self.comment.pk,
             'message': 'Test Comment',
             'author': 'testUser',
+            'created_at': serializer.fields['created_at'].to_representation(self.comment.created_at),
         }
         self.assertEqual(serializer.data, expected_data)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import HelpRequest, DeclinedRequest
+from .models import HelpRequest, DeclinedRequest, RequestClaim
 
 admin.site.register(HelpRequest)
-admin.site.register(DeclinedRequest)
\ No newline at end of file
+admin.site.register(DeclinedRequest)
+admin.site.register(RequestClaim)
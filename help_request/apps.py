@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class HelpRequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'help_request'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals
+        post_migrate.connect(signals.reinstall_search, sender=self)
@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.utils import timezone
+
+from comments.models import Comment
+from .models import HelpRequest, StatusChoices
+from .signals import comments_created
+from .transitions import Outcome
+
+BULK_CHUNK_SIZE = 1000
+
+
+def create_bulk(items, user):
+    """
+    Add comments by `user`, `(request pk, message)` pairs, in one transaction
+    and return `(outcome, comment)` per item, with `comment` None unless done.
+
+    Requests are checked set-wise per chunk: the open ones the user may
+    comment on are locked with one SELECT, the others are explained with a
+    second, and all the comments are inserted with bulk_create.
+    """
+    pks = list(dict.fromkeys(pk for pk, _ in items))
+    outcomes = {}
+    requesters = {}
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(pks), BULK_CHUNK_SIZE):
+            chunk = pks[start:start + BULK_CHUNK_SIZE]
+            visible = HelpRequest.objects.filter(pk__in=chunk)
+            if not user.is_superuser:
+                visible = visible.filter(requester=user)
+            requesters.update(
+                visible.filter(status=StatusChoices.IN_PROCESS).select_for_update().values_list('pk', 'requester_id')
+            )
+            outcomes.update(dict.fromkeys(chunk, Outcome.NOT_FOUND))
+            outcomes.update(dict.fromkeys((pk for pk in chunk if pk in requesters), Outcome.DONE))
+            rest = [pk for pk in chunk if pk not in requesters]
+            for pk, requester_id in HelpRequest.objects.filter(pk__in=rest).values_list('pk', 'requester_id'):
+                outcomes[pk] = Outcome.CONFLICT if user.is_superuser or requester_id == user.pk else Outcome.FORBIDDEN
+
+        comments = Comment.objects.bulk_create([
+            Comment(message=message, author=user, help_request_id=pk, created_at=now)
+            for pk, message in items if outcomes[pk] == Outcome.DONE
+        ], batch_size=BULK_CHUNK_SIZE)
+        if comments:
+            comments_created.send(sender=Comment, comments=comments, requesters=requesters)
+
+    created = iter(comments)
+    return [
+        (outcomes[pk], next(created) if outcomes[pk] == Outcome.DONE else None)
+        for pk, _ in items
+    ]
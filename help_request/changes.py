@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from comments.models import Comment
+from .models import HelpRequest, ChangeEvent, ChangeEntityChoices, ChangeOperationChoices
+
+
+def record_request(help_request, operation):
+    ChangeEvent.objects.create(
+        entity=ChangeEntityChoices.REQUEST,
+        object_id=help_request.pk,
+        request_id=help_request.pk,
+        requester_id=help_request.requester_id,
+        operation=operation,
+        status=help_request.status,
+    )
+
+
+def record_comment(comment, requester_id, operation):
+    ChangeEvent.objects.create(
+        entity=ChangeEntityChoices.COMMENT,
+        object_id=comment.pk,
+        request_id=comment.help_request_id,
+        requester_id=requester_id,
+        operation=operation,
+    )
+
+
+def record_comments(rows):
+    now = timezone.now()
+    ChangeEvent.objects.bulk_create([
+        ChangeEvent(
+            entity=ChangeEntityChoices.COMMENT,
+            object_id=comment.pk,
+            request_id=comment.help_request_id,
+            requester_id=requester_id,
+            operation=ChangeOperationChoices.CREATED,
+            created_at=now,
+        )
+        for comment, requester_id in rows
+    ])
+
+
+def record_transition(rows, status):
+    now = timezone.now()
+    ChangeEvent.objects.bulk_create([
+        ChangeEvent(
+            entity=ChangeEntityChoices.REQUEST,
+            object_id=pk,
+            request_id=pk,
+            requester_id=requester_id,
+            operation=ChangeOperationChoices.UPDATED,
+            status=status,
+            created_at=now,
+        )
+        for pk, requester_id in rows
+    ])
+
+
+def visible_events(user):
+    events = ChangeEvent.objects.all()
+    if not user.is_superuser:
+        events = events.filter(requester_id=user.pk)
+    return events
+
+
+def settle_cutoff():
+    return timezone.now() - timedelta(seconds=settings.CHANGES_FEED_SETTLE_SECONDS)
+
+
+def settled_after(events, since, limit):
+    """
+    Return `(events, has_more)` for the first `limit` of `events` after cursor `since`.
+
+    Ids are handed out at insert time but become visible at commit, so a
+    slower transaction can still add an id below one already served. Events
+    younger than CHANGES_FEED_SETTLE_SECONDS are held back to leave room for
+    those commits; a transaction that takes longer to commit can still land
+    behind the cursor.
+    """
+    settled = settle_cutoff()
+    return _hold_back(list(events.filter(id__gt=since).order_by('id')[:limit + 1]), settled, limit)
+
+
+async def asettled_after(events, since, limit):
+    settled = settle_cutoff()
+    return _hold_back([event async for event in events.filter(id__gt=since).order_by('id')[:limit + 1]], settled, limit)
+
+
+def _hold_back(events, settled, limit):
+    for index, event in enumerate(events):
+        if event.created_at > settled:
+            return events[:index], False
+    return events[:limit], len(events) > limit
+
+
+def changes_since(user, since, limit):
+    return settled_after(visible_events(user), since, limit)
+
+
+async def achanges_since(user, since, limit):
+    return await asettled_after(visible_events(user), since, limit)
+
+
+def latest_per_object(events):
+    # A mirror only needs the newest event of every object in a batch.
+    latest = {(event.entity, event.object_id): event for event in events}
+    return sorted(latest.values(), key=lambda event: event.id)
+
+
+def _live_objects(events):
+    # Querysets for the objects that events other than deletes refer to, by entity.
+    ids = {ChangeEntityChoices.REQUEST: set(), ChangeEntityChoices.COMMENT: set()}
+    for event in events:
+        if event.operation != ChangeOperationChoices.DELETED:
+            ids[event.entity].add(event.object_id)
+    querysets = [
+        (ChangeEntityChoices.REQUEST, HelpRequest.objects.select_related('requester')),
+        (ChangeEntityChoices.COMMENT, Comment.objects.select_related('author')),
+    ]
+    return [(entity, queryset, ids[entity]) for entity, queryset in querysets if ids[entity]]
+
+
+def current_objects(events):
+    """Load the current state of every object the events refer to, with two queries at most."""
+    objects = {}
+    for entity, queryset, ids in _live_objects(events):
+        objects.update(((entity, pk), obj) for pk, obj in queryset.in_bulk(ids).items())
+    return objects
+
+
+async def acurrent_objects(events):
+    objects = {}
+    for entity, queryset, ids in _live_objects(events):
+        objects.update(((entity, pk), obj) for pk, obj in (await queryset.ain_bulk(ids)).items())
+    return objects
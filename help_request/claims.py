@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import HelpRequest, RequestClaim, StatusChoices, PriorityChoices
+
+QUEUE_STATUSES = [StatusChoices.ACTIVE, StatusChoices.FOR_RESTORATION]
+
+# Highest priority first; each one is drained oldest first.
+QUEUE_PRIORITIES = [PriorityChoices.HIGH, PriorityChoices.MEDIUM, PriorityChoices.LOW]
+
+
+def lease_end(now):
+    return now + timedelta(seconds=settings.CLAIM_LEASE_SECONDS)
+
+
+def queue(admin, now):
+    """Requests waiting for review that `admin` may take: not their own and not under a live claim."""
+    return (
+        HelpRequest.objects.filter(status__in=QUEUE_STATUSES)
+        .exclude(requester=admin)
+        .filter(Q(claim__isnull=True) | Q(claim__expires_at__lte=now))
+    )
+
+
+def claim_next(admin):
+    """
+    Claim the next request of the review queue for `admin` and return the claim, or None.
+
+    Candidates are locked with FOR UPDATE SKIP LOCKED, so concurrent callers
+    never wait on each other: each skips the rows another is claiming and
+    takes the next one.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        for priority in QUEUE_PRIORITIES:
+            while True:
+                candidate = (
+                    queue(admin, now).filter(priority=priority).order_by('created_at', 'id')
+                    .annotate(claim_expires_at=F('claim__expires_at')).select_related('requester')
+                    .select_for_update(skip_locked=True, of=('self',)).first()
+                )
+                if candidate is None:
+                    break
+                claim = take(candidate, admin, now)
+                if claim is not None:
+                    return claim
+    return None
+
+
+def take(help_request, admin, now):
+    # A caller that committed its claim after our snapshot was taken no longer
+    # holds the row lock, so the write itself has to be conditional.
+    claim = RequestClaim(help_request=help_request, admin=admin, expires_at=lease_end(now))
+    if help_request.claim_expires_at is None:
+        try:
+            with transaction.atomic():
+                claim.save(force_insert=True)
+        except IntegrityError:
+            return None
+    elif not RequestClaim.objects.filter(help_request=help_request, expires_at__lte=now).update(
+            admin=admin, expires_at=claim.expires_at):
+        return None
+    return claim
+
+
+def renew(pk, admin):
+    """Extend `admin`'s live claim on request `pk`; returns the new expiry, or None if they hold none."""
+    now = timezone.now()
+    expires_at = lease_end(now)
+    renewed = RequestClaim.objects.filter(help_request_id=pk, admin=admin, expires_at__gt=now).update(
+        expires_at=expires_at,
+    )
+    return expires_at if renewed else None
+
+
+def release(pk, admin):
+    """Give up `admin`'s claim on request `pk`; returns whether they held one."""
+    deleted, _ = RequestClaim.objects.filter(help_request_id=pk, admin=admin).delete()
+    return bool(deleted)
@@ -0,0 +1,32 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+
+class Validators:
+    """ETag and Last-Modified of a resource, derived from a few cheap values."""
+
+    def __init__(self, *parts, last_modified=None):
+        digest = hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()
+        self.etag = quote_etag(digest[:32])
+        self.last_modified = last_modified
+
+    def __repr__(self):
+        return f'<Validators {self.etag} {self.last_modified}>'
+
+    def timestamp(self):
+        return int(self.last_modified.timestamp()) if self.last_modified else None
+
+    def precondition_response(self, request):
+        # 304 for a matching If-None-Match / If-Modified-Since on safe methods,
+        # 412 for a failed If-Match / If-Unmodified-Since on the others.
+        return get_conditional_response(request, etag=self.etag, last_modified=self.timestamp())
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified:
+            response['Last-Modified'] = http_date(self.timestamp())
+        # Payloads depend on who asks.
+        patch_vary_headers(response, ['Authorization', 'Cookie'])
+        return response
@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from comments.models import Comment
+from .models import HelpRequest
+
+
+def actual_counters():
+    """`comment_count` and `last_activity_at` as the comments say they should be, for annotate() or update()."""
+    thread = Comment.objects.filter(help_request=OuterRef('pk')).order_by()
+    count = thread.values('help_request').annotate(count=Count('id')).values('count')
+    newest = thread.order_by('-created_at').values('created_at')[:1]
+    return {
+        'comment_count': Coalesce(Subquery(count), 0),
+        'last_activity_at': Greatest('created_at', Coalesce(Subquery(newest), 'created_at')),
+    }
+
+
+def comment_added(comment):
+    HelpRequest.objects.filter(pk=comment.help_request_id).update(
+        comment_count=F('comment_count') + 1,
+        last_activity_at=Greatest('last_activity_at', Value(comment.created_at)),
+    )
+
+
+def comments_added(counts, created_at):
+    """Count comments all created at `created_at`; `counts` maps request pks to how many each got."""
+    by_count = defaultdict(list)
+    for pk, count in counts.items():
+        by_count[count].append(pk)
+    # One UPDATE per distinct number of new comments, usually just one.
+    for count, pks in by_count.items():
+        HelpRequest.objects.filter(pk__in=pks).update(
+            comment_count=F('comment_count') + count,
+            last_activity_at=Greatest('last_activity_at', Value(created_at)),
+        )
+
+
+def comment_removed(comment):
+    # The newest remaining comment decides, so run after the row is gone.
+    counters = actual_counters()
+    HelpRequest.objects.filter(pk=comment.help_request_id).update(
+        comment_count=F('comment_count') - 1,
+        last_activity_at=counters['last_activity_at'],
+    )
+
+
+def stale(queryset):
+    counters = actual_counters()
+    return queryset.annotate(
+        actual_count=counters['comment_count'], actual_last_activity=counters['last_activity_at'],
+    ).exclude(comment_count=F('actual_count'), last_activity_at=F('actual_last_activity'))
+
+
+def repair(queryset, batch_size=1000):
+    """
+    Recompute the counters of `queryset` in primary key batches and return how many rows were wrong.
+
+    Each batch reads the stale ids with one query and rewrites only those rows.
+    """
+    repaired = 0
+    last_pk = 0
+    while True:
+        pks = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return repaired
+        last_pk = pks[-1]
+        stale_pks = list(stale(HelpRequest.objects.filter(pk__in=pks)).values_list('pk', flat=True))
+        if stale_pks:
+            repaired += HelpRequest.objects.filter(pk__in=stale_pks).update(**actual_counters())
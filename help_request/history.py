@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import datetime, time
+from statistics import median
+
+from django.db import connections
+from django.db.models import Aggregate, Count, DurationField, OuterRef, Subquery
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import StatusTransition
+
+
+class Median(Aggregate):
+    # PostgreSQL only; other databases get the median computed in Python.
+    function = 'percentile_cont'
+    template = '%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = DurationField()
+
+
+def with_last_transition(queryset):
+    """Annotate requests with `last_status` and `last_changed_at` of their newest logged transition."""
+    last = StatusTransition.objects.filter(request_id=OuterRef('pk')).order_by('-id')
+    return queryset.annotate(
+        last_status=Subquery(last.values('to_status')[:1]),
+        last_changed_at=Subquery(last.values('created_at')[:1]),
+    )
+
+
+def record_transitions(requests, transition, actor_id=None, comments=None):
+    """
+    Log `transition` of `requests`, dicts read through with_last_transition
+    with the `status` they had before the change, with how long each spent
+    in that status, and return the new rows.
+
+    Requests whose log does not end in that status, because they changed
+    before the log existed or by other means than a transition, are taken
+    to have been in it since their creation.
+    """
+    now = timezone.now()
+    comments = comments or {}
+    rows = []
+    for request in requests:
+        from_status, entered_at = request['status'], request['last_changed_at']
+        if request['last_status'] != from_status:
+            entered_at = request['created_at']
+        rows.append(StatusTransition(
+            request_id=request['pk'],
+            priority=request['priority'],
+            from_status=from_status,
+            to_status=transition.target,
+            actor_id=actor_id,
+            duration=now - entered_at,
+            comment=comments.get(request['pk'], ''),
+            created_at=now,
+        ))
+    return StatusTransition.objects.bulk_create(rows)
+
+
+def timeline(request_id):
+    return StatusTransition.objects.filter(request_id=request_id)
+
+
+def start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def transition_stats(from_status, to_status, since, until, priority=None):
+    """
+    Count and median duration of `from_status` -> `to_status` transitions
+    per day and priority, for the days in [since, until).
+
+    Only the index range of that kind of transition and those days is read.
+    """
+    # Compared as datetimes rather than dates, so the range stays on the index.
+    transitions = StatusTransition.objects.filter(
+        from_status=from_status, to_status=to_status, created_at__gte=start_of(since), created_at__lt=start_of(until),
+    )
+    if priority:
+        transitions = transitions.filter(priority=priority)
+    transitions = transitions.annotate(day=TruncDate('created_at')).order_by('day', 'priority')
+
+    if connections[transitions.db].vendor == 'postgresql':
+        rows = transitions.values('day', 'priority').annotate(count=Count('*'), median=Median('duration'))
+        return [
+            {'day': row['day'], 'priority': row['priority'], 'count': row['count'],
+             'median_seconds': row['median'].total_seconds()}
+            for row in rows
+        ]
+
+    durations = defaultdict(list)
+    for day, priority, duration in transitions.values_list('day', 'priority', 'duration'):
+        durations[day, priority].append(duration.total_seconds())
+    return [
+        {'day': day, 'priority': priority, 'count': len(seconds), 'median_seconds': median(seconds)}
+        for (day, priority), seconds in durations.items()
+    ]
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from help_request import export
+from help_request.models import StatusChoices
+
+
+class Command(BaseCommand):
+    help = 'Export requests with their comments as NDJSON or CSV, streamed so memory stays flat.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(export.FORMATS), default='ndjson')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--status', choices=[value for value, _ in StatusChoices.CHOICES])
+        parser.add_argument('--since', type=parse_date, help='First day of creation to export, YYYY-MM-DD.')
+        parser.add_argument('--until', type=parse_date, help='Day of creation to stop before, YYYY-MM-DD.')
+        parser.add_argument('--output', help='File to write; standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        requests = export.requests_to_export(options['since'], options['until'], options['status'])
+        chunks = export.stream(requests, options['type'], options['gzip'], options['chunk_size'])
+        started = time.monotonic()
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                written = self.write(chunks, output)
+        elif hasattr(self.stdout._out, 'buffer'):
+            written = self.write(chunks, self.stdout._out.buffer)
+        elif options['gzip']:
+            raise CommandError('Compressed output needs --output or a binary standard output.')
+        else:
+            written = self.write((chunk.decode() for chunk in chunks), self.stdout._out)
+        elapsed = time.monotonic() - started
+        self.stderr.write(f'Exported {written} bytes in {elapsed:.1f}s.')
+
+    def write(self, chunks, output):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        return written
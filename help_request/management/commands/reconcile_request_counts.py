@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from help_request.models import HelpRequest, RequestCount
+from help_request.rollups import actual_counts, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount requests by status and priority and correct the precomputed dashboard counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the stored counts that are wrong.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            actual = actual_counts(HelpRequest.objects.all())
+            stored = {
+                (row.scope, row.status, row.priority): row.count for row in RequestCount.objects.filter(count__gt=0)
+            }
+            wrong = sum(1 for key in actual.keys() | stored.keys() if actual[key] != stored.get(key, 0))
+            self.stdout.write(f'{wrong} request counts are wrong.')
+            return
+        corrected = reconcile(HelpRequest.objects.all())
+        self.stdout.write(f'Corrected {corrected} request counts.')
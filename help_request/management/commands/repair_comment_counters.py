@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from help_request.counters import repair, stale
+from help_request.models import HelpRequest
+
+
+class Command(BaseCommand):
+    help = 'Recompute comment_count and last_activity_at of requests from their comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the requests whose counters are wrong.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = stale(HelpRequest.objects.all()).count()
+            self.stdout.write(f'{count} requests have wrong comment counters.')
+            return
+        repaired = repair(HelpRequest.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(f'Repaired comment counters of {repaired} requests.')
@@ -0,0 +1,291 @@
+import random
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from comments.models import Comment
+from help_request import rollups
+from help_request.models import (
+    HelpRequest, DeclinedRequest, ChangeEvent, StatusTransition, StatusChoices, PriorityChoices, ChangeEntityChoices,
+    ChangeOperationChoices,
+)
+from user_app.models import MyUser
+
+DEFAULT_STATUS_WEIGHTS = {
+    StatusChoices.ACTIVE: 15,
+    StatusChoices.DECLINED: 10,
+    StatusChoices.FOR_RESTORATION: 5,
+    StatusChoices.APPROVED: 15,
+    StatusChoices.IN_PROCESS: 20,
+    StatusChoices.COMPLETED: 35,
+}
+
+DEFAULT_PRIORITY_WEIGHTS = {
+    PriorityChoices.LOW: 50,
+    PriorityChoices.MEDIUM: 35,
+    PriorityChoices.HIGH: 15,
+}
+
+# The statuses every request went through to reach its seeded status.
+STATUS_PATHS = {
+    StatusChoices.ACTIVE: [StatusChoices.ACTIVE],
+    StatusChoices.DECLINED: [StatusChoices.ACTIVE, StatusChoices.DECLINED],
+    StatusChoices.FOR_RESTORATION: [StatusChoices.ACTIVE, StatusChoices.DECLINED, StatusChoices.FOR_RESTORATION],
+    StatusChoices.APPROVED: [StatusChoices.ACTIVE, StatusChoices.APPROVED],
+    StatusChoices.IN_PROCESS: [StatusChoices.ACTIVE, StatusChoices.APPROVED, StatusChoices.IN_PROCESS],
+    StatusChoices.COMPLETED: [
+        StatusChoices.ACTIVE, StatusChoices.APPROVED, StatusChoices.IN_PROCESS, StatusChoices.COMPLETED,
+    ],
+}
+
+# Statuses that accept comments, so only these get threads.
+COMMENTED_STATUSES = {StatusChoices.IN_PROCESS, StatusChoices.COMPLETED}
+
+TEXT_POOL_SIZE = 5000
+
+WORDS = (
+    "printer network laptop password account email access vpn screen keyboard "
+    "update install error crash slow login server backup license phone monitor "
+    "cannot broken need help please urgent again after since today new old"
+).split()
+
+
+REQUEST_FIELDS = [
+    'id', 'subject', 'text', 'requester', 'priority', 'status', 'created_at', 'updated_at', 'comment_count',
+    'last_activity_at',
+]
+DECLINED_FIELDS = ['declined_request', 'comment']
+COMMENT_FIELDS = ['id', 'message', 'author', 'help_request', 'created_at']
+EVENT_FIELDS = ['entity', 'object_id', 'request_id', 'requester_id', 'operation', 'status', 'created_at']
+TRANSITION_FIELDS = [
+    'request_id', 'priority', 'from_status', 'to_status', 'actor_id', 'duration', 'comment', 'created_at',
+]
+
+
+def insert_rows(model, fields, rows):
+    # Multi-row INSERTs of prepared tuples; building model instances and letting
+    # bulk_create compile them costs several times more than the inserts.
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    max_params = connection.features.max_query_params or 65535
+    chunk_size = min(1000, max_params // len(fields))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            sql = f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES {", ".join([placeholder] * len(chunk))}'
+            cursor.execute(sql, [value for row in chunk for value in row])
+
+
+def parse_weights(value, choices):
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in choices:
+            raise CommandError(f"Unknown choice '{name}', expected one of: {', '.join(choices)}.")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for '{name}': '{weight}'.")
+    return weights
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create a deterministic synthetic dataset of users, requests, decline reasons and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--admins', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=10000)
+        parser.add_argument('--comments', type=float, default=3,
+                            help='Average number of comments on In process and Completed requests.')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread request creation over this many days before --end.')
+        parser.add_argument('--end', default=None,
+                            help='ISO date the dataset ends at (default: today, UTC midnight).')
+        parser.add_argument('--status-weights', default=None,
+                            help='Comma separated "Status=weight" pairs.')
+        parser.add_argument('--priority-weights', default=None,
+                            help='Comma separated "Priority=weight" pairs.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='seed',
+                            help='Username prefix, so several datasets can live side by side.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        # Status histories draw from their own generator, so the rest of the
+        # dataset is the same as before they were seeded.
+        self.history_rng = random.Random(f"{options['seed']}-history")
+        self.batch_size = options['batch_size']
+        self.comments = options['comments']
+        self.span = timedelta(days=options['days'])
+        self.end = self.parse_end(options['end'])
+
+        status_weights = DEFAULT_STATUS_WEIGHTS
+        if options['status_weights']:
+            status_weights = parse_weights(options['status_weights'], dict(StatusChoices.CHOICES))
+        priority_weights = DEFAULT_PRIORITY_WEIGHTS
+        if options['priority_weights']:
+            priority_weights = parse_weights(options['priority_weights'], dict(PriorityChoices.CHOICES))
+        self.statuses, self.status_weights = zip(*status_weights.items())
+        self.priorities, self.priority_weights = zip(*priority_weights.items())
+
+        if options['users'] < 1 or options['admins'] < 1:
+            raise CommandError('At least one user and one admin are required.')
+
+        # Texts are drawn from pre-generated pools; composing every one of them
+        # word by word dominated the run time.
+        self.subjects = self.sentences(3, 7)
+        self.texts = self.sentences(10, 40)
+        self.messages = self.sentences(4, 20)
+
+        self.users = self.create_users(options['prefix'], options['users'], is_superuser=False)
+        self.admins = self.create_users(f"{options['prefix']}_admin", options['admins'], is_superuser=True)
+
+        # Ids are assigned here so comments, decline reasons and change events
+        # can refer to them without reading anything back; the sequences are
+        # fixed up after.
+        self.next_request_id = (HelpRequest.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        self.next_comment_id = (Comment.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        created = {'requests': 0, 'declined': 0, 'comments': 0, 'transitions': 0}
+        total = options['requests']
+        for start in range(0, total, self.batch_size):
+            counts = self.create_batch(min(self.batch_size, total - start))
+            for name, count in counts.items():
+                created[name] += count
+            self.stdout.write(f"{created['requests']}/{total} requests")
+        self.reset_sequences()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(self.users)} users, {len(self.admins)} admins, {created['requests']} requests, "
+            f"{created['declined']} decline reasons, {created['comments']} comments and "
+            f"{created['transitions']} status changes."
+        ))
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(no_style(), [HelpRequest, Comment])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def parse_end(self, value):
+        if value is None:
+            day = timezone.now().date()
+        else:
+            try:
+                day = datetime.fromisoformat(value).date()
+            except ValueError:
+                raise CommandError(f"Invalid --end date '{value}'.")
+        return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+    def create_users(self, prefix, count, is_superuser):
+        password = make_password('password')
+        usernames = [f'{prefix}_{i}' for i in range(count)]
+        MyUser.objects.bulk_create(
+            [
+                MyUser(username=username, password=password, is_superuser=is_superuser, is_staff=is_superuser)
+                for username in usernames
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        return list(MyUser.objects.filter(username__in=usernames).order_by('id').values_list('id', flat=True))
+
+    def sentences(self, shortest, longest):
+        rng = self.rng
+        return [
+            ' '.join(rng.choices(WORDS, k=rng.randint(shortest, longest))).capitalize()
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+
+    @transaction.atomic
+    def create_batch(self, size):
+        rng = self.rng
+        adapt = connection.ops.adapt_datetimefield_value
+        statuses = rng.choices(self.statuses, self.status_weights, k=size)
+        priorities = rng.choices(self.priorities, self.priority_weights, k=size)
+        requests, declined, comments, events, history = [], [], [], [], []
+        counts = Counter()
+        for status, priority in zip(statuses, priorities):
+            pk = self.next_request_id
+            self.next_request_id += 1
+            created_at = self.end - self.span * rng.random()
+            requester_id = rng.choice(self.users)
+            subject, text = rng.choice(self.subjects), rng.choice(self.texts)
+            events.append((
+                ChangeEntityChoices.REQUEST, pk, pk, requester_id, ChangeOperationChoices.CREATED, status,
+                adapt(created_at),
+            ))
+            last_activity_at = created_at
+            thread = []
+            if status == StatusChoices.DECLINED:
+                declined.append((pk, rng.choice(self.messages)))
+            elif status in COMMENTED_STATUSES:
+                for _ in range(rng.randint(0, round(2 * self.comments))):
+                    comment_id = self.next_comment_id
+                    self.next_comment_id += 1
+                    commented_at = created_at + timedelta(minutes=rng.randint(1, 60 * 24 * 14))
+                    last_activity_at = max(last_activity_at, commented_at)
+                    thread.append((
+                        comment_id,
+                        rng.choice(self.messages),
+                        rng.choice((requester_id, rng.choice(self.admins))),
+                        pk,
+                        adapt(commented_at),
+                    ))
+                    events.append((
+                        ChangeEntityChoices.COMMENT, comment_id, pk, requester_id, ChangeOperationChoices.CREATED,
+                        None, adapt(commented_at),
+                    ))
+            comments.extend(thread)
+            reason = declined[-1][1] if status == StatusChoices.DECLINED else None
+            history.extend(self.status_history(pk, requester_id, priority, status, created_at, reason))
+            rollups.deltas_for((requester_id, created_at, status, priority), 1, counts)
+            # Counters are known here; no repair pass is needed afterwards.
+            requests.append((
+                pk, subject, text, requester_id, priority, status, adapt(created_at), adapt(created_at), len(thread),
+                adapt(last_activity_at),
+            ))
+        insert_rows(HelpRequest, REQUEST_FIELDS, requests)
+        insert_rows(DeclinedRequest, DECLINED_FIELDS, declined)
+        insert_rows(Comment, COMMENT_FIELDS, comments)
+        insert_rows(ChangeEvent, EVENT_FIELDS, events)
+        insert_rows(StatusTransition, TRANSITION_FIELDS, history)
+        rollups.apply(counts)
+        return {
+            'requests': len(requests), 'declined': len(declined), 'comments': len(comments),
+            'transitions': len(history),
+        }
+
+    def status_history(self, pk, requester_id, priority, status, created_at, reason):
+        rng = self.history_rng
+        adapt = connection.ops.adapt_datetimefield_value
+        adapt_duration = StatusTransition._meta.get_field('duration').get_db_prep_value
+        path = STATUS_PATHS[status]
+        rows = []
+        entered_at = created_at
+        for from_status, to_status in zip(path, path[1:]):
+            changed_at = entered_at + timedelta(minutes=rng.randint(5, 60 * 24 * 3))
+            if to_status == StatusChoices.FOR_RESTORATION:
+                actor_id = requester_id
+            else:
+                actor_id = rng.choice(self.admins)
+            comment = ''
+            if to_status == StatusChoices.DECLINED:
+                comment = reason or rng.choice(self.messages)
+            rows.append((
+                pk, priority, from_status, to_status, actor_id, adapt_duration(changed_at - entered_at, connection),
+                comment, adapt(changed_at),
+            ))
+            entered_at = changed_at
+        return rows
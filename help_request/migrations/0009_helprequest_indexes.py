@@ -0,0 +1,45 @@
+# Generated by Django 4.2.6 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0008_alter_declinedrequest_declined_request_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['-created_at', '-id'], name='helpreq_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='helpreq_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['priority', '-created_at', '-id'], name='helpreq_prio_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['requester', '-created_at', '-id'], name='helpreq_req_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['requester', 'status', '-created_at'], name='helpreq_req_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['requester', 'priority', '-created_at'], name='helpreq_req_prio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(condition=models.Q(('status', 'Active')), fields=['priority', '-created_at', '-id'], name='helpreq_active_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(condition=models.Q(('status', 'For restoration')), fields=['priority', '-created_at', '-id'], name='helpreq_restoration_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.6 on 2026-10-18 17:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0009_helprequest_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('request', 'Request'), ('comment', 'Comment')], max_length=7)),
+                ('object_id', models.BigIntegerField()),
+                ('request_id', models.BigIntegerField()),
+                ('requester_id', models.BigIntegerField()),
+                ('operation', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=7)),
+                ('status', models.CharField(blank=True, choices=[('Active', 'Active'), ('Declined', 'Declined'), ('For restoration', 'For restoration'), ('Approved', 'Approved'), ('In process', 'In process'), ('Completed', 'Completed')], max_length=15, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['requester_id', 'id'], name='change_requester_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.6 on 2026-10-18 17:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+import django.utils.timezone
+
+
+def fill_counters(apps, schema_editor):
+    HelpRequest = apps.get_model('help_request', 'HelpRequest')
+    Comment = apps.get_model('comments', 'Comment')
+    thread = Comment.objects.filter(help_request=OuterRef('pk')).order_by()
+    count = thread.values('help_request').annotate(count=Count('id')).values('count')
+    newest = thread.order_by('-created_at').values('created_at')[:1]
+    HelpRequest.objects.update(
+        comment_count=Coalesce(Subquery(count), 0),
+        last_activity_at=Greatest('created_at', Coalesce(Subquery(newest), 'created_at')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0010_changeevent'),
+        ('comments', '0003_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='helprequest',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='helprequest',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['-last_activity_at', '-id'], name='helpreq_activity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['requester', '-last_activity_at', '-id'], name='helpreq_req_activity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['-comment_count', '-id'], name='helpreq_comments_idx'),
+        ),
+    ]
@@ -0,0 +1,140 @@
+from django.db import migrations
+
+# The search index as first installed; help_request.search holds the current one.
+POSTGRESQL_SQL = [
+    'ALTER TABLE help_request_helprequest ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    '''
+        CREATE OR REPLACE FUNCTION help_request_search_vector(request_id bigint, subject text, body text)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('english', subject), 'A')
+                || setweight(to_tsvector('english', body), 'B')
+                || setweight(to_tsvector('english', coalesce(
+                    (SELECT string_agg(message, ' ') FROM comments_comment WHERE help_request_id = request_id), ''
+                )), 'C')
+        $$ LANGUAGE sql STABLE
+    ''',
+    '''
+        CREATE OR REPLACE FUNCTION help_request_search_request() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := help_request_search_vector(NEW.id, NEW.subject, NEW.text);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    ''',
+    '''
+        CREATE OR REPLACE FUNCTION help_request_search_comments() RETURNS trigger AS $$
+        BEGIN
+            UPDATE help_request_helprequest SET search_vector = help_request_search_vector(id, subject, text)
+            WHERE id IN (SELECT help_request_id FROM changed);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_request ON help_request_helprequest',
+    '''
+        CREATE TRIGGER help_request_search_request BEFORE INSERT OR UPDATE OF subject, text ON help_request_helprequest
+        FOR EACH ROW EXECUTE FUNCTION help_request_search_request()
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_comment_insert ON comments_comment',
+    '''
+        CREATE TRIGGER help_request_search_comment_insert AFTER INSERT ON comments_comment
+        REFERENCING NEW TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments()
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_comment_update ON comments_comment',
+    '''
+        CREATE TRIGGER help_request_search_comment_update AFTER UPDATE ON comments_comment
+        REFERENCING NEW TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments()
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_comment_delete ON comments_comment',
+    '''
+        CREATE TRIGGER help_request_search_comment_delete AFTER DELETE ON comments_comment
+        REFERENCING OLD TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments()
+    ''',
+    'UPDATE help_request_helprequest SET search_vector = help_request_search_vector(id, subject, text)',
+    'CREATE INDEX IF NOT EXISTS helpreq_search_idx ON help_request_helprequest USING gin (search_vector)',
+]
+
+SQLITE_SQL = [
+    '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS help_request_search
+        USING fts5(subject, text, comments, tokenize='porter unicode61')
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS help_request_search_insert
+        AFTER INSERT ON help_request_helprequest BEGIN
+            INSERT INTO help_request_search (rowid, subject, text, comments)
+            VALUES (new.id, new.subject, new.text, '');
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS help_request_search_update
+        AFTER UPDATE OF subject, text ON help_request_helprequest BEGIN
+            UPDATE help_request_search SET subject = new.subject, text = new.text WHERE rowid = new.id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS help_request_search_delete
+        AFTER DELETE ON help_request_helprequest BEGIN
+            DELETE FROM help_request_search WHERE rowid = old.id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS help_request_search_comment_insert
+        AFTER INSERT ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = (
+                SELECT coalesce(group_concat(message, ' '), '') FROM comments_comment
+                WHERE help_request_id = new.help_request_id
+            )
+            WHERE rowid = new.help_request_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS help_request_search_comment_update
+        AFTER UPDATE OF message ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = (
+                SELECT coalesce(group_concat(message, ' '), '') FROM comments_comment
+                WHERE help_request_id = new.help_request_id
+            )
+            WHERE rowid = new.help_request_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS help_request_search_comment_delete
+        AFTER DELETE ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = (
+                SELECT coalesce(group_concat(message, ' '), '') FROM comments_comment
+                WHERE help_request_id = old.help_request_id
+            )
+            WHERE rowid = old.help_request_id;
+        END
+    ''',
+    'DELETE FROM help_request_search',
+    '''
+        INSERT INTO help_request_search (rowid, subject, text, comments)
+        SELECT id, subject, text, (
+            SELECT coalesce(group_concat(message, ' '), '') FROM comments_comment
+            WHERE help_request_id = help_request_helprequest.id
+        )
+        FROM help_request_helprequest
+    ''',
+]
+
+
+def install_search(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {'postgresql': POSTGRESQL_SQL, 'sqlite': SQLITE_SQL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0011_comment_counters'),
+        ('comments', '0003_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.6 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('help_request', '0012_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestClaim',
+            fields=[
+                ('help_request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='claim', serialize=False, to='help_request.helprequest')),
+                ('expires_at', models.DateTimeField()),
+                ('admin', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claims', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
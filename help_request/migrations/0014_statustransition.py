@@ -0,0 +1,31 @@
+# Generated by Django 4.2.6 on 2026-10-18 18:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0013_requestclaim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_id', models.BigIntegerField()),
+                ('priority', models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], max_length=6)),
+                ('from_status', models.CharField(choices=[('Active', 'Active'), ('Declined', 'Declined'), ('For restoration', 'For restoration'), ('Approved', 'Approved'), ('In process', 'In process'), ('Completed', 'Completed')], max_length=15)),
+                ('to_status', models.CharField(choices=[('Active', 'Active'), ('Declined', 'Declined'), ('For restoration', 'For restoration'), ('Approved', 'Approved'), ('In process', 'In process'), ('Completed', 'Completed')], max_length=15)),
+                ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                ('duration', models.DurationField()),
+                ('comment', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['request_id', 'id'], name='transition_request_idx'), models.Index(fields=['from_status', 'to_status', 'created_at', 'priority', 'duration'], name='transition_stats_idx')],
+            },
+        ),
+    ]
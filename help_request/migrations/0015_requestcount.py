@@ -0,0 +1,45 @@
+# Generated by Django 4.2.6 on 2026-10-18 18:10
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_counts(apps, schema_editor):
+    HelpRequest = apps.get_model('help_request', 'HelpRequest')
+    RequestCount = apps.get_model('help_request', 'RequestCount')
+    requests = HelpRequest.objects.order_by()
+    rows = []
+    for row in requests.values('status', 'priority').annotate(count=Count('pk')):
+        rows.append(RequestCount(scope='all', **row))
+    for row in requests.values('requester_id', 'status', 'priority').annotate(count=Count('pk')):
+        rows.append(RequestCount(scope=f"user:{row.pop('requester_id')}", **row))
+    days = requests.annotate(day=TruncDate('created_at')).values('day', 'status', 'priority')
+    for row in days.annotate(count=Count('pk')):
+        rows.append(RequestCount(scope=f"day:{row.pop('day').isoformat()}", **row))
+    RequestCount.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0014_statustransition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32)),
+                ('status', models.CharField(choices=[('Active', 'Active'), ('Declined', 'Declined'), ('For restoration', 'For restoration'), ('Approved', 'Approved'), ('In process', 'In process'), ('Completed', 'Completed')], max_length=15)),
+                ('priority', models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], max_length=6)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='requestcount',
+            constraint=models.UniqueConstraint(fields=('scope', 'status', 'priority'), name='request_count_key'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+# New comments are appended to their request's search data instead of
+# re-reading the whole thread.
+POSTGRESQL_SQL = [
+    '''
+        CREATE OR REPLACE FUNCTION help_request_search_comments_added() RETURNS trigger AS $$
+        BEGIN
+            UPDATE help_request_helprequest AS request SET search_vector = request.search_vector || added.vector
+            FROM (
+                SELECT help_request_id,
+                    setweight(to_tsvector('english', string_agg(message, ' ' ORDER BY id)), 'C') AS vector
+                FROM changed GROUP BY help_request_id
+            ) AS added
+            WHERE request.id = added.help_request_id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_comment_insert ON comments_comment',
+    '''
+        CREATE TRIGGER help_request_search_comment_insert AFTER INSERT ON comments_comment
+        REFERENCING NEW TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments_added()
+    ''',
+]
+
+SQLITE_SQL = [
+    'DROP TRIGGER IF EXISTS help_request_search_comment_insert',
+    '''
+        CREATE TRIGGER help_request_search_comment_insert
+        AFTER INSERT ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = comments || ' ' || new.message
+            WHERE rowid = new.help_request_id;
+        END
+    ''',
+]
+
+
+def append_comments(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {'postgresql': POSTGRESQL_SQL, 'sqlite': SQLITE_SQL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help_request', '0015_requestcount'),
+    ]
+
+    operations = [
+        migrations.RunPython(append_comments, migrations.RunPython.noop),
+    ]
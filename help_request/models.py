@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from user_app.models import MyUser
 from django.utils import timezone
 
@@ -33,6 +33,28 @@ class StatusChoices:
     ]
 
 
+class ChangeEntityChoices:
+    REQUEST = "request"
+    COMMENT = "comment"
+
+    CHOICES = [
+        (REQUEST, "Request"),
+        (COMMENT, "Comment"),
+    ]
+
+
+class ChangeOperationChoices:
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    CHOICES = [
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+    ]
+
+
 class HelpRequest(models.Model):
     subject = models.CharField(max_length=255)
     text = models.TextField()
@@ -41,6 +63,58 @@ class HelpRequest(models.Model):
     status = models.CharField(max_length=15, choices=StatusChoices.CHOICES, default=StatusChoices.ACTIVE)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    # Kept in step with the comments by signals; repair_comment_counters
+    # recomputes them after bulk writes.
+    comment_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Every list is read newest first by (created_at, id) keyset pages, so
+        # each filter the views use gets an index ending in that key. The admin
+        # queues are split into priority columns and get small partial indexes.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='helpreq_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='helpreq_status_created_idx'),
+            models.Index(fields=['priority', '-created_at', '-id'], name='helpreq_prio_created_idx'),
+            models.Index(fields=['requester', '-created_at', '-id'], name='helpreq_req_created_idx'),
+            models.Index(fields=['requester', 'status', '-created_at'], name='helpreq_req_status_idx'),
+            models.Index(fields=['requester', 'priority', '-created_at'], name='helpreq_req_prio_idx'),
+            models.Index(fields=['-last_activity_at', '-id'], name='helpreq_activity_idx'),
+            models.Index(fields=['requester', '-last_activity_at', '-id'], name='helpreq_req_activity_idx'),
+            models.Index(fields=['-comment_count', '-id'], name='helpreq_comments_idx'),
+            models.Index(fields=['priority', '-created_at', '-id'], name='helpreq_active_queue_idx',
+                         condition=models.Q(status=StatusChoices.ACTIVE)),
+            models.Index(fields=['priority', '-created_at', '-id'], name='helpreq_restoration_queue_idx',
+                         condition=models.Q(status=StatusChoices.FOR_RESTORATION)),
+        ]
+
+    # What RequestCount rows a request is counted in depends on these.
+    COUNTED_FIELDS = ('requester_id', 'created_at', 'status', 'priority')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so that an edit can move the request between counts.
+        if all(name in field_names for name in cls.COUNTED_FIELDS):
+            instance.counted_as = instance.counted_key()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        if not self.get_deferred_fields().intersection(self.COUNTED_FIELDS):
+            self.counted_as = self.counted_key()
+
+    def counted_key(self):
+        return tuple(getattr(self, name) for name in self.COUNTED_FIELDS)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # No comments yet, so the last activity is the creation.
+            self.last_activity_at = self.created_at
+        # The counts are updated by post_save, in the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self.counted_as = self.counted_key()
 
     def __str__(self):
         return f"{self.requester} -- {self.subject} -- {self.priority} -- {self.status}"
@@ -52,3 +126,80 @@ class DeclinedRequest(models.Model):
 
     def __str__(self):
         return f"{self.declined_request} -- declined"
+
+
+class RequestCount(models.Model):
+    # Precomputed number of requests per status and priority within a scope:
+    # "all", "user:<id>" for a requester's requests, or "day:<date>" for the
+    # requests created that day. Kept up to date by signals and the
+    # transitions engine; reconcile_request_counts rebuilds it.
+    scope = models.CharField(max_length=32)
+    status = models.CharField(max_length=15, choices=StatusChoices.CHOICES)
+    priority = models.CharField(max_length=6, choices=PriorityChoices.CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'status', 'priority'], name='request_count_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} -- {self.status} -- {self.priority}: {self.count}"
+
+
+class StatusTransition(models.Model):
+    # Append-only status history, written with every transition. Like the
+    # change log it keeps plain ids, and it copies the priority, so the SLA
+    # aggregates never join the requests table.
+    request_id = models.BigIntegerField()
+    priority = models.CharField(max_length=6, choices=PriorityChoices.CHOICES)
+    from_status = models.CharField(max_length=15, choices=StatusChoices.CHOICES)
+    to_status = models.CharField(max_length=15, choices=StatusChoices.CHOICES)
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    # Time spent in from_status, measured from the previous transition or the creation.
+    duration = models.DurationField()
+    comment = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['request_id', 'id'], name='transition_request_idx'),
+            # Range scans for the aggregates of one kind of transition, with
+            # the grouped and aggregated columns in the index.
+            models.Index(fields=['from_status', 'to_status', 'created_at', 'priority', 'duration'],
+                         name='transition_stats_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.request_id}: {self.from_status} -> {self.to_status}"
+
+
+class RequestClaim(models.Model):
+    # An admin's lease on a request of the review queue; once it expires the
+    # request can be claimed again.
+    help_request = models.OneToOneField(HelpRequest, on_delete=models.CASCADE, primary_key=True, related_name='claim')
+    admin = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='claims')
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.help_request} -- claimed by {self.admin}"
+
+
+class ChangeEvent(models.Model):
+    # Append-only log behind the changes feed; the id is the feed cursor. Rows
+    # keep plain ids rather than foreign keys so tombstones outlive the objects.
+    entity = models.CharField(max_length=7, choices=ChangeEntityChoices.CHOICES)
+    object_id = models.BigIntegerField()
+    request_id = models.BigIntegerField()
+    requester_id = models.BigIntegerField()
+    operation = models.CharField(max_length=7, choices=ChangeOperationChoices.CHOICES)
+    status = models.CharField(max_length=15, choices=StatusChoices.CHOICES, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['requester_id', 'id'], name='change_requester_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} {self.operation}"
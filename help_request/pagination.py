@@ -0,0 +1,199 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(position, reverse=False):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in position]
+    payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def ordering_field(queryset, name):
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
+
+
+def decode_cursor(cursor, ordering, queryset):
+    """
+    Return `(position, reverse)` from `cursor`, with every value of the
+    position converted by the field of `queryset` it is ordered by.
+
+    Anything a client could have tampered with raises ValueError.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        position, reverse = payload['p'], bool(payload['r'])
+    except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+    if not isinstance(position, list) or len(position) != len(ordering):
+        raise ValueError('Invalid cursor')
+    try:
+        position = [
+            ordering_field(queryset, field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, position)
+        ]
+    except (TypeError, ValueError, ValidationError):
+        raise ValueError('Invalid cursor')
+    # The keys paged over are never null.
+    if None in position:
+        raise ValueError('Invalid cursor')
+    return position, reverse
+
+
+def invert_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+
+def keyset_condition(ordering, position):
+    # Lexicographic "comes after" for a composite key: (a > x) or (a = x and b > y) ...
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return condition
+
+
+def row_position(row, ordering):
+    return [getattr(row, field.lstrip('-')) for field in ordering]
+
+
+def keyset_query(queryset, ordering, page_size, position=None, reverse=False):
+    # One row more than the page, to tell whether there is another.
+    if reverse:
+        ordering = invert_ordering(ordering)
+    queryset = queryset.order_by(*ordering)
+    if position is not None:
+        queryset = queryset.filter(keyset_condition(ordering, position))
+    return queryset[:page_size + 1]
+
+
+def keyset_page(rows, page_size, reverse=False):
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+    return rows, has_more
+
+
+def keyset_slice(queryset, ordering, page_size, position=None, reverse=False):
+    rows = list(keyset_query(queryset, ordering, page_size, position, reverse))
+    return keyset_page(rows, page_size, reverse)
+
+
+async def akeyset_slice(queryset, ordering, page_size, position=None, reverse=False):
+    rows = [row async for row in keyset_query(queryset, ordering, page_size, position, reverse)]
+    return keyset_page(rows, page_size, reverse)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination over a unique composite key, `(created_at, id)` by default.
+
+    Pages are addressed by opaque cursors holding the key of the boundary row,
+    so rows inserted while a client is paging never shift or repeat items.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        position, reverse = self.start_page(queryset, request, view)
+        rows, has_more = keyset_slice(queryset, self.ordering, self.page_size, position, reverse)
+        return self.end_page(rows, has_more, position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        position, reverse = self.start_page(queryset, request, view)
+        rows, has_more = await akeyset_slice(queryset, self.ordering, self.page_size, position, reverse)
+        return self.end_page(rows, has_more, position, reverse)
+
+    def start_page(self, queryset, request, view):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, view)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            return decode_cursor(cursor, self.ordering, queryset)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def end_page(self, rows, has_more, position, reverse):
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if rows:
+            self.next_position = row_position(rows[-1], self.ordering)
+            self.previous_position = row_position(rows[0], self.ordering)
+        else:
+            self.next_position = self.previous_position = position
+        return rows
+
+    def get_page_size(self, request):
+        max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return min(self.page_size, max_page_size)
+
+    def get_ordering(self, request, view):
+        return tuple(getattr(view, 'pagination_ordering', self.ordering))
+
+    def get_next_link(self):
+        if not self.has_next or self.next_position is None:
+            return None
+        cursor = encode_cursor(self.next_position)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.previous_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = encode_cursor(self.previous_position, reverse=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,135 @@
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+# Credentials are looked up right after they are created, so they are always
+# read from the primary.
+PRIMARY_APPS = {'sessions', 'authtoken'}
+
+
+class Routing:
+    """Where the queries of the current request may go."""
+
+    def __init__(self, replica_reads=False):
+        self.replica_reads = replica_reads
+        # Set by the first write; every later read goes to the primary too.
+        self.wrote = False
+        self.replica = None
+
+    def read_alias(self):
+        if not self.replica_reads or self.wrote or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction on the primary must see what it wrote.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        # One replica per request, so its reads see a single point in time.
+        if self.replica is None:
+            self.replica = random.choice(settings.DATABASE_REPLICAS)
+        return self.replica
+
+
+_routing = ContextVar('routing', default=None)
+
+
+def current():
+    return _routing.get()
+
+
+def start(replica_reads=False):
+    routing = Routing(replica_reads)
+    _routing.set(routing)
+    return routing
+
+
+def stop():
+    _routing.set(None)
+
+
+@contextmanager
+def primary():
+    """Read from the primary inside this block, e.g. to fill a shared cache."""
+    routing = current()
+    replica_reads = routing.replica_reads if routing else False
+    if routing:
+        routing.replica_reads = False
+    try:
+        yield
+    finally:
+        if routing:
+            routing.replica_reads = replica_reads
+
+
+class ReplicaRouter:
+    """
+    Send the reads of requests that ReplicaMiddleware allowed to a replica,
+    and everything else, writes included, to the primary.
+
+    Models loaded from a replica are saved to the primary as well, and
+    once a request writes anything but credentials, its later reads go to
+    the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = current()
+        if routing is None or model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return routing.read_alias()
+
+    def db_for_write(self, model, **hints):
+        routing = current()
+        # Credentials are never read from a replica, so writing them (the
+        # token's inactivity stamp, a session) pins nobody to the primary.
+        if routing and model._meta.app_label not in PRIMARY_APPS:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+def pin_key(request):
+    # Clients are told apart by their credentials, which are known before
+    # the view authenticates them: the token header or the session cookie.
+    credentials = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return 'db-pin:' + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """
+    Let GET and HEAD requests to views with `replica_reads = True` read from
+    a replica, except for clients that wrote in the last
+    DATABASE_REPLICA_PIN_SECONDS: they read from the primary, so they see
+    their own changes however far the replicas lag.
+    """
+
+    def process_request(self, request):
+        start()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD') or not settings.DATABASE_REPLICAS:
+            return None
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        if not getattr(view_class, 'replica_reads', False):
+            return None
+        key = pin_key(request)
+        if key is None or not cache.get(key):
+            current().replica_reads = True
+        return None
+
+    def process_response(self, request, response):
+        routing = current()
+        if routing and routing.wrote and settings.DATABASE_REPLICAS:
+            key = pin_key(request)
+            if key:
+                cache.set(key, True, settings.DATABASE_REPLICA_PIN_SECONDS)
+        stop()
+        return response
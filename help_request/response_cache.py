@@ -0,0 +1,125 @@
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import replicas
+
+ADMIN_SCOPE = 'admin'
+
+# Hits and misses per endpoint, counted by this process.
+_stats = Counter()
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def scope_for(user):
+    return ADMIN_SCOPE if user.is_superuser else user_scope(user.pk)
+
+
+def _version_key(scope):
+    return f'responses:version:{scope}'
+
+
+def get_version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock, so a counter lost to eviction never comes back
+        # at a value that older entries were stored under.
+        cache.add(key, time.time_ns())
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(scope):
+    key = _version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns())
+        version = await cache.aget(key)
+    return version
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            # Not there any more; the next read seeds a fresh version anyway.
+            pass
+
+
+def bump(*scopes):
+    """
+    Invalidate every response cached under `scopes`.
+
+    The counters are bumped right away and again once the surrounding
+    transaction commits, so a reader racing the transaction cannot store the
+    old rows under the new version.
+    """
+    _bump(scopes)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def bump_for_requesters(requester_ids):
+    bump(ADMIN_SCOPE, *{user_scope(requester_id) for requester_id in requester_ids})
+
+
+def cache_key(name, scope, request, vary_on_user=False, version=None):
+    if version is None:
+        version = get_version(scope)
+    parts = [name, scope, str(version)]
+    if vary_on_user:
+        parts.append(str(request.user.pk))
+    # The absolute URL covers filters, cursor and page size, and the host the
+    # pagination links are built with.
+    parts.append(hashlib.sha256(request.build_absolute_uri().encode()).hexdigest())
+    return 'responses:' + ':'.join(parts)
+
+
+def cached(name, scope, request, build, vary_on_user=False):
+    """Return the cached value for this endpoint, scope and URL, or `build()` it and cache it."""
+    key = cache_key(name, scope, request, vary_on_user)
+    value = cache.get(key)
+    if value is not None:
+        _stats[name, 'hits'] += 1
+        return value
+    _stats[name, 'misses'] += 1
+    # Built from the primary: a lagging replica would store a stale value
+    # under the new version.
+    with replicas.primary():
+        value = build()
+    cache.set(key, value, settings.RESPONSE_CACHE_SECONDS)
+    return value
+
+
+async def acached(name, scope, request, build, vary_on_user=False):
+    """cached() for async views, where `build` is a coroutine function."""
+    key = cache_key(name, scope, request, vary_on_user, version=await aget_version(scope))
+    value = await cache.aget(key)
+    if value is not None:
+        _stats[name, 'hits'] += 1
+        return value
+    _stats[name, 'misses'] += 1
+    with replicas.primary():
+        value = await build()
+    await cache.aset(key, value, settings.RESPONSE_CACHE_SECONDS)
+    return value
+
+
+def stats():
+    result = {}
+    for (name, kind), count in sorted(_stats.items()):
+        result.setdefault(name, {'hits': 0, 'misses': 0})[kind] = count
+    return result
+
+
+def reset_stats():
+    _stats.clear()
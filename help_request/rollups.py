@@ -0,0 +1,145 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import RequestCount
+
+ALL = 'all'
+
+# Rows per upsert statement, well under the parameter limits of the databases.
+UPSERT_CHUNK_SIZE = 1000
+
+
+def user_scope(requester_id):
+    return f'user:{requester_id}'
+
+
+def day_scope(day):
+    return f'day:{day.isoformat()}'
+
+
+def deltas_for(key, delta, deltas=None):
+    """Add `delta` to every RequestCount row a request counted as `key` falls into."""
+    deltas = Counter() if deltas is None else deltas
+    requester_id, created_at, status, priority = key
+    for scope in (ALL, user_scope(requester_id), day_scope(timezone.localdate(created_at))):
+        deltas[scope, status, priority] += delta
+    return deltas
+
+
+def apply(deltas):
+    """Add `deltas`, a Counter of `(scope, status, priority)`, to the stored counts with one upsert."""
+    rows = [(scope, status, priority, delta) for (scope, status, priority), delta in deltas.items() if delta]
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(RequestCount._meta.db_table)
+    columns = ', '.join(quote(name) for name in ('scope', 'status', 'priority', 'count'))
+    conflict = (
+        f'ON CONFLICT ({quote("scope")}, {quote("status")}, {quote("priority")}) '
+        f'DO UPDATE SET {quote("count")} = {table}.{quote("count")} + excluded.{quote("count")}'
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+            values = ', '.join(['(%s, %s, %s, %s)'] * len(chunk))
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {values} {conflict}',
+                [value for row in chunk for value in row],
+            )
+
+
+def added(help_request):
+    apply(deltas_for(help_request.counted_key(), 1))
+
+
+def removed(help_request):
+    apply(deltas_for(help_request.counted_key(), -1))
+
+
+def moved(changes):
+    """Move requests between counts; `changes` are `(old_key, new_key)` pairs."""
+    deltas = Counter()
+    for old_key, new_key in changes:
+        if old_key != new_key:
+            deltas_for(old_key, -1, deltas)
+            deltas_for(new_key, 1, deltas)
+    apply(deltas)
+
+
+def actual_counts(requests):
+    """Count `requests` by scope, status and priority with one GROUP BY per kind of scope."""
+    requests = requests.order_by()
+    counts = Counter()
+    for row in requests.values('status', 'priority').annotate(count=Count('pk')):
+        counts[ALL, row['status'], row['priority']] = row['count']
+    for row in requests.values('requester_id', 'status', 'priority').annotate(count=Count('pk')):
+        counts[user_scope(row['requester_id']), row['status'], row['priority']] = row['count']
+    days = requests.annotate(day=TruncDate('created_at')).values('day', 'status', 'priority')
+    for row in days.annotate(count=Count('pk')):
+        counts[day_scope(row['day']), row['status'], row['priority']] = row['count']
+    return counts
+
+
+def reconcile(requests):
+    """
+    Recount `requests` (every request, normally) and rewrite the stored
+    counts that differ; returns how many were corrected.
+
+    Writes committed while the recount runs can be undone, so a busy table
+    may need a second run.
+    """
+    with transaction.atomic():
+        actual = actual_counts(requests)
+        stored = {
+            (row.scope, row.status, row.priority): row
+            for row in RequestCount.objects.all()
+        }
+        wrong = [
+            RequestCount(scope=scope, status=status, priority=priority, count=count)
+            for (scope, status, priority), count in actual.items()
+            if (scope, status, priority) not in stored or stored[scope, status, priority].count != count
+        ]
+        gone = [row.pk for key, row in stored.items() if key not in actual and row.count]
+        RequestCount.objects.bulk_create(
+            wrong, batch_size=1000, update_conflicts=True,
+            unique_fields=['scope', 'status', 'priority'], update_fields=['count'],
+        )
+        RequestCount.objects.filter(pk__in=gone).update(count=0)
+    return len(wrong) + len(gone)
+
+
+def totals(scope):
+    return list(
+        RequestCount.objects.filter(scope=scope, count__gt=0)
+        .order_by('status', 'priority').values('status', 'priority', 'count')
+    )
+
+
+def dashboard(user):
+    """
+    The numbers behind the landing pages: an admin gets the totals and the
+    last DASHBOARD_DAYS days of every request, a regular user the totals of
+    their own. Only precomputed rows are read.
+    """
+    if not user.is_superuser:
+        return {'totals': totals(user_scope(user.pk))}
+    today = timezone.localdate()
+    scopes = {day_scope(today - timedelta(days=offset)) for offset in range(settings.DASHBOARD_DAYS)}
+    days = (
+        RequestCount.objects.filter(scope__in=scopes, count__gt=0)
+        .order_by('-scope', 'status', 'priority').values('scope', 'status', 'priority', 'count')
+    )
+    return {
+        'totals': totals(ALL),
+        'days': [
+            {'day': row['scope'].split(':', 1)[1], 'status': row['status'], 'priority': row['priority'],
+             'count': row['count']}
+            for row in days
+        ],
+    }
@@ -0,0 +1,200 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+# Text search configuration on PostgreSQL; SQLite stems with porter.
+SEARCH_CONFIG = 'english'
+
+# Subject, text and comments, in that order of weight.
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+# New comments are appended to their request's vector, so adding one costs the
+# same however long the thread is; edits and deletes recompute the vector.
+POSTGRESQL_COMMENT_INSERT_SQL = [
+    f'''
+    CREATE OR REPLACE FUNCTION help_request_search_comments_added() RETURNS trigger AS $$
+    BEGIN
+        UPDATE help_request_helprequest AS request SET search_vector = request.search_vector || added.vector
+        FROM (
+            SELECT help_request_id,
+                setweight(to_tsvector('{SEARCH_CONFIG}', string_agg(message, ' ' ORDER BY id)), 'C') AS vector
+            FROM changed GROUP BY help_request_id
+        ) AS added
+        WHERE request.id = added.help_request_id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_comment_insert ON comments_comment',
+    '''
+    CREATE TRIGGER help_request_search_comment_insert AFTER INSERT ON comments_comment
+    REFERENCING NEW TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments_added()
+    ''',
+]
+
+# On PostgreSQL a trigger-maintained tsvector column with a GIN index. Comment
+# changes are folded in by statement triggers, so a multi-row INSERT updates
+# every request once.
+POSTGRESQL_SQL = [
+    'ALTER TABLE help_request_helprequest ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    f'''
+    CREATE OR REPLACE FUNCTION help_request_search_vector(request_id bigint, subject text, body text)
+    RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('{SEARCH_CONFIG}', subject), 'A')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', body), 'B')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(
+                (SELECT string_agg(message, ' ') FROM comments_comment WHERE help_request_id = request_id), ''
+            )), 'C')
+    $$ LANGUAGE sql STABLE
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION help_request_search_request() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := help_request_search_vector(NEW.id, NEW.subject, NEW.text);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION help_request_search_comments() RETURNS trigger AS $$
+    BEGIN
+        UPDATE help_request_helprequest SET search_vector = help_request_search_vector(id, subject, text)
+        WHERE id IN (SELECT help_request_id FROM changed);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_request ON help_request_helprequest',
+    '''
+    CREATE TRIGGER help_request_search_request BEFORE INSERT OR UPDATE OF subject, text ON help_request_helprequest
+    FOR EACH ROW EXECUTE FUNCTION help_request_search_request()
+    ''',
+    *POSTGRESQL_COMMENT_INSERT_SQL,
+    'DROP TRIGGER IF EXISTS help_request_search_comment_update ON comments_comment',
+    '''
+    CREATE TRIGGER help_request_search_comment_update AFTER UPDATE ON comments_comment
+    REFERENCING NEW TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments()
+    ''',
+    'DROP TRIGGER IF EXISTS help_request_search_comment_delete ON comments_comment',
+    '''
+    CREATE TRIGGER help_request_search_comment_delete AFTER DELETE ON comments_comment
+    REFERENCING OLD TABLE AS changed FOR EACH STATEMENT EXECUTE FUNCTION help_request_search_comments()
+    ''',
+    'UPDATE help_request_helprequest SET search_vector = help_request_search_vector(id, subject, text)',
+    'CREATE INDEX IF NOT EXISTS helpreq_search_idx ON help_request_helprequest USING gin (search_vector)',
+]
+
+# On SQLite an FTS5 table keyed by the request id.
+SQLITE_TABLE = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS help_request_search
+USING fts5(subject, text, comments, tokenize='porter unicode61')
+'''
+
+SQLITE_COMMENTS = (
+    "(SELECT coalesce(group_concat(message, ' '), '') FROM comments_comment WHERE help_request_id = {})"
+)
+
+SQLITE_TRIGGERS = {
+    'help_request_search_insert': '''
+        AFTER INSERT ON help_request_helprequest BEGIN
+            INSERT INTO help_request_search (rowid, subject, text, comments)
+            VALUES (new.id, new.subject, new.text, '');
+        END
+    ''',
+    'help_request_search_update': '''
+        AFTER UPDATE OF subject, text ON help_request_helprequest BEGIN
+            UPDATE help_request_search SET subject = new.subject, text = new.text WHERE rowid = new.id;
+        END
+    ''',
+    'help_request_search_delete': '''
+        AFTER DELETE ON help_request_helprequest BEGIN
+            DELETE FROM help_request_search WHERE rowid = old.id;
+        END
+    ''',
+    'help_request_search_comment_insert': '''
+        AFTER INSERT ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = comments || ' ' || new.message
+            WHERE rowid = new.help_request_id;
+        END
+    ''',
+    'help_request_search_comment_update': f'''
+        AFTER UPDATE OF message ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = {SQLITE_COMMENTS.format('new.help_request_id')}
+            WHERE rowid = new.help_request_id;
+        END
+    ''',
+    'help_request_search_comment_delete': f'''
+        AFTER DELETE ON comments_comment BEGIN
+            UPDATE help_request_search SET comments = {SQLITE_COMMENTS.format('old.help_request_id')}
+            WHERE rowid = old.help_request_id;
+        END
+    ''',
+}
+
+SQLITE_REBUILD = [
+    'DELETE FROM help_request_search',
+    f'''
+    INSERT INTO help_request_search (rowid, subject, text, comments)
+    SELECT id, subject, text, {SQLITE_COMMENTS.format('help_request_helprequest.id')} FROM help_request_helprequest
+    ''',
+]
+
+
+def install(connection):
+    """
+    Create the search index and the triggers that maintain it, and fill it.
+
+    Safe to run again. On SQLite, migrations that rebuild a table drop its
+    triggers, so this also runs after every migrate and refills the index
+    when triggers had to be recreated.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRESQL_SQL:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            cursor.execute(SQLITE_TABLE)
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+            for name in missing:
+                cursor.execute(f'CREATE TRIGGER {name} {SQLITE_TRIGGERS[name]}')
+            if missing:
+                for sql in SQLITE_REBUILD:
+                    cursor.execute(sql)
+
+
+def sqlite_match(query):
+    # Every word must match; quoting keeps FTS5 syntax in user input literal.
+    return ' '.join(f'"{term}"' for term in re.findall(r'\w+', query))
+
+
+def matching(queryset, query):
+    """Narrow `queryset` to the requests matching `query`, annotated with `rank` (higher is better)."""
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = 'websearch_to_tsquery(%s, %s)'
+        params = [SEARCH_CONFIG, query]
+        matches = RawSQL(f'{table}.search_vector @@ {tsquery}', params, output_field=BooleanField())
+        # float8 so the rank survives a round trip through keyset cursors.
+        rank = RawSQL(f'ts_rank({table}.search_vector, {tsquery})::float8', params, output_field=FloatField())
+    elif vendor == 'sqlite':
+        match = sqlite_match(query)
+        if not match:
+            return queryset.annotate(rank=Value(0.0, output_field=FloatField())).none()
+        matches = RawSQL(
+            f'{table}.id IN (SELECT rowid FROM help_request_search WHERE help_request_search MATCH %s)',
+            [match], output_field=BooleanField(),
+        )
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        rank = RawSQL(
+            f'(SELECT -bm25(help_request_search, {weights}) FROM help_request_search '
+            f'WHERE help_request_search MATCH %s AND rowid = {table}.id)',
+            [match], output_field=FloatField(),
+        )
+    else:
+        raise NotImplementedError(f'Search is not supported on {vendor}.')
+    return queryset.filter(matches).annotate(rank=rank)
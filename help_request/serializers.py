@@ -1,16 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import HelpRequest, DeclinedRequest
+from comments.serializers import CommentSerializer
+from . import transitions
+from .models import (
+    HelpRequest, DeclinedRequest, RequestClaim, StatusTransition, ChangeEvent, ChangeEntityChoices, StatusChoices,
+    PriorityChoices,
+)
 
 
 class RequestSerializer(serializers.ModelSerializer):
     status = serializers.CharField(read_only=True)
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
-    requester = serializers.CharField(read_only=True)
+    requester = serializers.CharField(source='requester.username', read_only=True)
 
     class Meta:
         model = HelpRequest
         fields = '__all__'
+        # Kept by the comment signals and repair_comment_counters.
+        read_only_fields = ['comment_count', 'last_activity_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('requester')
 
     def create(self, validated_data):
         validated_data['requester'] = self.context['request'].user
@@ -23,3 +38,121 @@ class DeclinedRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = DeclinedRequest
         fields = '__all__'
+
+
+class BulkCommentSerializer(serializers.Serializer):
+    help_request = serializers.IntegerField(min_value=1)
+    message = serializers.CharField()
+
+
+class BulkCommentsSerializer(serializers.Serializer):
+    comments = BulkCommentSerializer(many=True, allow_empty=False, max_length=settings.BULK_COMMENTS_MAX_ITEMS)
+
+
+class ClaimSerializer(serializers.ModelSerializer):
+    request = RequestSerializer(source='help_request', read_only=True)
+    admin = serializers.CharField(source='admin.username', read_only=True)
+
+    class Meta:
+        model = RequestClaim
+        fields = ['request', 'admin', 'expires_at']
+
+
+class BulkTransitionSerializer(serializers.Serializer):
+    TRANSITIONS = [
+        transitions.APPROVE.name,
+        transitions.DECLINE.name,
+        transitions.START_PROCESSING.name,
+        transitions.COMPLETE_PROCESSING.name,
+    ]
+
+    transition = serializers.ChoiceField(choices=TRANSITIONS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_TRANSITION_MAX_IDS,
+    )
+    comment = serializers.CharField(required=False)
+    comments = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate_comments(self, value):
+        try:
+            return {int(pk): comment for pk, comment in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("Keys must be request ids.")
+
+    def validate(self, data):
+        data['transition'] = transitions.TRANSITIONS[data['transition']]
+        if data['transition'] is transitions.DECLINE:
+            comments = data.get('comments', {})
+            shared = data.get('comment')
+            missing = [pk for pk in data['ids'] if pk not in comments and not shared]
+            if missing:
+                raise serializers.ValidationError({"comments": f"A reason of declining is required for {missing[:10]}."})
+            data['comments'] = {pk: comments.get(pk, shared) for pk in data['ids']}
+        return data
+
+
+class StatusTransitionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StatusTransition
+        fields = ['id', 'from_status', 'to_status', 'actor_id', 'duration', 'comment', 'created_at']
+
+
+class TransitionStatsSerializer(serializers.Serializer):
+    from_status = serializers.ChoiceField(choices=StatusChoices.CHOICES)
+    to_status = serializers.ChoiceField(choices=StatusChoices.CHOICES)
+    priority = serializers.ChoiceField(choices=PriorityChoices.CHOICES, required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, data):
+        # Days are half open, [since, until); the default is the last 30 days up to today.
+        data.setdefault('until', timezone.localdate() + timedelta(days=1))
+        data.setdefault('since', data['until'] - timedelta(days=30))
+        if data['since'] >= data['until']:
+            raise serializers.ValidationError({"since": "Must be before until."})
+        if (data['until'] - data['since']).days > settings.TRANSITION_STATS_MAX_DAYS:
+            raise serializers.ValidationError(
+                {"since": f"At most {settings.TRANSITION_STATS_MAX_DAYS} days can be requested at once."}
+            )
+        return data
+
+
+class ExportSerializer(serializers.Serializer):
+    # `type` rather than `format`, which DRF keeps for picking a renderer.
+    type = serializers.ChoiceField(choices=['ndjson', 'csv'], default='ndjson')
+    gzip = serializers.BooleanField(default=False)
+    status = serializers.ChoiceField(choices=StatusChoices.CHOICES, required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data.get('since') and data.get('until') and data['since'] >= data['until']:
+            raise serializers.ValidationError({"since": "Must be before until."})
+        return data
+
+
+class ChangeEventSerializer(serializers.ModelSerializer):
+    data = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChangeEvent
+        fields = ['id', 'entity', 'object_id', 'request_id', 'operation', 'status', 'created_at', 'data']
+
+    def get_data(self, event):
+        # Current state of the object, or None once it is gone.
+        return self.context['data'].get((event.entity, event.object_id))
+
+    @staticmethod
+    def serialize_objects(objects):
+        # One many=True pass per entity; a serializer per object costs far more.
+        data = {}
+        for entity, serializer_class in [
+            (ChangeEntityChoices.REQUEST, RequestSerializer),
+            (ChangeEntityChoices.COMMENT, CommentSerializer),
+        ]:
+            keys = [key for key in objects if key[0] == entity]
+            serialized = serializer_class([objects[key] for key in keys], many=True).data
+            data.update(zip(keys, serialized))
+        return data
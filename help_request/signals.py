@@ -0,0 +1,106 @@
+from collections import Counter
+
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from comments.models import Comment
+from . import changes, counters, history, response_cache, rollups, search
+from .models import HelpRequest, DeclinedRequest, ChangeOperationChoices
+
+# Sent by the transitions engine, whose set-wise UPDATEs bypass post_save,
+# with the status each changed request left by primary key, the acting user
+# and any decline reasons by primary key.
+status_changed = Signal()
+# Sent after comments were bulk created, which bypasses post_save, with the
+# new comments and a map from their requests' primary keys to the requesters.
+comments_created = Signal()
+
+
+def requester_ids(request_ids):
+    return HelpRequest.objects.filter(pk__in=request_ids).values_list('requester_id', flat=True).distinct()
+
+
+def related_requester_ids(instance, field_name):
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return [getattr(instance, field_name).requester_id]
+    return list(requester_ids([getattr(instance, field.attname)]))
+
+
+def operation(created=None):
+    if created is None:
+        return ChangeOperationChoices.DELETED
+    return ChangeOperationChoices.CREATED if created else ChangeOperationChoices.UPDATED
+
+
+@receiver([post_save, post_delete], sender=HelpRequest)
+def request_changed(sender, instance, created=None, **kwargs):
+    changes.record_request(instance, operation(created))
+    if created:
+        rollups.added(instance)
+    elif created is None:
+        rollups.removed(instance)
+    elif hasattr(instance, 'counted_as'):
+        rollups.moved([(instance.counted_as, instance.counted_key())])
+    response_cache.bump_for_requesters([instance.requester_id])
+
+
+@receiver([post_save, post_delete], sender=DeclinedRequest)
+def declined_request_changed(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, HelpRequest):
+        # Cascading from a deleted request, which invalidates on its own.
+        return
+    response_cache.bump_for_requesters(related_requester_ids(instance, 'declined_request'))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, created=None, origin=None, **kwargs):
+    if isinstance(origin, HelpRequest):
+        # Cascading from a deleted request: still leave a tombstone, but the
+        # request invalidates the cache on its own.
+        changes.record_comment(instance, origin.requester_id, operation(created))
+        return
+    if created:
+        counters.comment_added(instance)
+    elif created is None:
+        counters.comment_removed(instance)
+    ids = related_requester_ids(instance, 'help_request')
+    if ids:
+        changes.record_comment(instance, ids[0], operation(created))
+    response_cache.bump_for_requesters(ids)
+
+
+@receiver(status_changed, sender=HelpRequest)
+def request_status_changed(sender, previous, transition, user=None, comments=None, **kwargs):
+    requests = list(
+        history.with_last_transition(HelpRequest.objects.filter(pk__in=previous))
+        .values('pk', 'requester_id', 'priority', 'created_at', 'last_status', 'last_changed_at')
+    )
+    for request in requests:
+        request['status'] = previous[request['pk']]
+    rows = [(request['pk'], request['requester_id']) for request in requests]
+    changes.record_transition(rows, transition.target)
+    logged = history.record_transitions(requests, transition, user.pk if user else None, comments)
+    rollups.moved(
+        (
+            (request['requester_id'], request['created_at'], row.from_status, request['priority']),
+            (request['requester_id'], request['created_at'], row.to_status, request['priority']),
+        )
+        for request, row in zip(requests, logged)
+    )
+    response_cache.bump_for_requesters({requester_id for _, requester_id in rows})
+
+
+@receiver(comments_created, sender=Comment)
+def bulk_comments_created(sender, comments, requesters, **kwargs):
+    counters.comments_added(Counter(comment.help_request_id for comment in comments), comments[0].created_at)
+    changes.record_comments((comment, requesters[comment.help_request_id]) for comment in comments)
+    response_cache.bump_for_requesters(set(requesters.values()))
+
+
+def reinstall_search(sender, using, **kwargs):
+    # SQLite drops the search triggers whenever a migration rebuilds a table.
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        search.install(connection)
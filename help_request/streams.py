@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max, Q
+
+from comments.models import Comment
+from comments.serializers import CommentSerializer
+from . import changes
+from .models import ChangeEvent, ChangeEntityChoices, ChangeOperationChoices
+
+logger = logging.getLogger(__name__)
+
+# Status transitions and edits of requests, and new comments.
+STREAMED = (
+    Q(entity=ChangeEntityChoices.REQUEST, operation=ChangeOperationChoices.UPDATED)
+    | Q(entity=ChangeEntityChoices.COMMENT, operation=ChangeOperationChoices.CREATED)
+)
+
+Message = namedtuple('Message', ['id', 'requester_id', 'request_id', 'data'])
+
+
+def encode(event_id, name, payload):
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(payload)}\n\n'.encode()
+
+
+def messages(events):
+    """Encode events as SSE messages, once for every subscriber they go to."""
+    comment_ids = [event.object_id for event in events if event.entity == ChangeEntityChoices.COMMENT]
+    comments = Comment.objects.select_related('author').in_bulk(comment_ids) if comment_ids else {}
+
+    result = []
+    for event in events:
+        if event.entity == ChangeEntityChoices.REQUEST:
+            data = encode(event.id, 'status', {'request': event.request_id, 'status': event.status})
+        elif event.object_id in comments:
+            comment = CommentSerializer(comments[event.object_id]).data
+            data = encode(event.id, 'comment', {'request': event.request_id, 'comment': comment})
+        else:
+            # Deleted again before it could be sent.
+            continue
+        result.append(Message(event.id, event.requester_id, event.request_id, data))
+    return result
+
+
+def replay(user, after, until):
+    """Messages `user` missed between cursors `after` and `until`, or None if there are too many to replay."""
+    limit = settings.CHANGES_FEED_MAX_BATCH_SIZE
+    events = list(
+        changes.visible_events(user).filter(STREAMED, id__gt=after, id__lte=until).order_by('id')[:limit + 1]
+    )
+    if len(events) > limit:
+        return None
+    return messages(events)
+
+
+def poll(cursor):
+    events, has_more = changes.settled_after(ChangeEvent.objects.filter(STREAMED), cursor, settings.CHANGES_FEED_BATCH_SIZE)
+    return messages(events), (events[-1].id if events else cursor), has_more
+
+
+def latest_settled_id():
+    settled = ChangeEvent.objects.filter(created_at__lte=changes.settle_cutoff())
+    return settled.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def close_old_connections():
+    # django.db.close_old_connections, leaving alone connections inside a
+    # transaction (a test case's, say), which it would break.
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+def polled(function, *args):
+    """
+    Run `function` like a request would: broken connections are replaced
+    first, and those past CONN_MAX_AGE go back to the pool afterwards.
+    """
+    close_old_connections()
+    try:
+        return function(*args)
+    finally:
+        close_old_connections()
+
+
+class Subscription:
+    def __init__(self, user, request_id=None):
+        self.requester_id = None if user.is_superuser else user.pk
+        self.request_id = request_id
+        self.queue = asyncio.Queue(settings.STREAM_QUEUE_SIZE)
+        self.overflowed = False
+        self.cursor = 0
+
+    def wants(self, message):
+        if self.requester_id is not None and message.requester_id != self.requester_id:
+            return False
+        return self.request_id is None or message.request_id == self.request_id
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client this far behind is dropped and catches up on reconnect.
+            self.overflowed = True
+
+
+class Broadcaster:
+    """
+    Polls the change log for the whole process and fans new events out to every open stream.
+
+    The poller runs while there are subscribers, so idle streams cost a queue
+    each and no database work.
+    """
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.cursor = 0
+        self.task = None
+        self.loop = None
+        self.starting = None
+
+    async def subscribe(self, user, request_id=None):
+        subscription = Subscription(user, request_id)
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop, self.task, self.starting = loop, None, asyncio.Lock()
+        # Concurrent first subscribers would otherwise each start a poller.
+        async with self.starting:
+            if self.task is None or self.task.done():
+                self.cursor = await sync_to_async(latest_settled_id)()
+                self.task = loop.create_task(self.run())
+            # Everything after this cursor arrives through the queue.
+            subscription.cursor = self.cursor
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def dispatch(self, batch):
+        for message in batch:
+            for subscription in list(self.subscriptions):
+                if subscription.wants(message):
+                    subscription.push(message)
+
+    async def run(self):
+        while self.subscriptions:
+            try:
+                batch, cursor, has_more = await sync_to_async(polled)(poll, self.cursor)
+            except Exception:
+                # Streams stay open and resume from the same cursor.
+                logger.exception('Polling the change log failed.')
+                batch, cursor, has_more = [], self.cursor, False
+            self.cursor = cursor
+            self.dispatch(batch)
+            if not has_more:
+                await asyncio.sleep(settings.STREAM_POLL_SECONDS)
+
+
+broadcaster = Broadcaster()
+
+
+class ChangeWatcher:
+    """
+    Wakes long polls of the changes feed when the change log grows.
+
+    One query per STREAM_POLL_SECONDS for the whole process, while anybody
+    waits, stands in for one per waiting client; a woken client then reads
+    its own part of the feed.
+    """
+
+    def __init__(self):
+        # Highest settled event id seen by the poller.
+        self.latest = 0
+        self.waiting = 0
+        self.condition = None
+        self.task = None
+
+    async def wait(self, seen, timeout):
+        """Wait up to `timeout` seconds for an event above id `seen` to settle; False if none did."""
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.condition = asyncio.Condition()
+            self.task = loop.create_task(self.run())
+        self.waiting += 1
+        try:
+            async with self.condition:
+                return await asyncio.wait_for(self.condition.wait_for(lambda: self.latest > seen), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    async def run(self):
+        while self.waiting:
+            try:
+                latest = await sync_to_async(polled)(latest_settled_id)
+            except Exception:
+                logger.exception('Polling the change log failed.')
+                latest = self.latest
+            if latest > self.latest:
+                self.latest = latest
+                async with self.condition:
+                    self.condition.notify_all()
+            await asyncio.sleep(settings.STREAM_POLL_SECONDS)
+
+
+watcher = ChangeWatcher()
@@ -0,0 +1,13 @@
+from django.utils import timezone
+
+from help_request.models import HelpRequest, PriorityChoices
+
+
+def create_request(requester, age=None, **fields):
+    """Create a high-priority request for `requester`, `age` (a timedelta) old when given."""
+    fields.setdefault('subject', 'request')
+    fields.setdefault('text', 'text')
+    fields.setdefault('priority', PriorityChoices.HIGH)
+    if age is not None:
+        fields['created_at'] = timezone.now() - age
+    return HelpRequest.objects.create(requester=requester, **fields)
@@ -0,0 +1,139 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from comments.models import Comment
+from help_request.models import HelpRequest, StatusChoices, PriorityChoices
+from user_app.models import MyUser
+
+
+@override_settings(ROOT_URLCONF='helpdesk.urls_asgi', CHANGES_FEED_SETTLE_SECONDS=0, STREAM_POLL_SECONDS=0.01)
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.tokens = {user: Token.objects.create(user=user).key for user in (self.user, self.other, self.superuser)}
+        self.help_request = HelpRequest.objects.create(
+            subject='request', text='text', priority=PriorityChoices.HIGH, requester=self.user,
+            status=StatusChoices.IN_PROCESS,
+        )
+        HelpRequest.objects.create(subject='active', text='text', priority=PriorityChoices.LOW, requester=self.other)
+        self.comments = [
+            Comment.objects.create(message=f'comment {number}', author=self.superuser, help_request=self.help_request)
+            for number in range(3)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def headers(self, user):
+        return {'Authorization': f'Token {self.tokens[user]}'}
+
+    async def get(self, user, url, params=None, **headers):
+        headers = {**self.headers(user), **headers} if user else headers
+        return await self.async_client.get(url, params or {}, headers=headers)
+
+    def sync_get(self, user, url, params=None):
+        with override_settings(ROOT_URLCONF='helpdesk.urls'):
+            return self.client.get(url, params or {}, HTTP_AUTHORIZATION=f'Token {self.tokens[user]}')
+
+    async def test_read_paths_answer_like_the_sync_views(self):
+        comments = reverse('requests:create_comment', kwargs={'pk': self.help_request.pk})
+        cases = [
+            (self.superuser, reverse('requests:helprequest-list'), {'page_size': 1}),
+            (self.user, reverse('requests:helprequest-list'), {'status_type': StatusChoices.IN_PROCESS}),
+            (self.superuser, reverse('requests:rest_active'), None),
+            (self.superuser, reverse('requests:rest_for_restoration'), None),
+            (self.superuser, reverse('requests:rest_all_requests'), None),
+            (self.user, reverse('requests:helprequest-detail', kwargs={'pk': self.help_request.pk}), None),
+            (self.user, comments, {'ordering': '-created_at', 'page_size': 2}),
+            (self.user, comments, {'after': self.comments[0].pk}),
+            (self.user, reverse('requests:rest_changes'), {'limit': 2}),
+        ]
+        for user, url, params in cases:
+            with self.subTest(url=url, params=params):
+                await cache.aclear()
+                response = await self.get(user, url, params)
+                expected = await sync_to_async(self.sync_get)(user, url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    async def test_conditional_get(self):
+        for url in [
+            reverse('requests:helprequest-list'),
+            reverse('requests:helprequest-detail', kwargs={'pk': self.help_request.pk}),
+            reverse('requests:create_comment', kwargs={'pk': self.help_request.pk}),
+        ]:
+            with self.subTest(url=url):
+                etag = (await self.get(self.user, url))['ETag']
+                response = await self.get(self.user, url, If_None_Match=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response['ETag'], etag)
+
+    async def test_authentication_and_permissions(self):
+        url = reverse('requests:rest_active')
+        response = await self.get(None, url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        response = await self.get(None, url, Authorization='Token wrong')
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+        response = await self.get(self.user, url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        detail = reverse('requests:helprequest-detail', kwargs={'pk': self.help_request.pk})
+        self.assertEqual((await self.get(self.other, detail)).status_code, status.HTTP_404_NOT_FOUND)
+        comments = reverse('requests:create_comment', kwargs={'pk': self.help_request.pk})
+        self.assertEqual((await self.get(self.other, comments)).status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_invalid_parameters(self):
+        comments = reverse('requests:create_comment', kwargs={'pk': self.help_request.pk})
+        response = await self.get(self.user, comments, {'after': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'after': 'Must be the id of a comment of this request.'})
+        response = await self.get(self.user, reverse('requests:helprequest-list'), {'ordering': 'subject'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await self.get(self.user, reverse('requests:rest_changes'), {'wait': 'soon'})
+        self.assertEqual(response.json(), {'error': 'wait must be a number of seconds.'})
+
+    async def test_writes_go_to_the_sync_views(self):
+        response = await self.async_client.post(
+            reverse('requests:helprequest-list'),
+            {'subject': 'new', 'text': 'text', 'priority': PriorityChoices.LOW},
+            headers=self.headers(self.user), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['requester'], 'testUser')
+
+        response = await self.async_client.post(
+            reverse('requests:create_comment', kwargs={'pk': self.help_request.pk}), {'message': 'hello'},
+            headers=self.headers(self.user), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def test_changes_long_poll(self):
+        url = reverse('requests:rest_changes')
+        cursor = (await self.get(self.user, url)).json()['cursor']
+
+        response = await self.get(self.user, url, {'since': cursor, 'wait': 0.05})
+        self.assertEqual(response.json(), {'cursor': cursor, 'has_more': False, 'results': []})
+
+        poll = asyncio.ensure_future(self.get(self.user, url, {'since': cursor, 'wait': 5}))
+        await asyncio.sleep(0.05)
+        # Invisible to the user, so it does not end the poll.
+        await HelpRequest.objects.acreate(subject='hidden', text='text', requester=self.other)
+        await asyncio.sleep(0.05)
+        self.assertFalse(poll.done())
+        comment = await Comment.objects.acreate(message='new', author=self.superuser, help_request=self.help_request)
+        response = await asyncio.wait_for(poll, 5)
+        self.assertEqual(
+            [(row['entity'], row['object_id']) for row in response.json()['results']], [('comment', comment.pk)],
+        )
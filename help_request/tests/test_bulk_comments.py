@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comments.models import Comment
+from help_request import counters
+from help_request.models import HelpRequest, StatusChoices, ChangeEvent, ChangeEntityChoices
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class BulkCommentsTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.open = create_request(self.user, status=StatusChoices.IN_PROCESS)
+        self.closed = create_request(self.user, status=StatusChoices.COMPLETED)
+        self.someone_elses = create_request(self.other, status=StatusChoices.IN_PROCESS)
+        self.url = reverse('requests:rest_bulk_comments')
+
+    def post(self, user, *items):
+        self.client.force_authenticate(user=user)
+        comments = [{'help_request': pk, 'message': message} for pk, message in items]
+        return self.client.post(self.url, {'comments': comments}, format='json')
+
+    def test_outcome_per_item(self):
+        response = self.post(
+            self.user, (self.open.pk, 'one'), (self.closed.pk, 'two'), (self.someone_elses.pk, 'three'),
+            (999999, 'four'), (self.open.pk, 'five'),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(
+            [result['outcome'] for result in results], ['done', 'conflict', 'forbidden', 'not found', 'done'],
+        )
+        self.assertEqual(
+            list(self.open.comments.order_by('id').values_list('id', 'message')),
+            [(results[0]['id'], 'one'), (results[4]['id'], 'five')],
+        )
+        self.assertIsNone(results[1]['id'])
+
+        self.open.refresh_from_db()
+        self.assertEqual(self.open.comment_count, 2)
+        self.assertFalse(counters.stale(HelpRequest.objects.all()).exists())
+        self.assertEqual(
+            ChangeEvent.objects.filter(entity=ChangeEntityChoices.COMMENT, request_id=self.open.pk).count(), 2,
+        )
+
+    def test_admin_comments_on_any_open_request(self):
+        response = self.post(self.superuser, (self.open.pk, 'one'), (self.someone_elses.pk, 'two'))
+        self.assertEqual([result['outcome'] for result in response.data['results']], ['done', 'done'])
+        self.assertEqual(Comment.objects.filter(author=self.superuser).count(), 2)
+
+    def test_query_count_does_not_depend_on_items(self):
+        requests = [create_request(self.user, status=StatusChoices.IN_PROCESS) for _ in range(10)]
+        items = [(help_request.pk, f'comment {index}') for index in range(3) for help_request in requests]
+        with CaptureQueriesContext(connection) as few:
+            self.post(self.user, *items[:2])
+        with CaptureQueriesContext(connection) as many:
+            self.post(self.user, *items)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(Comment.objects.count(), 32)
+        self.assertFalse(counters.stale(HelpRequest.objects.all()).exists())
+
+    def test_invalid_payload(self):
+        self.client.force_authenticate(user=self.user)
+        for payload in [{}, {'comments': []}, {'comments': [{'help_request': self.open.pk}]},
+                        {'comments': [{'help_request': 0, 'message': 'one'}]}]:
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comments.models import Comment
+from help_request import transitions
+from help_request.models import HelpRequest, ChangeEvent, StatusChoices
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+@override_settings(CHANGES_FEED_SETTLE_SECONDS=0)
+class ChangesFeedTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = create_request(self.user)
+        self.url = reverse('requests:rest_changes')
+
+    def changes(self, user, **params):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def summary(self, data):
+        return [(row['entity'], row['object_id'], row['operation']) for row in data['results']]
+
+    def test_created_updated_and_transitioned(self):
+        cursor = self.changes(self.user)['cursor']
+        self.help_request.subject = 'changed'
+        self.help_request.save()
+        transitions.apply(transitions.APPROVE, self.help_request.pk, self.superuser)
+
+        data = self.changes(self.user, since=cursor)
+        self.assertEqual(self.summary(data), [('request', self.help_request.pk, 'updated')])
+        self.assertEqual(data['results'][0]['status'], StatusChoices.APPROVED)
+        self.assertEqual(data['results'][0]['data']['subject'], 'changed')
+        self.assertEqual(self.changes(self.user, since=data['cursor'])['results'], [])
+
+    def test_users_only_see_their_requests(self):
+        other_request = create_request(self.other)
+        self.assertEqual(self.summary(self.changes(self.user)), [('request', self.help_request.pk, 'created')])
+        self.assertEqual(
+            self.summary(self.changes(self.superuser)),
+            [('request', self.help_request.pk, 'created'), ('request', other_request.pk, 'created')],
+        )
+
+    def test_deletes_leave_tombstones(self):
+        self.help_request.status = StatusChoices.IN_PROCESS
+        self.help_request.save()
+        comment = Comment.objects.create(message='comment', author=self.superuser, help_request=self.help_request)
+        cursor = self.changes(self.user)['cursor']
+        pk = self.help_request.pk
+
+        self.help_request.delete()
+        data = self.changes(self.user, since=cursor)
+        self.assertEqual(self.summary(data), [('comment', comment.pk, 'deleted'), ('request', pk, 'deleted')])
+        self.assertIsNone(data['results'][1]['data'])
+
+    def test_batches_resume_from_cursor(self):
+        for _ in range(4):
+            create_request(self.user)
+        first = self.changes(self.user, limit=3)
+        self.assertTrue(first['has_more'])
+        second = self.changes(self.user, since=first['cursor'], limit=3)
+        self.assertFalse(second['has_more'])
+        ids = [row['object_id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, list(HelpRequest.objects.filter(requester=self.user).order_by('id')
+                                   .values_list('id', flat=True)))
+
+    @override_settings(CHANGES_FEED_SETTLE_SECONDS=60)
+    def test_recent_events_are_held_back(self):
+        data = self.changes(self.user)
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['cursor'], 0)
+        self.assertTrue(ChangeEvent.objects.exists())
+
+    @override_settings(CHANGES_FEED_SETTLE_SECONDS=1)
+    def test_transactions_slower_than_the_settle_time(self):
+        def commit(event, seconds_ago):
+            event.created_at = timezone.now() - timedelta(seconds=seconds_ago)
+            ChangeEvent.objects.bulk_create([event])
+
+        def requests(data):
+            return [row['object_id'] for row in data['results']]
+
+        # The slow transaction took the lower id but commits after the fast one.
+        slow, fast = self.help_request, create_request(self.user)
+        events = list(ChangeEvent.objects.order_by('id'))
+        ChangeEvent.objects.all().delete()
+        commit(events[1], 0.5)
+        self.assertEqual(self.changes(self.user)['cursor'], 0)
+        commit(events[0], 0.5)
+        ChangeEvent.objects.update(created_at=timezone.now() - timedelta(seconds=2))
+        data = self.changes(self.user)
+        self.assertEqual(requests(data), [slow.pk, fast.pk])
+
+        # Committing later than the settle time, it lands behind the cursor.
+        slow, fast = create_request(self.user), create_request(self.user)
+        events = list(ChangeEvent.objects.filter(id__gt=data['cursor']).order_by('id'))
+        ChangeEvent.objects.filter(id__gt=data['cursor']).delete()
+        commit(events[1], 2)
+        data = self.changes(self.user, since=data['cursor'])
+        self.assertEqual(requests(data), [fast.pk])
+        commit(events[0], 2)
+        self.assertEqual(requests(self.changes(self.user, since=data['cursor'])), [])
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url, {'since': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'since': -1}).status_code, status.HTTP_400_BAD_REQUEST)
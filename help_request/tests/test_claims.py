@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from help_request import claims
+from help_request.models import RequestClaim, StatusChoices, PriorityChoices
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class ClaimQueueTest(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.admin = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.other_admin = MyUser.objects.create_superuser(username='otherAdmin', password='adminPassword')
+
+    def test_priority_then_age(self):
+        low = create_request(self.user, priority=PriorityChoices.LOW, age=timedelta(hours=10))
+        high_new = create_request(self.user, age=timedelta(hours=1))
+        high_old = create_request(self.user, status=StatusChoices.FOR_RESTORATION, age=timedelta(hours=2))
+        create_request(self.user, status=StatusChoices.APPROVED, age=timedelta(hours=3))
+        create_request(self.admin, age=timedelta(hours=4))
+
+        claimed = [claims.claim_next(self.admin).pk for _ in range(3)]
+        self.assertEqual(claimed, [high_old.pk, high_new.pk, low.pk])
+        self.assertIsNone(claims.claim_next(self.admin))
+
+    def test_admins_get_different_requests(self):
+        first = create_request(self.user, age=timedelta(hours=2))
+        second = create_request(self.user, age=timedelta(hours=1))
+        self.assertEqual(claims.claim_next(self.admin).pk, first.pk)
+        self.assertEqual(claims.claim_next(self.other_admin).pk, second.pk)
+        self.assertIsNone(claims.claim_next(self.other_admin))
+
+    def test_expired_claim_is_taken_over(self):
+        help_request = create_request(self.user)
+        claims.claim_next(self.admin)
+        RequestClaim.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        claim = claims.claim_next(self.other_admin)
+        self.assertEqual(claim.pk, help_request.pk)
+        self.assertEqual(RequestClaim.objects.get().admin, self.other_admin)
+        self.assertIsNone(claims.renew(help_request.pk, self.admin))
+
+    def test_renew_and_release(self):
+        help_request = create_request(self.user)
+        claim = claims.claim_next(self.admin)
+        self.assertIsNone(claims.renew(help_request.pk, self.other_admin))
+        self.assertGreaterEqual(claims.renew(help_request.pk, self.admin), claim.expires_at)
+
+        self.assertFalse(claims.release(help_request.pk, self.other_admin))
+        self.assertTrue(claims.release(help_request.pk, self.admin))
+        self.assertEqual(claims.claim_next(self.other_admin).pk, help_request.pk)
+
+    def test_reviewed_requests_leave_the_queue(self):
+        help_request = create_request(self.user)
+        claims.claim_next(self.admin)
+        self.client.force_login(self.admin)
+        self.client.get(reverse('requests:approve_request_view', args=[help_request.pk]))
+        RequestClaim.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(claims.claim_next(self.other_admin))
+
+    def test_claim_next_page(self):
+        help_request = create_request(self.user)
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('requests:claim_next_request_view'))
+        self.assertRedirects(response, reverse('requests:request_detail_view', args=[help_request.pk]))
+        response = self.client.get(reverse('requests:claim_next_request_view'))
+        self.assertRedirects(response, reverse('main_view'), fetch_redirect_response=False)
+
+
+class RestClaimTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.admin = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = create_request(self.user)
+
+    def test_claim_renew_release(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse('requests:rest_claim_next'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['request']['id'], self.help_request.pk)
+        self.assertEqual(response.data['admin'], self.admin.username)
+        response = self.client.post(reverse('requests:rest_claim_next'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        url = reverse('requests:rest_claim', args=[self.help_request.pk])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['request'], self.help_request.pk)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_admins_only(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('requests:rest_claim_next'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
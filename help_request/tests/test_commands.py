@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase
+
+from comments.models import Comment
+from help_request import counters, rollups
+from help_request.models import (
+    HelpRequest, DeclinedRequest, ChangeEvent, StatusTransition, StatusChoices, ChangeEntityChoices,
+)
+from user_app.models import MyUser
+
+
+class SeedHelpdeskCommandTest(TestCase):
+    def seed(self, **options):
+        options = {'users': 5, 'admins': 2, 'requests': 120, 'batch_size': 50, 'end': '2024-01-01', **options}
+        call_command('seed_helpdesk', stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return list(HelpRequest.objects.order_by('id').values_list('subject', 'status', 'priority', 'created_at'))
+
+    def test_creates_consistent_dataset(self):
+        self.seed()
+        self.assertEqual(MyUser.objects.filter(is_superuser=False).count(), 5)
+        self.assertEqual(MyUser.objects.filter(is_superuser=True).count(), 2)
+        self.assertEqual(HelpRequest.objects.count(), 120)
+        self.assertEqual(
+            DeclinedRequest.objects.count(),
+            HelpRequest.objects.filter(status=StatusChoices.DECLINED).count(),
+        )
+        self.assertFalse(Comment.objects.exclude(
+            help_request__status__in=[StatusChoices.IN_PROCESS, StatusChoices.COMPLETED],
+        ).exists())
+        self.assertFalse(HelpRequest.objects.exclude(updated_at=F('created_at')).exists())
+        self.assertEqual(
+            ChangeEvent.objects.filter(entity=ChangeEntityChoices.REQUEST).count(), HelpRequest.objects.count(),
+        )
+        self.assertEqual(
+            set(ChangeEvent.objects.filter(entity=ChangeEntityChoices.COMMENT).values_list('object_id', flat=True)),
+            set(Comment.objects.values_list('id', flat=True)),
+        )
+        self.assertFalse(counters.stale(HelpRequest.objects.all()).exists())
+        self.assertEqual(rollups.reconcile(HelpRequest.objects.all()), 0)
+        # Every history ends in the request's status.
+        last_status = dict(StatusTransition.objects.order_by('id').values_list('request_id', 'to_status'))
+        self.assertEqual(
+            last_status, dict(HelpRequest.objects.exclude(status=StatusChoices.ACTIVE).values_list('id', 'status')),
+        )
+
+    def test_same_seed_is_deterministic(self):
+        self.seed(seed=7)
+        first = self.snapshot()
+        HelpRequest.objects.all().delete()
+        self.seed(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_custom_weights(self):
+        self.seed(status_weights='Active=1', priority_weights='High=1')
+        self.assertEqual(set(HelpRequest.objects.values_list('status', 'priority').distinct()),
+                         {(StatusChoices.ACTIVE, 'High')})
+
+    def test_unknown_weight(self):
+        with self.assertRaises(CommandError):
+            self.seed(status_weights='Lost=1')
+
+
+class RepairCommentCountersCommandTest(TestCase):
+    def test_repairs_bulk_written_comments(self):
+        call_command('seed_helpdesk', users=3, admins=1, requests=40, end='2024-01-01', stdout=StringIO())
+        commented = HelpRequest.objects.filter(comment_count__gt=0).first()
+        # bulk_create bypasses the signals that keep the counters.
+        Comment.objects.bulk_create([
+            Comment(message='bulk', author=commented.requester, help_request=commented) for _ in range(3)
+        ])
+        HelpRequest.objects.filter(pk=commented.pk).update(comment_count=0)
+
+        out = StringIO()
+        call_command('repair_comment_counters', dry_run=True, stdout=out)
+        self.assertEqual(out.getvalue().strip(), '1 requests have wrong comment counters.')
+
+        out = StringIO()
+        call_command('repair_comment_counters', batch_size=7, stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Repaired comment counters of 1 requests.')
+        commented.refresh_from_db()
+        self.assertEqual(commented.comment_count, commented.comments.count())
+        self.assertEqual(commented.last_activity_at, commented.comments.latest('created_at').created_at)
+        self.assertFalse(counters.stale(HelpRequest.objects.all()).exists())
@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comments.models import Comment
+from help_request.models import HelpRequest, StatusChoices, PriorityChoices
+from user_app.models import MyUser
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = HelpRequest.objects.create(
+            subject='request',
+            text='text',
+            priority=PriorityChoices.HIGH,
+            requester=self.user,
+            status=StatusChoices.IN_PROCESS,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.detail_url = reverse('requests:helprequest-detail', kwargs={'pk': self.help_request.pk})
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_not_modified(self):
+        url = reverse('requests:helprequest-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('Authorization', response['Vary'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_lists_send_no_last_modified(self):
+        comments_url = reverse('requests:create_comment', args=[self.help_request.pk])
+        for url in [reverse('requests:helprequest-list'), comments_url]:
+            response = self.client.get(url)
+            self.assertNotIn('Last-Modified', response)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_changes_etag(self):
+        url = reverse('requests:helprequest-list')
+        etag = self.client.get(url)['ETag']
+        HelpRequest.objects.create(subject='new', text='text', priority=PriorityChoices.LOW, requester=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_of_someone_else_is_still_hidden(self):
+        other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_if_match_is_rejected(self):
+        etag = self.client.get(self.detail_url)['ETag']
+
+        response = self.client.patch(self.detail_url, {'subject': 'first'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.patch(self.detail_url, {'subject': 'second'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.subject, 'first')
+
+    def test_conditional_writes_lock_the_row(self):
+        locked = []
+        select_for_update = QuerySet.select_for_update
+
+        def spy(queryset, *args, **kwargs):
+            locked.append((queryset.model, connection.in_atomic_block))
+            return select_for_update(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'select_for_update', spy):
+            etag = self.client.get(self.detail_url)['ETag']
+            self.assertEqual(locked, [])
+            response = self.client.patch(self.detail_url, {'subject': 'first'}, HTTP_IF_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.delete(self.detail_url, HTTP_IF_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(locked, [(HelpRequest, True)] * 2)
+
+    def test_comments_not_modified_until_new_comment(self):
+        url = reverse('requests:create_comment', kwargs={'pk': self.help_request.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Comment.objects.create(message='comment', author=self.user, help_request=self.help_request)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
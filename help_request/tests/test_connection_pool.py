@@ -0,0 +1,187 @@
+import threading
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import SimpleTestCase
+from django.urls import reverse
+from psycopg2 import extensions
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from helpdesk.pooled_postgresql import base
+from helpdesk.pooled_postgresql.pool import ConnectionPool, PoolTimeout
+from user_app.models import MyUser
+
+
+class FakeConnection:
+    def __init__(self):
+        self.usable = True
+        self.dirty = False
+        self.closed = False
+
+
+class FakePool(ConnectionPool):
+    def is_usable(self, connection):
+        return connection.usable
+
+    def reset(self, connection):
+        if not connection.usable:
+            return False
+        connection.dirty = False
+        return True
+
+    def close(self, connection):
+        connection.closed = True
+
+
+class ConnectionPoolWaitTest(SimpleTestCase):
+    def test_waits_for_a_connection_then_times_out(self):
+        pool = FakePool(size=1, timeout=0.05, max_lifetime=100, check_after=10)
+        first = pool.checkout(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+
+        returned = threading.Timer(0.01, pool.checkin, [first])
+        returned.start()
+        self.assertIs(pool.checkout(FakeConnection), first)
+        returned.join()
+        stats = pool.stats()
+        self.assertEqual((stats['waits'], stats['timeouts'], stats['opened']), (2, 1, 1))
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('helpdesk.pooled_postgresql.pool.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = FakePool(size=2, timeout=0.05, max_lifetime=100, check_after=10)
+
+    def test_reuses_returned_connections(self):
+        first = self.pool.checkout(FakeConnection)
+        first.dirty = True
+        self.pool.checkin(first)
+        self.assertIs(self.pool.checkout(FakeConnection), first)
+        self.assertFalse(first.dirty)
+        stats = self.pool.stats()
+        self.assertEqual((stats['checkouts'], stats['opened'], stats['open'], stats['in_use']), (2, 1, 1, 1))
+
+    def test_replaces_expired_connections(self):
+        first = self.pool.checkout(FakeConnection)
+        self.pool.checkin(first)
+        self.now += 101
+        second = self.pool.checkout(FakeConnection)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(self.pool.stats()['discarded_expired'], 1)
+        self.assertEqual(self.pool.stats()['open'], 1)
+
+    def test_checks_connections_idle_for_long(self):
+        first = self.pool.checkout(FakeConnection)
+        self.pool.checkin(first)
+        self.now += 5
+        self.assertIs(self.pool.checkout(FakeConnection), first)
+        self.pool.checkin(first)
+        self.now += 11
+        first.usable = False
+        second = self.pool.checkout(FakeConnection)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        stats = self.pool.stats()
+        self.assertEqual((stats['health_checks'], stats['discarded_unusable'], stats['open']), (1, 1, 1))
+
+    def test_discards_broken_connections(self):
+        first = self.pool.checkout(FakeConnection)
+        second = self.pool.checkout(FakeConnection)
+        first.usable = False
+        self.pool.checkin(first)
+        self.pool.discard(second)
+        self.assertTrue(first.closed and second.closed)
+        self.assertEqual(self.pool.stats()['open'], 0)
+        self.assertIsNot(self.pool.checkout(FakeConnection), first)
+
+    def test_failed_connect_frees_its_slot(self):
+        def fail():
+            raise OSError('refused')
+
+        for _ in range(3):
+            with self.assertRaises(OSError):
+                self.pool.checkout(fail)
+        self.pool.checkout(FakeConnection)
+        self.pool.checkout(FakeConnection)
+        self.assertEqual(self.pool.stats()['open'], 2)
+
+    def test_close_all(self):
+        idle = self.pool.checkout(FakeConnection)
+        in_use = self.pool.checkout(FakeConnection)
+        self.pool.checkin(idle)
+        self.pool.close_all()
+        self.assertTrue(idle.closed)
+        self.assertFalse(in_use.closed)
+        self.pool.checkin(in_use)
+        self.assertTrue(in_use.closed)
+        self.assertEqual(self.pool.stats()['idle'], 0)
+
+
+class PooledDatabaseWrapperTest(SimpleTestCase):
+    def setUp(self):
+        self.connect = mock.patch.object(
+            base.base.DatabaseWrapper, 'get_new_connection', side_effect=self.new_connection,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        self.addCleanup(base.close_pools)
+
+    def new_connection(self, conn_params):
+        connection = mock.MagicMock(closed=0, autocommit=True)
+        connection.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+        connection.info.parameter_status.return_value = 'UTC'
+        connection.info.server_version = 150000
+        return connection
+
+    def wrapper(self, size=1):
+        settings_dict = {
+            'ENGINE': 'helpdesk.pooled_postgresql', 'NAME': 'pooltest', 'USER': '', 'PASSWORD': '',
+            'HOST': 'localhost', 'PORT': '', 'OPTIONS': {}, 'TIME_ZONE': None, 'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False, 'TEST': {},
+            'POOL': {'SIZE': size, 'TIMEOUT': 0.01},
+        }
+        return base.DatabaseWrapper(settings_dict, alias='pooltest')
+
+    def test_close_returns_the_connection_to_the_pool(self):
+        first, second = self.wrapper(), self.wrapper()
+        first.connect()
+        connection = first.connection
+        first.close()
+        connection.close.assert_not_called()
+
+        second.connect()
+        self.assertIs(second.connection, connection)
+        self.assertEqual(self.connect.call_count, 1)
+        with self.assertRaisesMessage(OperationalError, 'No database connection was free'):
+            first.ensure_connection()
+        self.assertEqual(second.pool_stats()['timeouts'], 1)
+
+    def test_close_in_atomic_block_discards(self):
+        wrapper = self.wrapper()
+        wrapper.connect()
+        connection = wrapper.connection
+        wrapper.in_atomic_block = True
+        wrapper.close()
+        wrapper.in_atomic_block = False
+        connection.close.assert_called_once()
+        self.assertEqual(wrapper.pool_stats()['open'], 0)
+
+
+class DatabasePoolStatsViewTest(APITestCase):
+    def test_admin_only(self):
+        user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        admin = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        url = reverse('requests:rest_db_pool_stats')
+
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Only the pooled backend reports; the test databases may use another engine.
+        self.assertTrue(all('checkouts' in stats for stats in response.data.values()))
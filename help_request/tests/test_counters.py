@@ -0,0 +1,144 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comments.models import Comment
+from help_request import counters
+from help_request.models import HelpRequest, StatusChoices, ChangeEvent
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class CommentCountersTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = create_request(self.user, status=StatusChoices.IN_PROCESS)
+
+    def tearDown(self):
+        cache.clear()
+
+    def comment(self, help_request=None, **kwargs):
+        return Comment.objects.create(
+            message='comment', author=self.superuser, help_request=help_request or self.help_request, **kwargs,
+        )
+
+    def test_create_and_delete(self):
+        first = self.comment(created_at=self.help_request.created_at + timedelta(hours=1))
+        second = self.comment(created_at=self.help_request.created_at + timedelta(hours=2))
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.comment_count, 2)
+        self.assertEqual(self.help_request.last_activity_at, second.created_at)
+
+        second.delete()
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.comment_count, 1)
+        self.assertEqual(self.help_request.last_activity_at, first.created_at)
+
+        first.delete()
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.comment_count, 0)
+        self.assertEqual(self.help_request.last_activity_at, self.help_request.created_at)
+
+    def test_counter_rolls_back_with_the_comment(self):
+        with mock.patch('help_request.changes.record_comment', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.comment()
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.comment_count, 0)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_edit_keeps_counters(self):
+        comment = self.comment()
+        comment.message = 'edited'
+        comment.save()
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.comment_count, 1)
+        self.assertFalse(counters.stale(HelpRequest.objects.all()).exists())
+
+    def test_rest_edit_cannot_set_counters(self):
+        self.comment()
+        self.help_request.refresh_from_db()
+        last_activity_at = self.help_request.last_activity_at
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(
+            reverse('requests:helprequest-detail', kwargs={'pk': self.help_request.pk}),
+            {'subject': 'changed', 'comment_count': 999, 'last_activity_at': '2099-01-01T00:00:00Z'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.help_request.refresh_from_db()
+        self.assertEqual(
+            (self.help_request.subject, self.help_request.comment_count, self.help_request.last_activity_at),
+            ('changed', 1, last_activity_at),
+        )
+
+    def test_request_delete_cascades(self):
+        self.comment()
+        self.help_request.delete()
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(ChangeEvent.objects.filter(operation='deleted', entity='comment').exists())
+
+    def list(self, **params):
+        self.client.force_authenticate(user=self.superuser)
+        response = self.client.get(reverse('requests:helprequest-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_rest_ordering_and_filters(self):
+        quiet = create_request(self.user, age=timedelta(days=2))
+        busy = create_request(self.user, age=timedelta(days=3))
+        for _ in range(3):
+            self.comment(busy)
+
+        ids = [row['id'] for row in self.list(ordering='-comment_count').data['results']]
+        self.assertEqual(ids[0], busy.pk)
+        ids = [row['id'] for row in self.list(ordering='-last_activity_at').data['results']]
+        self.assertEqual(ids, [busy.pk, self.help_request.pk, quiet.pk])
+
+        results = self.list(min_comments=1).data['results']
+        self.assertEqual([(row['id'], row['comment_count']) for row in results], [(busy.pk, 3)])
+        results = self.list(active_before=(timezone.now() - timedelta(days=1)).isoformat()).data['results']
+        self.assertEqual([row['id'] for row in results], [quiet.pk])
+
+    def test_rest_ordering_pages(self):
+        for days in range(5):
+            self.comment(create_request(self.user, age=timedelta(days=days)))
+        response = self.list(ordering='last_activity_at', page_size=2)
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [row['id'] for row in response.data['results']]
+        expected = HelpRequest.objects.order_by('last_activity_at', 'id').values_list('id', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_rest_invalid_params(self):
+        self.client.force_authenticate(user=self.superuser)
+        url = reverse('requests:helprequest-list')
+        for params in [
+            {'ordering': 'subject'}, {'min_comments': '-1'}, {'max_comments': '²'}, {'active_after': 'yesterday'},
+        ]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_new_comment_changes_etags(self):
+        self.client.force_authenticate(user=self.superuser)
+        list_url = reverse('requests:helprequest-list')
+        detail_url = reverse('requests:helprequest-detail', args=[self.help_request.pk])
+        list_etag = self.client.get(list_url)['ETag']
+        detail_etag = self.client.get(detail_url)['ETag']
+
+        self.comment()
+
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['comment_count'], 1)
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
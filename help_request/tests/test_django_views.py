@@ -1,8 +1,11 @@
+from django.db import connection
 from django.http import HttpResponseRedirect
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
+from comments.models import Comment
 from help_request.models import StatusChoices, HelpRequest, PriorityChoices, DeclinedRequest
 
 UserModel = get_user_model()
@@ -94,6 +97,75 @@ class AllRequestsViewTest(TestCase):
         self.assertIsInstance(response, HttpResponseRedirect)
 
 
+@override_settings(BOARD_COLUMN_SIZE=3)
+class BoardViewTestCase(TestCase):
+    def setUp(self):
+        self.superuser = UserModel.objects.create_superuser(
+            username="admin",
+            password="adminPassword",
+        )
+        self.user = UserModel.objects.create_user(
+            username="testUser",
+            password="testPassword",
+        )
+        self.client.login(username=self.superuser.username, password="adminPassword")
+
+    def add_requests(self, count, priority):
+        for i in range(count):
+            HelpRequest.objects.create(
+                subject=f"{priority} {i}",
+                text="text",
+                requester=self.user,
+                priority=priority,
+            )
+
+    def test_columns_are_bounded_pages(self):
+        self.add_requests(5, PriorityChoices.LOW)
+        self.add_requests(2, PriorityChoices.HIGH)
+        response = self.client.get(reverse('requests:all_request_view'))
+        columns = {column['priority']: column for column in response.context['columns']}
+        self.assertEqual(len(columns[PriorityChoices.LOW]['requests']), 3)
+        self.assertIsNotNone(columns[PriorityChoices.LOW]['next_url'])
+        self.assertEqual(columns[PriorityChoices.MEDIUM]['requests'], [])
+        self.assertEqual(len(columns[PriorityChoices.HIGH]['requests']), 2)
+        self.assertIsNone(columns[PriorityChoices.HIGH]['next_url'])
+
+    def test_column_fragment_loads_the_rest(self):
+        self.add_requests(5, PriorityChoices.LOW)
+        url = reverse('requests:all_request_view')
+        response = self.client.get(url)
+        first = response.context['columns'][0]
+
+        response = self.client.get(url + first['next_url'])
+        self.assertTemplateUsed(response, 'request_board_column.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        rest = response.context['column']
+        self.assertIsNone(rest['next_url'])
+
+        seen = first['requests'] + rest['requests']
+        expected = list(HelpRequest.objects.filter(priority=PriorityChoices.LOW).order_by('-created_at', '-id'))
+        self.assertEqual(seen, expected)
+
+    def test_unknown_column(self):
+        response = self.client.get(reverse('requests:all_request_view') + '?column=Urgent')
+        self.assertEqual(response.status_code, 404)
+
+    def test_fragment_requires_access(self):
+        self.client.login(username=self.user.username, password="testPassword")
+        response = self.client.get(reverse('requests:all_request_view') + f'?column={PriorityChoices.LOW}')
+        self.assertRedirects(response, reverse('main_view'))
+
+    def test_query_count_does_not_depend_on_rows(self):
+        url = reverse('requests:all_request_view')
+        self.add_requests(1, PriorityChoices.LOW)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        self.add_requests(10, PriorityChoices.MEDIUM)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url)
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+
+
 class RequestDetailViewTestCase(TestCase):
     def setUp(self):
         self.superuser = UserModel.objects.create_superuser(
@@ -129,6 +201,38 @@ class RequestDetailViewTestCase(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertRedirects(response, reverse('user:not_authenticated_view'))
 
+    def add_comments(self, count):
+        for i in range(count):
+            author = UserModel.objects.create_user(username=f"author{UserModel.objects.count()}", password="password")
+            Comment.objects.create(message=f"comment{i}", author=author, help_request=self.request)
+
+    def count_queries(self, method, data=None):
+        url = reverse('requests:request_detail_view', kwargs={'pk': self.request.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_comments(self):
+        self.client.login(username=self.superuser.username, password="adminPassword")
+        self.add_comments(1)
+        few = self.count_queries('get')
+        self.add_comments(20)
+        self.assertEqual(self.count_queries('get'), few)
+
+        # An invalid comment renders the page again.
+        few_invalid = self.count_queries('post', {'comment': ''})
+        self.add_comments(20)
+        self.assertEqual(self.count_queries('post', {'comment': ''}), few_invalid)
+
+    def test_comments_are_rendered_in_order(self):
+        self.client.login(username=self.user.username, password="testPassword")
+        self.add_comments(3)
+        response = self.client.get(reverse('requests:request_detail_view', kwargs={'pk': self.request.pk}))
+        content = response.content.decode()
+        self.assertLess(content.index("comment0"), content.index("comment1"))
+        self.assertLess(content.index("comment1"), content.index("comment2"))
+
 
 class CreateRequestViewTestCase(TestCase):
     def setUp(self):
@@ -565,6 +669,8 @@ class DeclineRequestViewTest(TestCase):
         self.assertEqual(response.status_code, 302)
 
     def test_form_valid(self):
+        UserModel.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.client.login(username='adminUser', password='adminPassword')
         data = {
             'comment': 'Test reason',
         }
@@ -577,6 +683,16 @@ class DeclineRequestViewTest(TestCase):
         self.help_request.refresh_from_db()
         self.assertEqual(self.help_request.status, StatusChoices.DECLINED)
 
+    def test_requester_cannot_decline_own_request(self):
+        data = {
+            'comment': 'Test reason',
+        }
+        response = self.client.post(reverse('requests:decline_request_view', kwargs={'pk': self.help_request.id}), data)
+        self.assertRedirects(response, reverse('main_view'))
+        self.assertFalse(DeclinedRequest.objects.filter(declined_request=self.help_request).exists())
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.status, StatusChoices.ACTIVE)
+
     def test_template_used(self):
         self.help_request.status = StatusChoices.ACTIVE
         self.help_request.save()
@@ -0,0 +1,92 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comments.models import Comment
+from help_request import export, transitions
+from help_request.models import HelpRequest, StatusChoices, PriorityChoices
+from user_app.models import MyUser
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.first = HelpRequest.objects.create(
+            subject='first', text='text, with "quotes"\nand lines', priority=PriorityChoices.HIGH,
+            requester=self.user, created_at=(timezone.now() - timedelta(days=3)).replace(microsecond=250000),
+        )
+        self.second = HelpRequest.objects.create(
+            subject='second', text='text', priority=PriorityChoices.LOW, requester=self.user,
+        )
+        self.third = HelpRequest.objects.create(
+            subject='third', text='text', priority=PriorityChoices.LOW, requester=self.user,
+        )
+        transitions.apply(transitions.DECLINE, self.second.pk, self.superuser, comment='missing details')
+        for message in ('one', 'two'):
+            Comment.objects.create(message=message, author=self.user, help_request=self.first)
+        Comment.objects.create(message='three', author=self.superuser, help_request=self.third)
+
+    def export(self, **params):
+        self.client.force_authenticate(user=self.superuser)
+        response = self.client.get(reverse('requests:rest_export'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        records = [json.loads(line) for line in self.export().decode().splitlines()]
+        self.assertEqual([record['id'] for record in records], [self.first.pk, self.second.pk, self.third.pk])
+        self.assertEqual(records[0]['text'], self.first.text)
+        self.assertEqual(records[0]['requester'], 'testUser')
+        created_at = self.first.created_at.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        self.assertEqual(records[0]['created_at'], created_at.isoformat(timespec='milliseconds') + 'Z')
+        self.assertEqual([comment['message'] for comment in records[0]['comments']], ['one', 'two'])
+        self.assertEqual(records[1]['comments'], [])
+        self.assertEqual(records[1]['decline_reason'], 'missing details')
+        self.assertEqual(records[2]['comments'][0]['author'], 'adminUser')
+
+    def test_csv_gzip_and_filters(self):
+        content = gzip.decompress(self.export(type='csv', gzip='true', status=StatusChoices.ACTIVE))
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual([int(row['id']) for row in rows], [self.first.pk, self.third.pk])
+        self.assertEqual(rows[0]['text'], self.first.text)
+        self.assertEqual([comment['message'] for comment in json.loads(rows[0]['comments'])], ['one', 'two'])
+
+        today = timezone.localdate()
+        records = self.export(since=(today - timedelta(days=1)).isoformat()).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in records], [self.second.pk, self.third.pk])
+        self.assertEqual(self.export(until=(today - timedelta(days=5)).isoformat()), b'')
+
+    def test_streams_in_chunks(self):
+        chunks = list(export.stream(HelpRequest.objects.all(), 'ndjson', chunk_size=2))
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [2, 1])
+
+    def test_invalid_params_and_admins_only(self):
+        self.client.force_authenticate(user=self.superuser)
+        for params in [{'type': 'xml'}, {'status': 'Lost'}, {'since': '2024-02-02', 'until': '2024-02-01'}]:
+            response = self.client.get(reverse('requests:rest_export'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(reverse('requests:rest_export')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.csv.gz')
+            call_command('export_helpdesk', type='csv', gzip=True, output=path, stderr=StringIO())
+            with gzip.open(path, 'rt') as output:
+                self.assertEqual(len(list(csv.DictReader(output))), 3)
+
+        out = StringIO()
+        call_command('export_helpdesk', status=StatusChoices.DECLINED, stdout=out, stderr=StringIO())
+        self.assertEqual([json.loads(line)['id'] for line in out.getvalue().splitlines()], [self.second.pk])
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from help_request import history, transitions
+from help_request.models import StatusTransition, StatusChoices, PriorityChoices
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class StatusHistoryTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+
+    def test_every_transition_is_logged(self):
+        help_request = create_request(self.user, age=timedelta(hours=2))
+        transitions.apply(transitions.DECLINE, help_request.pk, self.superuser, comment='missing details')
+        transitions.apply(transitions.RESEND_REVIEW, help_request.pk, self.user)
+        transitions.apply_bulk(transitions.APPROVE, [help_request.pk], self.superuser)
+
+        logged = list(history.timeline(help_request.pk).order_by('id'))
+        self.assertEqual([(row.from_status, row.to_status) for row in logged], [
+            (StatusChoices.ACTIVE, StatusChoices.DECLINED),
+            (StatusChoices.DECLINED, StatusChoices.FOR_RESTORATION),
+            (StatusChoices.FOR_RESTORATION, StatusChoices.APPROVED),
+        ])
+        self.assertEqual([row.actor_id for row in logged], [self.superuser.pk, self.user.pk, self.superuser.pk])
+        # The decline reason outlives the DeclinedRequest row that resend-review deletes.
+        self.assertEqual(logged[0].comment, 'missing details')
+        self.assertGreaterEqual(logged[0].duration, timedelta(hours=2))
+        self.assertLess(logged[1].duration, timedelta(hours=1))
+
+    def test_failed_transition_is_not_logged(self):
+        help_request = create_request(self.user)
+        transitions.apply(transitions.COMPLETE_PROCESSING, help_request.pk, self.superuser)
+        self.assertFalse(StatusTransition.objects.exists())
+
+    def test_timeline_endpoint(self):
+        help_request = create_request(self.user)
+        transitions.apply(transitions.APPROVE, help_request.pk, self.superuser)
+        url = reverse('requests:rest_request_history', args=[help_request.pk])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['from_status'], row['to_status']) for row in response.data['results']],
+            [(StatusChoices.ACTIVE, StatusChoices.APPROVED)],
+        )
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def stats(self, **params):
+        self.client.force_authenticate(user=self.superuser)
+        return self.client.get(reverse('requests:rest_transition_stats'), params)
+
+    def test_median_by_priority_per_day(self):
+        for hours in (1, 2, 6):
+            help_request = create_request(self.user, age=timedelta(hours=hours))
+            transitions.apply(transitions.APPROVE, help_request.pk, self.superuser)
+        help_request = create_request(self.user, priority=PriorityChoices.LOW, age=timedelta(hours=3))
+        transitions.apply(transitions.APPROVE, help_request.pk, self.superuser)
+        help_request = create_request(self.user)
+        transitions.apply(transitions.DECLINE, help_request.pk, self.superuser, comment='no')
+
+        response = self.stats(from_status=StatusChoices.ACTIVE, to_status=StatusChoices.APPROVED)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {row['priority']: row for row in response.data['results']}
+        self.assertEqual(set(results), {PriorityChoices.HIGH, PriorityChoices.LOW})
+        self.assertEqual(results[PriorityChoices.HIGH]['count'], 3)
+        self.assertAlmostEqual(results[PriorityChoices.HIGH]['median_seconds'], 2 * 3600, delta=60)
+        self.assertEqual(results[PriorityChoices.HIGH]['day'], timezone.localdate())
+
+        response = self.stats(
+            from_status=StatusChoices.ACTIVE, to_status=StatusChoices.APPROVED, priority=PriorityChoices.LOW,
+        )
+        self.assertEqual([row['count'] for row in response.data['results']], [1])
+
+    def test_days_are_half_open(self):
+        help_request = create_request(self.user)
+        transitions.apply(transitions.APPROVE, help_request.pk, self.superuser)
+        today = timezone.localdate()
+        response = self.stats(
+            from_status=StatusChoices.ACTIVE, to_status=StatusChoices.APPROVED,
+            since=(today - timedelta(days=3)).isoformat(), until=today.isoformat(),
+        )
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_params(self):
+        today = timezone.localdate()
+        for params in [
+            {'from_status': 'Lost', 'to_status': StatusChoices.APPROVED},
+            {'from_status': StatusChoices.ACTIVE},
+            {'from_status': StatusChoices.ACTIVE, 'to_status': StatusChoices.APPROVED,
+             'since': today.isoformat(), 'until': today.isoformat()},
+            {'from_status': StatusChoices.ACTIVE, 'to_status': StatusChoices.APPROVED,
+             'since': (today - timedelta(days=1000)).isoformat()},
+        ]:
+            response = self.stats(**params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_stats_are_for_admins(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('requests:rest_transition_stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
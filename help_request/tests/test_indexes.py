@@ -0,0 +1,100 @@
+from itertools import cycle
+
+from django.db import connection
+from django.test import TestCase
+
+from comments.models import Comment
+from help_request.models import HelpRequest, PriorityChoices, StatusChoices
+from user_app.models import MyUser
+
+
+class IndexUsageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            MyUser.objects.create_user(username=f'user{i}', password='password') for i in range(10)
+        ]
+        statuses = cycle([status for status, _ in StatusChoices.CHOICES])
+        priorities = cycle([priority for priority, _ in PriorityChoices.CHOICES])
+        requesters = cycle(cls.users)
+        HelpRequest.objects.bulk_create([
+            HelpRequest(
+                subject=f'request{i}',
+                text='text',
+                requester=next(requesters),
+                priority=next(priorities),
+                status=next(statuses),
+            )
+            for i in range(600)
+        ])
+        cls.help_request = HelpRequest.objects.first()
+        Comment.objects.bulk_create([
+            Comment(message=f'comment{i}', author=cls.users[i % 10], help_request=request)
+            for i, request in enumerate(HelpRequest.objects.all()[:100])
+            for _ in range(3)
+        ])
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # The seeded tables are small enough for a sequential scan to win.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_active_queue(self):
+        queryset = HelpRequest.objects.filter(status=StatusChoices.ACTIVE).order_by('-created_at', '-id')[:50]
+        self.assertUsesIndex(queryset, 'helpreq_status_created_idx')
+
+    def test_active_queue_column(self):
+        queryset = (
+            HelpRequest.objects.filter(status=StatusChoices.ACTIVE, priority=PriorityChoices.HIGH)
+            .exclude(requester=self.users[0])
+            .order_by('-created_at', '-id')[:50]
+        )
+        self.assertUsesIndex(queryset, 'helpreq_active_queue_idx')
+
+    def test_restoration_queue_column(self):
+        queryset = (
+            HelpRequest.objects.filter(status=StatusChoices.FOR_RESTORATION, priority=PriorityChoices.LOW)
+            .exclude(requester=self.users[0])
+            .order_by('-created_at', '-id')[:50]
+        )
+        self.assertUsesIndex(queryset, 'helpreq_restoration_queue_idx')
+
+    def test_all_requests_by_priority(self):
+        queryset = HelpRequest.objects.filter(priority=PriorityChoices.MEDIUM).order_by('-created_at', '-id')[:50]
+        self.assertUsesIndex(queryset, 'helpreq_prio_created_idx')
+
+    def test_requester_with_status(self):
+        queryset = (
+            HelpRequest.objects.filter(requester=self.users[0], status=StatusChoices.APPROVED)
+            .order_by('-created_at')[:50]
+        )
+        self.assertUsesIndex(queryset, 'helpreq_req_status_idx')
+
+    def test_requester_with_priority(self):
+        queryset = (
+            HelpRequest.objects.filter(requester=self.users[0], priority=PriorityChoices.HIGH)
+            .order_by('-created_at')[:50]
+        )
+        self.assertUsesIndex(queryset, 'helpreq_req_prio_idx')
+
+    def test_recent_activity(self):
+        queryset = HelpRequest.objects.order_by('-last_activity_at', '-id')[:50]
+        self.assertUsesIndex(queryset, 'helpreq_activity_idx')
+
+    def test_requester_recent_activity(self):
+        queryset = HelpRequest.objects.filter(requester=self.users[0]).order_by('-last_activity_at', '-id')[:50]
+        self.assertUsesIndex(queryset, 'helpreq_req_activity_idx')
+
+    def test_most_commented(self):
+        queryset = HelpRequest.objects.order_by('-comment_count', '-id')[:50]
+        self.assertUsesIndex(queryset, 'helpreq_comments_idx')
+
+    def test_comment_thread(self):
+        queryset = Comment.objects.filter(help_request=self.help_request).order_by('created_at', 'id')
+        self.assertUsesIndex(queryset, 'comment_request_created_idx')
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.db.models import FloatField, Value
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from help_request.models import HelpRequest, PriorityChoices, StatusChoices
+from help_request.pagination import decode_cursor, encode_cursor
+from user_app.models import MyUser
+
+
+class CursorEncodingTest(TestCase):
+    ordering = ('-created_at', '-id')
+
+    def test_round_trip(self):
+        created_at = timezone.now()
+        cursor = encode_cursor([created_at, 42], reverse=True)
+        position, reverse = decode_cursor(cursor, self.ordering, HelpRequest.objects.all())
+        self.assertEqual(position, [created_at, 42])
+        self.assertTrue(reverse)
+
+    def test_garbage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor', self.ordering, HelpRequest.objects.all())
+
+    def test_wrong_arity_is_rejected(self):
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor([1]), self.ordering, HelpRequest.objects.all())
+
+    def test_wrong_values_are_rejected(self):
+        for position in (['garbage', 1], [timezone.now(), 'one'], [timezone.now(), None], [[], 1]):
+            with self.subTest(position=position), self.assertRaises(ValueError):
+                decode_cursor(encode_cursor(position), self.ordering, HelpRequest.objects.all())
+
+    def test_annotations_are_converted(self):
+        queryset = HelpRequest.objects.annotate(rank=Value(0.0, output_field=FloatField()))
+        position, _ = decode_cursor(encode_cursor(['0.5', 3]), ('-rank', '-id'), queryset)
+        self.assertEqual(position, [0.5, 3])
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor(['high', 3]), ('-rank', '-id'), queryset)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.superuser = MyUser.objects.create_superuser(
+            username='adminUser',
+            password='adminPassword',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+        now = timezone.now()
+        # Every pair shares a timestamp so the `id` tie-breaker is exercised.
+        self.requests = [
+            HelpRequest.objects.create(
+                subject=f'request{i}',
+                text='text',
+                requester=self.superuser,
+                priority=PriorityChoices.LOW,
+                status=StatusChoices.ACTIVE,
+                created_at=now - timedelta(minutes=i // 2),
+            )
+            for i in range(7)
+        ]
+        self.expected = [
+            r.id for r in HelpRequest.objects.order_by('-created_at', '-id')
+        ]
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_walks_all_pages_in_order(self):
+        ids, pages = self.walk('/requests/rest/?page_size=3')
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get('/requests/rest/?page_size=3')
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']],
+        )
+
+    def test_new_rows_do_not_shift_later_pages(self):
+        first = self.client.get('/requests/rest/?page_size=3')
+        HelpRequest.objects.create(
+            subject='late',
+            text='text',
+            requester=self.superuser,
+            priority=PriorityChoices.LOW,
+        )
+        rest, _ = self.walk(first.data['next'])
+        self.assertEqual(rest, self.expected[3:])
+
+    @override_settings(PAGINATION_MAX_PAGE_SIZE=2)
+    def test_page_size_is_capped(self):
+        response = self.client.get('/requests/rest/?page_size=500')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_queue_endpoints_are_paginated(self):
+        response = self.client.get('/requests/rest/active/?page_size=5')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/requests/rest/?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        cursor = encode_cursor(['garbage', 1])
+        self.client.force_login(self.superuser)
+        for url, params in [
+            (reverse('requests:helprequest-list'), {}),
+            (reverse('requests:helprequest-search'), {'q': 'text'}),
+            (reverse('requests:all_request_view'), {'column': PriorityChoices.LOW}),
+            (reverse('requests:search_view'), {'q': 'text'}),
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(url, {**params, 'cursor': cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -47,8 +47,8 @@ class RequesterOnlyPermissionTest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(f'/requests/rest/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        serializer = RequestSerializer(HelpRequest.objects.filter(requester=self.user), many=True)
-        self.assertEqual(response.data, serializer.data)
+        serializer = RequestSerializer(HelpRequest.objects.filter(requester=self.user).order_by('-created_at', '-id'), many=True)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_requester_cannot_view_other_request(self):
         self.client.force_authenticate(user=self.other_user)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.views import View
+from rest_framework.authtoken.models import Token
+
+from help_request import replicas
+from help_request.models import HelpRequest, StatusChoices, PriorityChoices
+from user_app.models import MyUser
+
+
+class ReadView(View):
+    replica_reads = True
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = replicas.ReplicaRouter()
+        self.addCleanup(replicas.stop)
+
+    def test_reads_go_to_the_replica_until_a_write(self):
+        self.assertEqual(self.router.db_for_read(HelpRequest), DEFAULT_DB_ALIAS)
+        replicas.start(replica_reads=True)
+        self.assertEqual(self.router.db_for_read(HelpRequest), 'replica_1')
+        self.assertEqual(self.router.db_for_read(Session), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Token), DEFAULT_DB_ALIAS)
+        with replicas.primary():
+            self.assertEqual(self.router.db_for_read(HelpRequest), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(HelpRequest), 'replica_1')
+
+        self.assertEqual(self.router.db_for_write(Token), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_write(Session), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(HelpRequest), 'replica_1')
+        self.assertEqual(self.router.db_for_write(HelpRequest), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(HelpRequest), DEFAULT_DB_ALIAS)
+
+    def test_middleware_pins_clients_that_wrote(self):
+        factory = RequestFactory(HTTP_AUTHORIZATION='Token abc')
+        view = ReadView.as_view()
+        middleware = replicas.ReplicaMiddleware(lambda request: None)
+        cache.delete(replicas.pin_key(factory.get('/')))
+
+        def routed(request, write=False):
+            middleware.process_request(request)
+            middleware.process_view(request, view, (), {})
+            routing = replicas.current()
+            if write:
+                self.router.db_for_write(HelpRequest)
+            alias = routing.read_alias()
+            middleware.process_response(request, None)
+            return alias
+
+        self.assertEqual(routed(factory.get('/')), 'replica_1')
+        self.assertEqual(routed(factory.post('/')), DEFAULT_DB_ALIAS)
+        self.assertEqual(routed(factory.get('/'), write=True), DEFAULT_DB_ALIAS)
+        self.assertEqual(routed(factory.get('/')), DEFAULT_DB_ALIAS)
+        self.assertEqual(routed(RequestFactory(HTTP_AUTHORIZATION='Token other').get('/')), 'replica_1')
+        self.assertIsNone(replicas.current())
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'needs a replica database alias')
+class ReplicaReadsTest(TransactionTestCase):
+    # The replica aliases mirror the primary's test database over their own
+    # connections, which only see committed rows.
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = HelpRequest.objects.create(
+            subject='request', text='text', priority=PriorityChoices.HIGH, requester=self.user,
+        )
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+
+    def get(self, user, url):
+        self.client.force_login(user)
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(replica_queries)
+
+    def test_detail_reads_from_the_replica_until_the_client_writes(self):
+        url = reverse('requests:request_detail_view', args=[self.help_request.pk])
+        _, replica_queries = self.get(self.superuser, url)
+        self.assertGreater(replica_queries, 0)
+
+        self.client.get(reverse('requests:approve_request_view', args=[self.help_request.pk]))
+        response, replica_queries = self.get(self.superuser, url)
+        self.assertEqual(replica_queries, 0)
+        self.assertEqual(response.context['current_request'].status, StatusChoices.APPROVED)
+
+    def test_token_touch_leaves_reads_on_the_replica(self):
+        token = Token.objects.create(user=self.user)
+        stale = timezone.now() - timedelta(seconds=settings.TOKEN_TOUCH_INTERVAL_SECONDS + 1)
+        Token.objects.filter(pk=token.pk).update(created=stale)
+        url = reverse('requests:helprequest-detail', kwargs={'pk': self.help_request.pk})
+        for _ in range(2):
+            with CaptureQueriesContext(self.replica) as replica_queries:
+                response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(len(replica_queries), 0)
+        token.refresh_from_db()
+        self.assertGreater(token.created, stale)
+
+    def test_views_that_are_not_marked_read_from_the_primary(self):
+        _, replica_queries = self.get(self.user, reverse('main_view'))
+        self.assertEqual(replica_queries, 0)
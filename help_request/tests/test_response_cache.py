@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from comments.models import Comment
+from help_request import response_cache, transitions
+from help_request.models import StatusChoices
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.reset_stats()
+        self.client = APIClient()
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = create_request(self.user)
+
+    def tearDown(self):
+        cache.clear()
+        response_cache.reset_stats()
+
+    def get(self, url_name, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_repeated_list_is_served_from_cache(self):
+        self.assertEqual(self.get('requests:rest_active', self.superuser), [self.help_request.pk])
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get('requests:rest_active', self.superuser), [self.help_request.pk])
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(response_cache.stats()['RestActive'], {'hits': 1, 'misses': 1})
+
+    def test_transition_invalidates_admin_and_requester_scopes(self):
+        self.get('requests:rest_active', self.superuser)
+        self.get('requests:helprequest-list', self.user)
+
+        transitions.apply(transitions.APPROVE, self.help_request.pk, self.superuser)
+
+        self.assertEqual(self.get('requests:rest_active', self.superuser), [])
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('requests:helprequest-list'))
+        self.assertEqual(response.data['results'][0]['status'], StatusChoices.APPROVED)
+
+    def test_other_users_scope_is_kept(self):
+        self.get('requests:helprequest-list', self.other)
+        create_request(self.user)
+        self.get('requests:helprequest-list', self.other)
+        self.assertEqual(response_cache.stats()['RequestViewSet'], {'hits': 1, 'misses': 1})
+
+    def test_comment_invalidates(self):
+        in_process = create_request(self.user, status=StatusChoices.IN_PROCESS)
+        version = response_cache.get_version(response_cache.user_scope(self.user.pk))
+        Comment.objects.create(message='comment', author=self.superuser, help_request=in_process)
+        self.assertGreater(response_cache.get_version(response_cache.user_scope(self.user.pk)), version)
+
+    def test_filters_are_part_of_the_key(self):
+        create_request(self.user, status=StatusChoices.COMPLETED)
+        self.client.force_authenticate(user=self.superuser)
+        url = reverse('requests:helprequest-list')
+        active = self.client.get(url, {'status_type': StatusChoices.ACTIVE}).data['results']
+        completed = self.client.get(url, {'status_type': StatusChoices.COMPLETED}).data['results']
+        self.assertEqual([row['status'] for row in active], [StatusChoices.ACTIVE])
+        self.assertEqual([row['status'] for row in completed], [StatusChoices.COMPLETED])
+
+    def test_board_varies_per_admin(self):
+        other_admin = MyUser.objects.create_superuser(username='otherAdmin', password='adminPassword')
+        own = create_request(other_admin)
+        url = reverse('requests:request_to_check_view')
+
+        self.client.force_login(self.superuser)
+        self.assertIn(own, self.client.get(url).context['requests'])
+        self.client.force_login(other_admin)
+        self.assertNotIn(own, self.client.get(url).context['requests'])
+
+    def test_stats_endpoint(self):
+        self.get('requests:rest_active', self.superuser)
+        response = self.client.get(reverse('requests:rest_cache_stats'))
+        self.assertEqual(response.data, {'RestActive': {'hits': 0, 'misses': 1}})
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('requests:rest_cache_stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,9 +1,15 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from user_app.models import MyUser
 from rest_framework.test import APIClient
 from rest_framework import status
 from help_request.models import HelpRequest, DeclinedRequest, StatusChoices, PriorityChoices
 from help_request.serializers import RequestSerializer
+from comments.models import Comment
 
 
 class RequestViewSetTest(TestCase):
@@ -115,8 +121,8 @@ class RestAdminsRequestsTest(TestCase):
         self.client.force_authenticate(user=self.superuser)
         response = self.client.get('/requests/rest/all-admins-requests/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        serializer = RequestSerializer(HelpRequest.objects.filter(requester=self.superuser), many=True)
-        self.assertEqual(response.data, serializer.data)
+        serializer = RequestSerializer(HelpRequest.objects.filter(requester=self.superuser).order_by('-created_at', '-id'), many=True)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_get_admins_request_by_default_user(self):
         self.client.force_authenticate(user=self.user)
@@ -165,8 +171,8 @@ class RestForRestorationTest(TestCase):
         self.client.force_authenticate(user=self.superuser)
         response = self.client.get('/requests/rest/for-restoration/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        serializer = RequestSerializer(HelpRequest.objects.filter(status=StatusChoices.FOR_RESTORATION), many=True)
-        self.assertEqual(response.data, serializer.data)
+        serializer = RequestSerializer(HelpRequest.objects.filter(status=StatusChoices.FOR_RESTORATION).order_by('-created_at', '-id'), many=True)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_get_requests_for_restoration_by_default_user(self):
         self.client.force_authenticate(user=self.user)
@@ -215,8 +221,8 @@ class RestActiveTest(TestCase):
         self.client.force_authenticate(user=self.superuser)
         response = self.client.get('/requests/rest/active/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        serializer = RequestSerializer(HelpRequest.objects.filter(status=StatusChoices.ACTIVE), many=True)
-        self.assertEqual(response.data, serializer.data)
+        serializer = RequestSerializer(HelpRequest.objects.filter(status=StatusChoices.ACTIVE).order_by('-created_at', '-id'), many=True)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_get_requests_active_by_default_user(self):
         self.client.force_authenticate(user=self.user)
@@ -282,6 +288,52 @@ class CommentsViewTest(TestCase):
         response = self.client.post(f'/requests/rest/{self.help_request.pk}/comments/', self.comment_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def add_comments(self, count):
+        now = timezone.now()
+        return [
+            Comment.objects.create(
+                message=f'comment {index}', author=self.user, help_request=self.help_request,
+                created_at=now + timedelta(seconds=index),
+            ).pk
+            for index in range(count)
+        ]
+
+    def read_thread(self, **params):
+        pks, url, pages = [], f'/requests/rest/{self.help_request.pk}/comments/', 0
+        while url:
+            response = self.client.get(url, params if not pages else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pks += [comment['id'] for comment in response.data['results']]
+            url, pages = response.data['next'], pages + 1
+        return pks, pages
+
+    def test_comments_are_paged_both_ways(self):
+        pks = self.add_comments(5)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.read_thread(page_size=2), (pks, 3))
+        self.assertEqual(self.read_thread(page_size=2, ordering='-created_at'), (pks[::-1], 3))
+
+    def test_comments_after_one(self):
+        pks = self.add_comments(5)
+        self.client.force_authenticate(user=self.superuser)
+        self.assertEqual(self.read_thread(after=pks[1], page_size=2), (pks[2:], 2))
+        self.assertEqual(self.read_thread(after=pks[-1]), ([], 1))
+
+        for params in [
+            {'after': 'x'}, {'after': '²'}, {'after': 0}, {'after': pks[0], 'ordering': '-created_at'}, {'ordering': 'id'},
+        ]:
+            response = self.client.get(f'/requests/rest/{self.help_request.pk}/comments/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_comments_page_takes_two_queries(self):
+        self.add_comments(3)
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/requests/rest/{self.help_request.pk}/comments/')
+        self.assertEqual(len(response.data['results']), 3)
+        # The request with its counters, then the page with its authors.
+        self.assertEqual(len(queries), 2)
+
 
 class RestApproveTest(TestCase):
     def setUp(self):
@@ -712,3 +764,117 @@ class RestDecline(TestCase):
         self.other_request.refresh_from_db()
         self.assertEqual(self.other_request.status, old_status)
 
+
+
+class ListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.superuser = MyUser.objects.create_superuser(
+            username='adminUser',
+            password='adminPassword',
+        )
+        self.client.force_authenticate(user=self.superuser)
+        self.help_request = HelpRequest.objects.create(
+            subject='request1',
+            text='text1',
+            priority=PriorityChoices.HIGH,
+            requester=self.superuser,
+            status=StatusChoices.IN_PROCESS,
+        )
+
+    def add_rows(self, count):
+        for i in range(count):
+            user = MyUser.objects.create_user(username=f'user{MyUser.objects.count()}', password='password')
+            HelpRequest.objects.create(
+                subject=f'request{i}',
+                text='text',
+                priority=PriorityChoices.LOW,
+                requester=user,
+                status=StatusChoices.ACTIVE,
+            )
+            Comment.objects.create(message=f'comment{i}', author=user, help_request=self.help_request)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def assert_constant_queries(self, url):
+        self.add_rows(1)
+        few = self.count_queries(url)
+        self.add_rows(10)
+        self.assertEqual(self.count_queries(url), few)
+
+    def test_request_list(self):
+        self.assert_constant_queries('/requests/rest/')
+
+    def test_active_list(self):
+        self.assert_constant_queries('/requests/rest/active/')
+
+    def test_comment_list(self):
+        self.assert_constant_queries(f'/requests/rest/{self.help_request.pk}/comments/')
+
+
+class RestBulkTransitionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = MyUser.objects.create_user(
+            username='testUser',
+            password='testPassword',
+        )
+        self.superuser = MyUser.objects.create_superuser(
+            username='adminUser',
+            password='adminPassword',
+        )
+        self.first = HelpRequest.objects.create(
+            subject='request1',
+            text='text1',
+            priority=PriorityChoices.HIGH,
+            requester=self.user,
+            status=StatusChoices.ACTIVE,
+        )
+        self.second = HelpRequest.objects.create(
+            subject='request2',
+            text='text2',
+            priority=PriorityChoices.LOW,
+            requester=self.user,
+            status=StatusChoices.FOR_RESTORATION,
+        )
+
+    def test_bulk_decline_with_shared_and_per_item_comment(self):
+        self.client.force_authenticate(user=self.superuser)
+        data = {
+            'transition': 'decline',
+            'ids': [self.first.pk, self.second.pk],
+            'comment': 'Shared reason',
+            'comments': {str(self.second.pk): 'Own reason'},
+        }
+        response = self.client.post('/requests/rest/bulk-transition/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'id': self.first.pk, 'outcome': 'done'},
+            {'id': self.second.pk, 'outcome': 'done'},
+        ])
+        self.assertEqual(DeclinedRequest.objects.get(declined_request=self.first).comment, 'Shared reason')
+        self.assertEqual(DeclinedRequest.objects.get(declined_request=self.second).comment, 'Own reason')
+
+    def test_bulk_decline_requires_reason(self):
+        self.client.force_authenticate(user=self.superuser)
+        data = {'transition': 'decline', 'ids': [self.first.pk]}
+        response = self.client.post('/requests/rest/bulk-transition/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, StatusChoices.ACTIVE)
+
+    def test_resend_review_is_not_a_bulk_transition(self):
+        self.client.force_authenticate(user=self.superuser)
+        data = {'transition': 'resend-review', 'ids': [self.first.pk]}
+        response = self.client.post('/requests/rest/bulk-transition/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_transition_by_default_user(self):
+        self.client.force_authenticate(user=self.user)
+        data = {'transition': 'approve', 'ids': [self.first.pk]}
+        response = self.client.post('/requests/rest/bulk-transition/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,109 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from help_request import rollups, transitions
+from help_request.models import HelpRequest, RequestCount, StatusTransition, StatusChoices, PriorityChoices
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class RequestCountsTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+
+    def assertCountsAreExact(self):
+        self.assertEqual(rollups.reconcile(HelpRequest.objects.all()), 0)
+
+    def stored(self, scope):
+        return {(row['status'], row['priority']): row['count'] for row in rollups.totals(scope)}
+
+    def test_maintained_on_create_transition_edit_and_delete(self):
+        first = create_request(self.user)
+        second = create_request(self.other, priority=PriorityChoices.LOW)
+        self.assertEqual(self.stored(rollups.ALL), {
+            (StatusChoices.ACTIVE, PriorityChoices.HIGH): 1, (StatusChoices.ACTIVE, PriorityChoices.LOW): 1,
+        })
+
+        transitions.apply(transitions.DECLINE, first.pk, self.superuser, comment='no')
+        transitions.apply(transitions.RESEND_REVIEW, first.pk, self.user)
+        transitions.apply_bulk(transitions.APPROVE, [first.pk, second.pk], self.superuser)
+        self.assertEqual(self.stored(rollups.user_scope(self.user.pk)), {
+            (StatusChoices.APPROVED, PriorityChoices.HIGH): 1,
+        })
+        self.assertCountsAreExact()
+
+        first.refresh_from_db()
+        first.priority = PriorityChoices.MEDIUM
+        first.save()
+        self.assertEqual(self.stored(rollups.user_scope(self.user.pk)), {
+            (StatusChoices.APPROVED, PriorityChoices.MEDIUM): 1,
+        })
+        self.assertCountsAreExact()
+
+        HelpRequest.objects.get(pk=second.pk).delete()
+        self.assertEqual(self.stored(rollups.user_scope(self.other.pk)), {})
+        self.assertCountsAreExact()
+
+    def test_approving_requests_without_history(self):
+        # Moved to For restoration before the status log existed.
+        first, second = create_request(self.user), create_request(self.other)
+        HelpRequest.objects.filter(pk__in=[first.pk, second.pk]).update(status=StatusChoices.FOR_RESTORATION)
+        rollups.reconcile(HelpRequest.objects.all())
+
+        transitions.apply(transitions.APPROVE, first.pk, self.superuser)
+        transitions.apply_bulk(transitions.APPROVE, [second.pk], self.superuser)
+        self.assertEqual(self.stored(rollups.ALL), {(StatusChoices.APPROVED, PriorityChoices.HIGH): 2})
+        self.assertCountsAreExact()
+        self.assertEqual(
+            set(StatusTransition.objects.values_list('from_status', 'to_status')),
+            {(StatusChoices.FOR_RESTORATION, StatusChoices.APPROVED)},
+        )
+
+    def test_reconcile_corrects_drift(self):
+        help_request = create_request(self.user)
+        HelpRequest.objects.filter(pk=help_request.pk).update(status=StatusChoices.COMPLETED)
+        RequestCount.objects.create(scope='user:0', status=StatusChoices.ACTIVE, priority=PriorityChoices.LOW, count=3)
+
+        out = StringIO()
+        call_command('reconcile_request_counts', dry_run=True, stdout=out)
+        self.assertIn('7 request counts are wrong', out.getvalue())
+        call_command('reconcile_request_counts', stdout=StringIO())
+        self.assertEqual(self.stored(rollups.ALL), {(StatusChoices.COMPLETED, PriorityChoices.HIGH): 1})
+        self.assertCountsAreExact()
+
+    def test_dashboard(self):
+        create_request(self.user)
+        create_request(self.other)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('requests:rest_dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'totals': [
+            {'status': StatusChoices.ACTIVE, 'priority': PriorityChoices.HIGH, 'count': 1},
+        ]})
+
+        self.client.force_authenticate(user=self.superuser)
+        response = self.client.get(reverse('requests:rest_dashboard'))
+        self.assertEqual(response.data['totals'][0]['count'], 2)
+        self.assertEqual(response.data['days'], [{
+            'day': timezone.localdate().isoformat(), 'status': StatusChoices.ACTIVE,
+            'priority': PriorityChoices.HIGH, 'count': 2,
+        }])
+
+
+class MainViewCountsTest(TestCase):
+    def test_main_view_shows_own_counts(self):
+        user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        HelpRequest.objects.create(subject='request', text='text', priority=PriorityChoices.LOW, requester=user)
+        self.client.force_login(user)
+        response = self.client.get(reverse('main_view'))
+        self.assertEqual(response.context['dashboard']['totals'][0]['count'], 1)
+        self.assertContains(response, 'Your requests')
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comments.models import Comment
+from help_request import search
+from help_request.tests.factories import create_request
+from user_app.models import MyUser
+
+
+class RestSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.url = reverse('requests:helprequest-search')
+
+    def tearDown(self):
+        cache.clear()
+
+    def search(self, user, query, **params):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_ranks_subject_over_text_over_comments(self):
+        in_comment = create_request(self.user)
+        Comment.objects.create(message='the printer jams', author=self.superuser, help_request=in_comment)
+        in_text = create_request(self.user, text='my printer is broken')
+        in_subject = create_request(self.user, subject='Printer')
+        create_request(self.user, subject='network')
+        self.assertEqual(self.search(self.superuser, 'printers'), [in_subject.pk, in_text.pk, in_comment.pk])
+
+    def test_all_words_must_match(self):
+        both = create_request(self.user, subject='printer', text='paper jam')
+        create_request(self.user, subject='printer', text='toner')
+        self.assertEqual(self.search(self.superuser, 'printer jam'), [both.pk])
+
+    def test_visibility(self):
+        own = create_request(self.user, subject='printer')
+        create_request(self.other, subject='printer')
+        self.assertEqual(self.search(self.user, 'printer'), [own.pk])
+        self.assertEqual(len(self.search(self.superuser, 'printer')), 2)
+
+    def test_index_follows_changes(self):
+        help_request = create_request(self.user, subject='printer')
+        help_request.subject = 'scanner'
+        help_request.save()
+        self.assertEqual(self.search(self.user, 'printer'), [])
+        self.assertEqual(self.search(self.user, 'scanner'), [help_request.pk])
+
+        comment = Comment.objects.create(message='keyboard', author=self.user, help_request=help_request)
+        self.assertEqual(self.search(self.user, 'keyboard'), [help_request.pk])
+        comment.delete()
+        self.assertEqual(self.search(self.user, 'keyboard'), [])
+
+        help_request.delete()
+        self.assertEqual(self.search(self.user, 'scanner'), [])
+
+    def test_added_comments_are_appended(self):
+        help_request = create_request(self.user)
+        first = Comment.objects.create(message='keyboard', author=self.user, help_request=help_request)
+        Comment.objects.bulk_create([
+            Comment(message=message, author=self.user, help_request=help_request) for message in ('mouse', 'monitor')
+        ])
+        cache.clear()
+        for word in ('keyboard', 'mouse', 'monitor', 'request'):
+            self.assertEqual(self.search(self.user, word), [help_request.pk])
+
+        first.message = 'trackpad'
+        first.save()
+        self.assertEqual(self.search(self.user, 'keyboard'), [])
+        self.assertEqual(self.search(self.user, 'trackpad mouse monitor'), [help_request.pk])
+
+    def test_pages(self):
+        created = [create_request(self.user, subject='printer', text='paper ' * i) for i in range(5)]
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'q': 'printer', 'page_size': 2})
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [row['id'] for row in response.data['results']]
+        self.assertEqual(sorted(seen), sorted(request.pk for request in created))
+
+    def test_query_syntax_is_literal(self):
+        help_request = create_request(self.user, subject='printer')
+        self.assertEqual(self.search(self.user, 'printer" (*'), [help_request.pk])
+        self.assertEqual(self.search(self.user, '"*'), [])
+
+    def test_query_required(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'q': ' '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_install_restores_dropped_triggers(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER help_request_search_insert')
+        help_request = create_request(self.user, subject='printer')
+        self.assertEqual(self.search(self.user, 'printer'), [])
+
+        search.install(connection)
+        cache.clear()
+        self.assertEqual(self.search(self.user, 'printer'), [help_request.pk])
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.url = reverse('requests:search_view')
+
+    def test_search_page(self):
+        own = create_request(self.user, subject='printer')
+        create_request(self.other, subject='printer')
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {'q': 'printer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['requests']), [own])
+        self.assertIsNone(response.context['next_url'])
+
+    def test_anonymous_is_redirected(self):
+        response = self.client.get(self.url, {'q': 'printer'})
+        self.assertRedirects(response, reverse('user:not_authenticated_view'), fetch_redirect_response=False)
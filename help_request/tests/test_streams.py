@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from comments.models import Comment
+from help_request import streams, transitions
+from help_request.models import HelpRequest, StatusChoices, PriorityChoices
+from user_app.models import MyUser
+
+
+@override_settings(CHANGES_FEED_SETTLE_SECONDS=0, STREAM_POLL_SECONDS=0.01, STREAM_MAX_SECONDS=2)
+class RequestStreamTest(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(username='testUser', password='testPassword')
+        self.other = MyUser.objects.create_user(username='otherUser', password='testPassword')
+        self.superuser = MyUser.objects.create_superuser(username='adminUser', password='adminPassword')
+        self.help_request = HelpRequest.objects.create(
+            subject='request',
+            text='text',
+            priority=PriorityChoices.HIGH,
+            requester=self.user,
+            status=StatusChoices.IN_PROCESS,
+        )
+        self.url = reverse('requests:request_stream')
+
+    async def open_stream(self, user, **params):
+        await sync_to_async(self.async_client.force_login)(user)
+        response = await self.async_client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response
+
+    async def next_event(self, response):
+        while True:
+            chunk = (await asyncio.wait_for(anext(response.streaming_content), 5)).decode()
+            if not chunk.startswith(('retry:', ':')):
+                fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+                return fields['event'], json.loads(fields['data']), int(fields['id'])
+
+    async def close(self, response):
+        # Streams end at their maximum age, and the client reconnects.
+        async for _ in response.streaming_content:
+            pass
+
+    async def test_status_change_is_pushed_to_requester(self):
+        response = await self.open_stream(self.user)
+        await sync_to_async(transitions.apply)(transitions.COMPLETE_PROCESSING, self.help_request.pk, self.superuser)
+        event, data, _ = await self.next_event(response)
+        self.assertEqual(event, 'status')
+        self.assertEqual(data, {'request': self.help_request.pk, 'status': StatusChoices.COMPLETED})
+        await self.close(response)
+
+    async def test_new_comment_is_pushed(self):
+        response = await self.open_stream(self.superuser, request=self.help_request.pk)
+        comment = await Comment.objects.acreate(message='hello', author=self.superuser, help_request=self.help_request)
+        event, data, _ = await self.next_event(response)
+        self.assertEqual(event, 'comment')
+        self.assertEqual(
+            (data['comment']['id'], data['comment']['message'], data['comment']['author']),
+            (comment.pk, 'hello', 'adminUser'),
+        )
+        await self.close(response)
+
+    async def test_other_users_events_are_not_pushed(self):
+        response = await self.open_stream(self.other)
+        await Comment.objects.acreate(message='hidden', author=self.superuser, help_request=self.help_request)
+        own = await HelpRequest.objects.acreate(subject='own', text='text', requester=self.other)
+        own.subject = 'changed'
+        await own.asave()
+        event, data, _ = await self.next_event(response)
+        self.assertEqual((event, data['request']), ('status', own.pk))
+        await self.close(response)
+
+    async def test_reconnect_replays_missed_events(self):
+        response = await self.open_stream(self.user)
+        await Comment.objects.acreate(message='first', author=self.superuser, help_request=self.help_request)
+        _, _, last_event_id = await self.next_event(response)
+        await self.close(response)
+
+        await Comment.objects.acreate(message='second', author=self.superuser, help_request=self.help_request)
+        response = await self.async_client.get(self.url, headers={'Last-Event-ID': str(last_event_id)})
+        _, data, _ = await self.next_event(response)
+        self.assertEqual(data['comment']['message'], 'second')
+        await self.close(response)
+
+    async def test_one_poller_for_all_streams(self):
+        first = await self.open_stream(self.user)
+        second = await self.open_stream(self.superuser)
+        self.assertEqual(len(streams.broadcaster.subscriptions), 2)
+        task = streams.broadcaster.task
+        await Comment.objects.acreate(message='hello', author=self.superuser, help_request=self.help_request)
+        self.assertEqual((await self.next_event(first))[0], 'comment')
+        self.assertEqual((await self.next_event(second))[0], 'comment')
+        self.assertIs(streams.broadcaster.task, task)
+        await self.close(first)
+        await self.close(second)
+        self.assertEqual(streams.broadcaster.subscriptions, set())
+
+    async def test_concurrent_first_subscribers_share_one_poller(self):
+        subscriptions = await asyncio.gather(*[streams.broadcaster.subscribe(self.superuser) for _ in range(5)])
+        pollers = [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == 'Broadcaster.run']
+        self.assertEqual(pollers, [streams.broadcaster.task])
+
+        await Comment.objects.acreate(message='hello', author=self.superuser, help_request=self.help_request)
+        await asyncio.wait_for(subscriptions[0].queue.get(), 5)
+        await asyncio.sleep(0.05)
+        self.assertEqual([subscription.queue.qsize() for subscription in subscriptions], [0, 1, 1, 1, 1])
+        for subscription in subscriptions:
+            streams.broadcaster.unsubscribe(subscription)
+        await asyncio.wait_for(streams.broadcaster.task, 5)
+
+    async def test_anonymous_is_rejected(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_wsgi_is_rejected(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 501)
@@ -0,0 +1,142 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from help_request import transitions
+from help_request.models import HelpRequest, DeclinedRequest, StatusChoices, PriorityChoices
+from help_request.transitions import Outcome
+from user_app.models import MyUser
+
+
+class TransitionsTest(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(
+            username='testUser',
+            password='testPassword',
+        )
+        self.superuser = MyUser.objects.create_superuser(
+            username='adminUser',
+            password='adminPassword',
+        )
+        self.help_request = HelpRequest.objects.create(
+            subject='request1',
+            text='text1',
+            priority=PriorityChoices.HIGH,
+            requester=self.user,
+            status=StatusChoices.ACTIVE,
+        )
+
+    def test_approve_is_a_single_update(self):
+        with CaptureQueriesContext(connection) as context:
+            outcome = transitions.apply(transitions.APPROVE, self.help_request.pk, self.superuser)
+        self.assertEqual(outcome, Outcome.DONE)
+        # Besides the UPDATE only the lookup of the requester and the previous
+        # transition, the change event and status history INSERTs and the
+        # upsert of the request counts run.
+        statements = [query['sql'].split()[0] for query in context.captured_queries]
+        self.assertEqual(
+            [statement for statement in statements if statement not in ('SAVEPOINT', 'RELEASE')],
+            ['UPDATE', 'SELECT', 'INSERT', 'INSERT', 'INSERT'],
+        )
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.status, StatusChoices.APPROVED)
+
+    def test_second_transition_conflicts(self):
+        transitions.apply(transitions.APPROVE, self.help_request.pk, self.superuser)
+        outcome = transitions.apply(transitions.DECLINE, self.help_request.pk, self.superuser, comment='late')
+        self.assertEqual(outcome, Outcome.CONFLICT)
+        self.assertFalse(DeclinedRequest.objects.exists())
+
+    def test_own_request_is_forbidden(self):
+        own = HelpRequest.objects.create(
+            subject='own',
+            text='text',
+            priority=PriorityChoices.LOW,
+            requester=self.superuser,
+        )
+        outcome = transitions.apply(transitions.APPROVE, own.pk, self.superuser)
+        self.assertEqual(outcome, Outcome.FORBIDDEN)
+        own.refresh_from_db()
+        self.assertEqual(own.status, StatusChoices.ACTIVE)
+
+    def test_missing_request(self):
+        outcome = transitions.apply(transitions.APPROVE, self.help_request.pk + 100, self.superuser)
+        self.assertEqual(outcome, Outcome.NOT_FOUND)
+
+    def test_decline_and_resend_review_maintain_reason(self):
+        outcome = transitions.apply(transitions.DECLINE, self.help_request.pk, self.superuser, comment='Reason')
+        self.assertEqual(outcome, Outcome.DONE)
+        self.assertEqual(DeclinedRequest.objects.get(declined_request=self.help_request).comment, 'Reason')
+
+        outcome = transitions.apply(transitions.RESEND_REVIEW, self.help_request.pk, self.superuser)
+        self.assertEqual(outcome, Outcome.FORBIDDEN)
+
+        outcome = transitions.apply(transitions.RESEND_REVIEW, self.help_request.pk, self.user)
+        self.assertEqual(outcome, Outcome.DONE)
+        self.assertFalse(DeclinedRequest.objects.exists())
+        self.help_request.refresh_from_db()
+        self.assertEqual(self.help_request.status, StatusChoices.FOR_RESTORATION)
+
+
+class BulkTransitionsTest(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(
+            username='testUser',
+            password='testPassword',
+        )
+        self.superuser = MyUser.objects.create_superuser(
+            username='adminUser',
+            password='adminPassword',
+        )
+        self.active = [
+            HelpRequest.objects.create(
+                subject=f'request{i}',
+                text='text',
+                priority=PriorityChoices.LOW,
+                requester=self.user,
+                status=StatusChoices.ACTIVE,
+            ).pk
+            for i in range(5)
+        ]
+        self.own = HelpRequest.objects.create(
+            subject='own',
+            text='text',
+            priority=PriorityChoices.LOW,
+            requester=self.superuser,
+        ).pk
+        self.completed = HelpRequest.objects.create(
+            subject='done',
+            text='text',
+            priority=PriorityChoices.LOW,
+            requester=self.user,
+            status=StatusChoices.COMPLETED,
+        ).pk
+
+    def test_per_id_outcomes(self):
+        missing = self.completed + 100
+        outcomes = transitions.apply_bulk(
+            transitions.APPROVE, self.active + [self.own, self.completed, missing], self.superuser,
+        )
+        self.assertEqual(outcomes, {
+            **dict.fromkeys(self.active, Outcome.DONE),
+            self.own: Outcome.FORBIDDEN,
+            self.completed: Outcome.CONFLICT,
+            missing: Outcome.NOT_FOUND,
+        })
+        self.assertEqual(
+            HelpRequest.objects.filter(status=StatusChoices.APPROVED).count(), len(self.active),
+        )
+
+    def test_query_count_does_not_grow_with_ids(self):
+        with CaptureQueriesContext(connection) as context:
+            transitions.apply_bulk(transitions.APPROVE, self.active, self.superuser)
+        # SAVEPOINT/RELEASE, locking SELECT, UPDATE, the requester lookup, the
+        # change events and status history INSERTs and the counts upsert.
+        self.assertLessEqual(len(context.captured_queries), 8)
+
+    def test_decline_writes_reasons(self):
+        comments = {pk: f'reason {pk}' for pk in self.active}
+        transitions.apply_bulk(transitions.DECLINE, self.active, self.superuser, comments=comments)
+        self.assertEqual(
+            dict(DeclinedRequest.objects.values_list('declined_request_id', 'comment')), comments,
+        )
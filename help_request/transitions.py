@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import HelpRequest, StatusChoices, DeclinedRequest
+from .signals import status_changed
+
+
+class Outcome:
+    DONE = "done"
+    NOT_FOUND = "not found"
+    FORBIDDEN = "forbidden"
+    CONFLICT = "conflict"
+
+
+class Transition:
+    def __init__(self, name, sources, target, requester_only=False):
+        self.name = name
+        self.sources = sources
+        self.target = target
+        # Admin transitions may never touch the admin's own request; the
+        # requester-only ones may only touch it.
+        self.requester_only = requester_only
+
+    def __repr__(self):
+        return f"<Transition {self.name}: {', '.join(self.sources)} -> {self.target}>"
+
+    def allowed_for(self, user):
+        queryset = HelpRequest.objects.filter(status__in=self.sources)
+        if self.requester_only:
+            return queryset.filter(requester=user)
+        return queryset.exclude(requester=user)
+
+    def is_actor(self, user, requester_id):
+        return (requester_id == user.pk) == self.requester_only
+
+
+APPROVE = Transition("approve", [StatusChoices.ACTIVE, StatusChoices.FOR_RESTORATION], StatusChoices.APPROVED)
+DECLINE = Transition("decline", [StatusChoices.ACTIVE, StatusChoices.FOR_RESTORATION], StatusChoices.DECLINED)
+START_PROCESSING = Transition("start", [StatusChoices.APPROVED], StatusChoices.IN_PROCESS)
+COMPLETE_PROCESSING = Transition("complete", [StatusChoices.IN_PROCESS], StatusChoices.COMPLETED)
+RESEND_REVIEW = Transition("resend-review", [StatusChoices.DECLINED], StatusChoices.FOR_RESTORATION,
+                           requester_only=True)
+
+TRANSITIONS = {t.name: t for t in [APPROVE, DECLINE, START_PROCESSING, COMPLETE_PROCESSING, RESEND_REVIEW]}
+
+
+def apply(transition, pk, user, comment=None):
+    """
+    Move request `pk` along `transition` with one conditional UPDATE per
+    source status, tried in order until one matches.
+
+    Status and actor rules are part of the WHERE clause, so concurrent callers
+    cannot both succeed, and the status the request leaves is known without
+    reading it. The request is only read back when nothing was updated, to
+    tell the caller why.
+    """
+    rows = transition.allowed_for(user).filter(pk=pk)
+    # The change event and any DeclinedRequest row are written with the UPDATE.
+    with transaction.atomic():
+        for previous in transition.sources:
+            if not rows.filter(status=previous).update(status=transition.target, updated_at=timezone.now()):
+                continue
+            if transition is DECLINE:
+                # bulk_create sends no post_save; status_changed below already
+                # invalidates everything the new reason could affect.
+                DeclinedRequest.objects.bulk_create([DeclinedRequest(declined_request_id=pk, comment=comment)])
+            elif transition is RESEND_REVIEW:
+                DeclinedRequest.objects.filter(declined_request_id=pk).delete()
+            status_changed.send(
+                sender=HelpRequest, previous={pk: previous}, transition=transition, user=user,
+                comments={pk: comment} if comment else None,
+            )
+            return Outcome.DONE
+    return explain_failure(transition, pk, user)
+
+
+def explain_failure(transition, pk, user):
+    current = HelpRequest.objects.filter(pk=pk).values_list('requester_id', 'status').first()
+    if current is None:
+        return Outcome.NOT_FOUND
+    requester_id, _ = current
+    if not transition.is_actor(user, requester_id):
+        return Outcome.FORBIDDEN
+    return Outcome.CONFLICT
+
+
+BULK_CHUNK_SIZE = 1000
+
+
+def apply_bulk(transition, pks, user, comments=None):
+    """
+    Apply `transition` to many requests in one transaction and return `{pk: outcome}`.
+
+    Work is done set-wise per chunk of ids: the eligible rows are locked and
+    updated with two statements, and all the others are explained with a
+    single extra SELECT. For DECLINE, `comments` maps every pk to its reason.
+    """
+    pks = list(dict.fromkeys(pks))
+    outcomes = {}
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(pks), BULK_CHUNK_SIZE):
+            chunk = pks[start:start + BULK_CHUNK_SIZE]
+            previous = dict(
+                transition.allowed_for(user).filter(pk__in=chunk)
+                .select_for_update().values_list('pk', 'status')
+            )
+            eligible = list(previous)
+            if eligible:
+                HelpRequest.objects.filter(pk__in=eligible).update(status=transition.target, updated_at=now)
+                if transition is DECLINE:
+                    DeclinedRequest.objects.bulk_create([
+                        DeclinedRequest(declined_request_id=pk, comment=comments[pk]) for pk in eligible
+                    ])
+                elif transition is RESEND_REVIEW:
+                    DeclinedRequest.objects.filter(declined_request_id__in=eligible).delete()
+                status_changed.send(
+                    sender=HelpRequest, previous=previous, transition=transition, user=user, comments=comments,
+                )
+                outcomes.update(dict.fromkeys(eligible, Outcome.DONE))
+
+            rest = [pk for pk in chunk if pk not in outcomes]
+            outcomes.update(dict.fromkeys(rest, Outcome.NOT_FOUND))
+            for pk, requester_id in HelpRequest.objects.filter(pk__in=rest).values_list('pk', 'requester_id'):
+                outcomes[pk] = Outcome.CONFLICT if transition.is_actor(user, requester_id) else Outcome.FORBIDDEN
+    return {pk: outcomes[pk] for pk in pks}
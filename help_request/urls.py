@@ -1,6 +1,6 @@
 from rest_framework import routers
 from django.urls import path, include
-from . import views_django, views_django_rest
+from . import views_async, views_django, views_django_rest
 
 router = routers.SimpleRouter()
 router.register("rest", views_django_rest.RequestViewSet)
@@ -13,6 +13,24 @@ urlpatterns = [
          name='rest_active'),
     path('rest/all-admins-requests/', views_django_rest.RestAllAdminsRequests.as_view(),
          name='rest_all_requests'),
+    path('rest/bulk-transition/', views_django_rest.RestBulkTransition.as_view(),
+         name='rest_bulk_transition'),
+    path('rest/bulk-comments/', views_django_rest.RestBulkComments.as_view(),
+         name='rest_bulk_comments'),
+    path('rest/claim-next/', views_django_rest.RestClaimNext.as_view(),
+         name='rest_claim_next'),
+    path('rest/transition-stats/', views_django_rest.RestTransitionStats.as_view(),
+         name='rest_transition_stats'),
+    path('rest/dashboard/', views_django_rest.RestDashboard.as_view(),
+         name='rest_dashboard'),
+    path('rest/export/', views_django_rest.RestExport.as_view(),
+         name='rest_export'),
+    path('rest/changes/', views_django_rest.RestChanges.as_view(),
+         name='rest_changes'),
+    path('rest/cache-stats/', views_django_rest.RestResponseCacheStats.as_view(),
+         name='rest_cache_stats'),
+    path('rest/db-pool-stats/', views_django_rest.RestDatabasePoolStats.as_view(),
+         name='rest_db_pool_stats'),
     path('', include(router.urls)),
     path('rest/<int:pk>/resend-review/', views_django_rest.RestResendReviewProcessing.as_view(),
          name='rest_resend_review'),
@@ -24,9 +42,17 @@ urlpatterns = [
          name='rest_init_processing'),
     path('rest/<int:pk>/complete-processing/', views_django_rest.RestCompleteProcessing.as_view(),
          name='rest_complete_processing'),
+    path('rest/<int:pk>/claim/', views_django_rest.RestClaim.as_view(),
+         name='rest_claim'),
+    path('rest/<int:pk>/history/', views_django_rest.RestRequestHistory.as_view(),
+         name='rest_request_history'),
     path('rest/<int:pk>/comments/', views_django_rest.CommentsView.as_view(),
          name='create_comment'),
 
+    # asgi paths
+    path('stream/', views_async.RequestStreamView.as_view(),
+         name='request_stream'),
+
     # default django paths
     path('', views_django.UsersRequestListView.as_view(),
          name='users_request_list_view'),
@@ -40,8 +66,12 @@ urlpatterns = [
          name='request_detail_view'),
     path('all-requests/', views_django.AllRequestListView.as_view(),
          name='all_request_view'),
+    path('search/', views_django.SearchRequestsView.as_view(),
+         name='search_view'),
     path('requests-to-check/', views_django.ToCheckRequestsView.as_view(),
          name='request_to_check_view'),
+    path('claim-next-request/', views_django.ClaimNextRequestView.as_view(),
+         name='claim_next_request_view'),
     path('requests-for-restoration/', views_django.ForRestorationRequestsView.as_view(),
          name='requests_for_restoration_view'),
     path('request-for-restoration/<int:pk>/', views_django.AskForReviewRequestView.as_view(),
@@ -55,3 +85,23 @@ urlpatterns = [
     path('complete-processing-request/<int:pk>/', views_django.CompleteProcessingRequestView.as_view(),
          name='complete_processing_request_view'),
 ]
+
+# Under ASGI (helpdesk.urls_asgi) the read paths go to async views first;
+# they hand their other methods to the views above.
+asgi_urlpatterns = [
+    path('rest/', views_async.RequestList.as_view(),
+         name='helprequest-list'),
+    path('rest/<int:pk>/', views_async.RequestDetail.as_view(),
+         name='helprequest-detail'),
+    path('rest/<int:pk>/comments/', views_async.Comments.as_view(),
+         name='create_comment'),
+    path('rest/active/', views_async.CachedList.as_view(view_class=views_django_rest.RestActive),
+         name='rest_active'),
+    path('rest/for-restoration/', views_async.CachedList.as_view(view_class=views_django_rest.RestForRestoration),
+         name='rest_for_restoration'),
+    path('rest/all-admins-requests/',
+         views_async.CachedList.as_view(view_class=views_django_rest.RestAllAdminsRequests),
+         name='rest_all_requests'),
+    path('rest/changes/', views_async.Changes.as_view(),
+         name='rest_changes'),
+] + urlpatterns
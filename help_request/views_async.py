@@ -0,0 +1,270 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.generic import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from comments.serializers import CommentSerializer
+from user_app.authentication import CustomTokenAuthentication
+from . import changes, response_cache, streams, views_django_rest
+from .pagination import KeysetPagination
+
+
+async def authenticate(request):
+    # API clients come with their token, browsers with their session.
+    try:
+        result = await CustomTokenAuthentication().aauthenticate(request)
+    except exceptions.AuthenticationFailed:
+        result = None
+    if result:
+        return result[0]
+    user = await sync_to_async(get_user)(request)
+    return user if user.is_authenticated else None
+
+
+def release_connections():
+    # Called before a long wait: the request's connections would otherwise stay
+    # checked out of the pool until the response ends.
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def render(data, status=200):
+    # What the JSON renderer of the DRF views sends.
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncReadView(View):
+    """
+    GET of a DRF view as a coroutine, served by the ASGI URLconf (helpdesk.urls_asgi).
+
+    `view_class` still supplies the querysets, permissions, serializers and
+    orderings, and only the reads run here, with the async ORM. Other
+    methods are handed to `view_class` itself, with `actions` for a viewset.
+    """
+    view_class = None
+    actions = None
+    action = None
+    replica_reads = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # As for DRF views; the view that handles unsafe methods checks CSRF.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            sync_view = self.view_class.as_view(self.actions) if self.actions else self.view_class.as_view()
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        request = Request(request)
+        view = self.view_class(request=request, args=args, kwargs=kwargs, format_kwarg=None, headers={})
+        view.action = self.action
+        try:
+            result = await CustomTokenAuthentication().aauthenticate(request)
+            request.user, request.auth = result or (AnonymousUser(), None)
+            self.check_permissions(view, request)
+            return await self.get(view, request)
+        except (exceptions.APIException, Http404) as exc:
+            return self.handle_exception(exc, request)
+
+    def check_permissions(self, view, request, obj=None):
+        for permission in view.get_permissions():
+            if obj is None:
+                allowed = permission.has_permission(request, view)
+            else:
+                allowed = permission.has_object_permission(request, view, obj)
+            if not allowed:
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def handle_exception(self, exc, request):
+        # The answers of DRF's default exception handler.
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound()
+        response = render(
+            exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}, exc.status_code,
+        )
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response['WWW-Authenticate'] = CustomTokenAuthentication().authenticate_header(request)
+        return response
+
+    async def get(self, view, request):
+        raise NotImplementedError
+
+
+class CachedList(AsyncReadView):
+    """A list of a CachedListMixin view, sharing its cache entries."""
+    action = 'list'
+
+    async def get(self, view, request):
+        async def build():
+            page = await view.paginator.apaginate_queryset(view.get_queryset(), request, view=view)
+            return view.paginator.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+        return render(await response_cache.acached(
+            type(view).__name__, view.get_cache_scope(), request, build, view.cache_vary_on_user,
+        ))
+
+
+class RequestList(CachedList):
+    view_class = views_django_rest.RequestViewSet
+    actions = {'get': 'list', 'post': 'create'}
+
+    async def get(self, view, request):
+        async def build():
+            return view.validators_from(await view.get_queryset().aaggregate(**view.list_aggregates()))
+
+        validators = await response_cache.acached(
+            f'{type(view).__name__}:validators', view.get_cache_scope(), request, build,
+        )
+        response = validators.precondition_response(request)
+        if response is None:
+            response = await super().get(view, request)
+        return validators.apply(response)
+
+
+class RequestDetail(AsyncReadView):
+    view_class = views_django_rest.RequestViewSet
+    actions = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+    action = 'retrieve'
+
+    async def get(self, view, request):
+        # One query: the validators come from the row being served.
+        help_request = await view.get_queryset().filter(pk=view.kwargs['pk']).afirst()
+        if help_request is None:
+            raise Http404
+        self.check_permissions(view, request, help_request)
+        validators = view.validators_for(
+            help_request.pk, help_request.updated_at, help_request.comment_count, help_request.last_activity_at,
+        )
+        response = validators.precondition_response(request)
+        if response is None:
+            response = render(view.get_serializer(help_request).data)
+        return validators.apply(response)
+
+
+class Comments(AsyncReadView):
+    view_class = views_django_rest.CommentsView
+
+    async def get(self, view, request):
+        help_request = await view.help_requests.filter(pk=view.kwargs['pk']).afirst()
+        if help_request is None:
+            raise Http404
+        if not view.can_read(help_request):
+            return render({"error": view.forbidden_message}, 403)
+
+        validators = view.validators_for(help_request)
+        response = validators.precondition_response(request)
+        if response is None:
+            anchor = view.anchor_query(help_request)
+            if anchor is not None:
+                anchor = view.checked_anchor(await anchor.afirst())
+            paginator = KeysetPagination()
+            page = await paginator.apaginate_queryset(view.get_queryset(help_request, anchor), request, view=view)
+            response = render(paginator.get_paginated_response(CommentSerializer(page, many=True).data).data)
+        return validators.apply(response)
+
+
+class Changes(AsyncReadView):
+    """
+    The changes feed, which also answers long polls: with `wait=<seconds>` an
+    empty batch is held back until something the user can see changes.
+    """
+    view_class = views_django_rest.RestChanges
+    replica_reads = False
+
+    async def get(self, view, request):
+        try:
+            since, limit, wait = view.feed_params(request.query_params)
+        except ValueError as error:
+            return render({"error": str(error)}, 400)
+
+        deadline = time.monotonic() + wait
+        while True:
+            seen = streams.watcher.latest
+            events, has_more = await changes.achanges_since(request.user, since, limit)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                break
+            await sync_to_async(release_connections)()
+            if not await streams.watcher.wait(seen, remaining):
+                break
+        cursor = events[-1].id if events else since
+        events = changes.latest_per_object(events)
+        return render(view.feed_page(cursor, has_more, events, await changes.acurrent_objects(events)))
+
+
+class RequestStreamView(View):
+    """
+    Server-sent events for status changes and new comments on the requests a user can see.
+
+    `?request=<pk>` narrows the stream to one request. A client reconnecting
+    with `Last-Event-ID` first gets what it missed. Only served under ASGI,
+    where every stream is a coroutine waiting on the process-wide broadcaster.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"error": "Streams are only served under ASGI."}, status=501)
+
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse({"error": "Authentication credentials were not provided."}, status=401)
+
+        try:
+            request_id = int(request.GET['request']) if 'request' in request.GET else None
+            last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id', 0))
+        except ValueError:
+            return JsonResponse({"error": "request and Last-Event-ID must be integers."}, status=400)
+
+        subscription = await streams.broadcaster.subscribe(user, request_id)
+        response = StreamingHttpResponse(
+            self.stream(user, subscription, last_event_id), content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Keep proxies from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, user, subscription, last_event_id):
+        deadline = time.monotonic() + settings.STREAM_MAX_SECONDS
+        try:
+            yield b'retry: 1000\n\n'
+            if last_event_id and last_event_id < subscription.cursor:
+                missed = await sync_to_async(streams.replay)(user, last_event_id, subscription.cursor)
+                if missed is None:
+                    # Too far behind; the client resyncs through the changes feed.
+                    yield streams.encode(subscription.cursor, 'reset', {})
+                    return
+                for message in missed:
+                    if subscription.wants(message):
+                        yield message.data
+
+            await sync_to_async(release_connections)()
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), min(remaining, settings.STREAM_HEARTBEAT_SECONDS),
+                    )
+                except asyncio.TimeoutError:
+                    yield b': keepalive\n\n'
+                    continue
+                if subscription.overflowed:
+                    return
+                yield message.data
+        finally:
+            streams.broadcaster.unsubscribe(subscription)
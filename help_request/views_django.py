@@ -1,12 +1,75 @@
-from django.http import HttpResponseRedirect
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, HttpResponseRedirect
 from django.views.generic import View, ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.shortcuts import get_object_or_404, render, reverse
-from .models import HelpRequest, StatusChoices, DeclinedRequest
+from . import claims, response_cache, search, transitions
+from .models import HelpRequest, StatusChoices, PriorityChoices, DeclinedRequest
+from .pagination import decode_cursor, encode_cursor, keyset_slice, row_position
 from comments.forms import CommentForm
+from comments.models import Comment
 from .forms import HelpRequestCreateForm, HelpRequestUpdateForm, DeclinedRequestForm
 
 
-class UsersRequestListView(ListView):
+class BoardListView(ListView):
+    """
+    Requests laid out as one column per priority.
+
+    Every column is its own bounded keyset page, and `?column=<priority>&cursor=`
+    returns just the next cards of one column, so the board costs three small
+    indexed queries however many requests there are.
+    """
+    template_name = 'request_list_view.html'
+    column_template_name = 'request_board_column.html'
+    context_object_name = 'requests'
+    model = HelpRequest
+    ordering = ('-created_at', '-id')
+    cache_vary_on_user = False
+    # GETs may read from a replica; see replicas.ReplicaMiddleware.
+    replica_reads = True
+
+    def get(self, request, *args, **kwargs):
+        priority = request.GET.get('column')
+        if priority is not None:
+            if priority not in dict(PriorityChoices.CHOICES):
+                raise Http404
+            column = self.cached(lambda: self.get_column(priority, request.GET.get('cursor')))
+            return render(request, self.column_template_name, {'column': column})
+
+        columns = self.cached(lambda: [self.get_column(priority) for priority, _ in PriorityChoices.CHOICES])
+        context = {
+            'columns': columns,
+            self.context_object_name: [row for column in columns for row in column['requests']],
+        }
+        return render(request, self.template_name, context)
+
+    def get_cache_scope(self):
+        return response_cache.scope_for(self.request.user)
+
+    def cached(self, build):
+        return response_cache.cached(
+            type(self).__name__, self.get_cache_scope(), self.request, build, self.cache_vary_on_user,
+        )
+
+    def get_column(self, priority, cursor=None):
+        queryset = self.get_queryset().filter(priority=priority)
+        position = None
+        if cursor:
+            try:
+                position, _ = decode_cursor(cursor, self.ordering, queryset)
+            except ValueError:
+                raise Http404
+        rows, has_more = keyset_slice(queryset, self.ordering, settings.BOARD_COLUMN_SIZE, position)
+        next_url = None
+        if has_more:
+            cursor = encode_cursor(row_position(rows[-1], self.ordering))
+            next_url = '?' + urlencode({'column': priority, 'cursor': cursor})
+        return {'priority': priority, 'requests': rows, 'next_url': next_url}
+
+
+class UsersRequestListView(BoardListView):
     template_name = 'request_list_view.html'
     context_object_name = 'requests'
     model = HelpRequest
@@ -21,8 +84,11 @@ class UsersRequestListView(ListView):
         user = self.request.user
         return self.model.objects.filter(requester=user.id)
 
+    def get_cache_scope(self):
+        return response_cache.user_scope(self.request.user.id)
+
 
-class AllRequestListView(ListView):
+class AllRequestListView(BoardListView):
     template_name = 'request_list_view.html'
     context_object_name = 'requests'
     model = HelpRequest
@@ -37,56 +103,91 @@ class AllRequestListView(ListView):
         return self.model.objects.all()
 
 
+class SearchRequestsView(View):
+    """Ranked full-text search over the requests the user can see, paged by (rank, id)."""
+    template_name = 'request_search_view.html'
+    ordering = ('-rank', '-id')
+    replica_reads = True
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return HttpResponseRedirect(reverse('user:not_authenticated_view'))
+        query = request.GET.get('q', '').strip()
+        context = {'query': query, 'requests': [], 'next_url': None}
+        if query:
+            context['requests'], context['next_url'] = self.get_page(query, request.GET.get('cursor'))
+        return render(request, self.template_name, context)
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_superuser:
+            return HelpRequest.objects.all()
+        return HelpRequest.objects.filter(requester=user)
+
+    def get_page(self, query, cursor=None):
+        queryset = search.matching(self.get_queryset(), query)
+        position = None
+        if cursor:
+            try:
+                position, _ = decode_cursor(cursor, self.ordering, queryset)
+            except ValueError:
+                raise Http404
+        rows, has_more = keyset_slice(queryset, self.ordering, settings.BOARD_COLUMN_SIZE, position)
+        next_url = None
+        if has_more:
+            next_url = '?' + urlencode({'q': query, 'cursor': encode_cursor(row_position(rows[-1], self.ordering))})
+        return rows, next_url
+
+
 class RequestDetailView(DetailView):
     model = HelpRequest
     template_name = 'request_detail_view.html'
     context_object_name = 'current_request'
+    replica_reads = True
     form = CommentForm
 
+    def get_queryset(self):
+        return self.model.objects.select_related('requester', 'declined_request')
+
     def get_object(self, queryset=None):
-        pk = self.kwargs['pk']
-        request_to_display = get_object_or_404(self.model, id=pk)
-        return request_to_display
+        return get_object_or_404(self.get_queryset(), id=self.kwargs['pk'])
 
     def get(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
             return HttpResponseRedirect(reverse('user:not_authenticated_view'))
-        if request.user.is_superuser:
-            context = {
-                self.context_object_name: self.get_object(),
-            }
-            if self.get_object().status == StatusChoices.IN_PROCESS:
-                context['form'] = CommentForm()
-            return render(request, self.template_name, context)
-        if request.user == self.get_object().requester:
-            context = {
-                self.context_object_name: self.get_object(),
-            }
-            if self.get_object().status == StatusChoices.IN_PROCESS:
-                context['form'] = CommentForm()
-            return render(request, self.template_name, context)
+        self.object = self.get_object()
+        if request.user.is_superuser or request.user.id == self.object.requester_id:
+            form = CommentForm() if self.object.status == StatusChoices.IN_PROCESS else None
+            return self.render_detail(request, form)
         url = reverse('main_view')
         return HttpResponseRedirect(url)
 
     def post(self, request, *args, **kwargs):
-        if self.get_object().status == StatusChoices.IN_PROCESS:
+        self.object = self.get_object()
+        if self.object.status == StatusChoices.IN_PROCESS:
             form = CommentForm(request.POST)
             if form.is_valid():
                 author = request.user
-                help_request = self.get_object()
-
-                form.create_comment(author=author, help_request=help_request)
+                form.create_comment(author=author, help_request=self.object)
                 url = reverse('requests:request_detail_view', kwargs={'pk': kwargs.get('pk')})
                 return HttpResponseRedirect(url)
-            else:
-                context = {
-                    self.context_object_name: self.get_object(),
-                    'form': form,
-                }
-            return render(request, self.template_name, context)
+            return self.render_detail(request, form)
         url = reverse('requests:request_detail_view', kwargs={'pk': kwargs.get('pk')})
         return HttpResponseRedirect(url)
 
+    def render_detail(self, request, form=None):
+        # Comments and their authors are loaded in one query, and only when the
+        # page is rendered.
+        prefetch_related_objects([self.object], Prefetch(
+            'comments', queryset=Comment.objects.select_related('author').order_by('created_at', 'id'),
+        ))
+        context = {
+            self.context_object_name: self.object,
+        }
+        if form is not None:
+            context['form'] = form
+        return render(request, self.template_name, context)
+
 
 class CreateRequestView(CreateView):
     model = HelpRequest
@@ -156,10 +257,11 @@ class DeleteRequestView(DeleteView):
         return reverse('main_view')
 
 
-class ToCheckRequestsView(ListView):
+class ToCheckRequestsView(BoardListView):
     template_name = 'request_list_view.html'
     context_object_name = 'requests'
     model = HelpRequest
+    cache_vary_on_user = True
 
     def get(self, request, *args, **kwargs):
         if not self.request.user.is_superuser:
@@ -171,10 +273,19 @@ class ToCheckRequestsView(ListView):
         return self.model.objects.filter(status=StatusChoices.ACTIVE).exclude(requester=self.request.user)
 
 
-class ForRestorationRequestsView(ListView):
+class ClaimNextRequestView(View):
+    def get(self, request, *args, **kwargs):
+        claim = claims.claim_next(request.user) if request.user.is_superuser else None
+        if claim is None:
+            return HttpResponseRedirect(reverse('main_view'))
+        return HttpResponseRedirect(reverse('requests:request_detail_view', kwargs={'pk': claim.pk}))
+
+
+class ForRestorationRequestsView(BoardListView):
     template_name = 'request_list_view.html'
     context_object_name = 'requests'
     model = HelpRequest
+    cache_vary_on_user = True
 
     def get(self, request, *args, **kwargs):
         if not self.request.user.is_superuser:
@@ -186,19 +297,24 @@ class ForRestorationRequestsView(ListView):
         return self.model.objects.filter(status=StatusChoices.FOR_RESTORATION).exclude(requester=self.request.user)
 
 
-class ApproveRequestView(View):
+class TransitionRequestView(View):
+    transition = None
+
     def get(self, request, *args, **kwargs):
         pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if (
-                cur_request.status == StatusChoices.ACTIVE or cur_request.status == StatusChoices.FOR_RESTORATION) and request.user.is_superuser and request.user != cur_request.requester:
-            cur_request.status = StatusChoices.APPROVED
-            cur_request.save()
+        if self.may_attempt(request.user) and transitions.apply(self.transition, pk, request.user) == transitions.Outcome.DONE:
             url = reverse('requests:request_detail_view', kwargs={'pk': pk})
             return HttpResponseRedirect(url)
         url = reverse('main_view')
         return HttpResponseRedirect(url)
 
+    def may_attempt(self, user):
+        return user.is_superuser
+
+
+class ApproveRequestView(TransitionRequestView):
+    transition = transitions.APPROVE
+
 
 class DeclineRequestView(CreateView):
     model = DeclinedRequest
@@ -207,57 +323,31 @@ class DeclineRequestView(CreateView):
 
     def get(self, request, *args, **kwargs):
         request_to_dec = get_object_or_404(HelpRequest, id=kwargs.get('pk'))
-        if request_to_dec.status not in [StatusChoices.ACTIVE, StatusChoices.FOR_RESTORATION] or (not request.user.is_superuser) or (request.user == request_to_dec.requester):
+        if request_to_dec.status not in transitions.DECLINE.sources or (not request.user.is_superuser) or (request.user == request_to_dec.requester):
             return HttpResponseRedirect(reverse('main_view'))
         return super().get(request, *args, **kwargs)
 
     def form_valid(self, form):
-        request_to_dec = get_object_or_404(HelpRequest, id=self.kwargs.get('pk'))
-
-        form.instance.declined_request = request_to_dec
-        request_to_dec.status = StatusChoices.DECLINED
-        request_to_dec.save()
-        return super().form_valid(form)
+        pk = self.kwargs.get('pk')
+        if self.request.user.is_superuser and transitions.apply(
+                transitions.DECLINE, pk, self.request.user, comment=form.cleaned_data['comment']) == transitions.Outcome.DONE:
+            return HttpResponseRedirect(self.get_success_url())
+        return HttpResponseRedirect(reverse('main_view'))
 
     def get_success_url(self):
         return reverse('requests:request_detail_view', kwargs={'pk': self.kwargs.get('pk')})
 
 
-class AskForReviewRequestView(View):
-    def get(self, request, *args, **kwargs):
-        cur_request = get_object_or_404(HelpRequest, id=kwargs.get('pk'))
-        if request.user != cur_request.requester or cur_request.status != StatusChoices.DECLINED:
-            url = reverse('main_view')
-            return HttpResponseRedirect(url)
-        declined_request = get_object_or_404(DeclinedRequest, declined_request=cur_request)
-        declined_request.delete()
-        cur_request.status = StatusChoices.FOR_RESTORATION
-        cur_request.save()
-        url = reverse('requests:request_detail_view', kwargs={'pk': self.kwargs.get('pk')})
-        return HttpResponseRedirect(url)
+class AskForReviewRequestView(TransitionRequestView):
+    transition = transitions.RESEND_REVIEW
 
+    def may_attempt(self, user):
+        return user.is_authenticated
 
-class StartProcessingRequestView(View):
-    def get(self, request, *args, **kwargs):
-        pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if cur_request.status == StatusChoices.APPROVED and request.user.is_superuser and request.user != cur_request.requester:
-            cur_request.status = StatusChoices.IN_PROCESS
-            cur_request.save()
-            url = reverse('requests:request_detail_view', kwargs={'pk': pk})
-            return HttpResponseRedirect(url)
-        url = reverse('main_view')
-        return HttpResponseRedirect(url)
 
+class StartProcessingRequestView(TransitionRequestView):
+    transition = transitions.START_PROCESSING
 
-class CompleteProcessingRequestView(View):
-    def get(self, request, *args, **kwargs):
-        pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if cur_request.status == StatusChoices.IN_PROCESS and request.user.is_superuser and request.user != cur_request.requester:
-            cur_request.status = StatusChoices.COMPLETED
-            cur_request.save()
-            url = reverse('requests:request_detail_view', kwargs={'pk': pk})
-            return HttpResponseRedirect(url)
-        url = reverse('main_view')
-        return HttpResponseRedirect(url)
+
+class CompleteProcessingRequestView(TransitionRequestView):
+    transition = transitions.COMPLETE_PROCESSING
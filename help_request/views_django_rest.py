@@ -1,20 +1,61 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Sum
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from comments.serializers import CommentSerializer
+from . import bulk_comments, changes, claims, export, history, response_cache, rollups, search, transitions
+from .conditional import Validators
 from .models import HelpRequest, StatusChoices, DeclinedRequest
+from .pagination import KeysetPagination, keyset_condition
 from .permissions import RequesterOnly
-from .serializers import RequestSerializer, DeclinedRequestSerializer
+from .serializers import (
+    RequestSerializer, DeclinedRequestSerializer, ClaimSerializer, BulkTransitionSerializer, ChangeEventSerializer,
+    StatusTransitionSerializer, TransitionStatsSerializer, ExportSerializer, BulkCommentsSerializer,
+)
 
 
-class RequestViewSet(ModelViewSet):
+class CachedListMixin:
+    # Lists are served from the response cache, keyed by endpoint, URL and the
+    # user's scope; see response_cache for how they are invalidated.
+    cache_vary_on_user = False
+    # GETs may read from a replica; see replicas.ReplicaMiddleware.
+    replica_reads = True
+
+    def get_cache_scope(self):
+        return response_cache.scope_for(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        def build():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+        data = response_cache.cached(
+            type(self).__name__, self.get_cache_scope(), request, build, self.cache_vary_on_user,
+        )
+        return Response(data)
+
+
+class RequestViewSet(CachedListMixin, ModelViewSet):
     queryset = HelpRequest.objects.all()
     serializer_class = RequestSerializer
     permission_classes = [RequesterOnly]
+    saved_validators = None
+    # ?ordering= values; the id breaks ties so every key stays unique for the keyset pages.
+    orderings = {
+        f'{sign}{field}': (f'{sign}{field}', f'{sign}id')
+        for field in ('created_at', 'last_activity_at', 'comment_count')
+        for sign in ('', '-')
+    }
 
     def get_queryset(self):
         queryset = HelpRequest.objects.all()
@@ -29,62 +70,245 @@ class RequestViewSet(ModelViewSet):
         if status_type:
             queryset = queryset.filter(status=status_type).distinct()
 
-        return queryset
-
-
-class RestAllAdminsRequests(APIView):
+        return RequestSerializer.setup_eager_loading(self.filter_activity(queryset))
+
+    def filter_activity(self, queryset):
+        params = self.request.query_params
+        filters = {}
+        for param, lookup in [('min_comments', 'comment_count__gte'), ('max_comments', 'comment_count__lte')]:
+            if param in params:
+                try:
+                    value = int(params[param])
+                except ValueError:
+                    value = -1
+                if value < 0:
+                    raise ValidationError({param: 'Must be a non-negative integer.'})
+                filters[lookup] = value
+        for param, lookup in [('active_after', 'last_activity_at__gte'), ('active_before', 'last_activity_at__lt')]:
+            if param in params:
+                try:
+                    value = parse_datetime(params[param])
+                except ValueError:
+                    value = None
+                if value is None:
+                    raise ValidationError({param: 'Must be an ISO 8601 datetime.'})
+                filters[lookup] = value
+        return queryset.filter(**filters)
+
+    @property
+    def pagination_ordering(self):
+        if self.action == 'search':
+            return ('-rank', '-id')
+        ordering = self.request.query_params.get('ordering', '-created_at')
+        if ordering not in self.orderings:
+            raise ValidationError({'ordering': f"Must be one of: {', '.join(self.orderings)}."})
+        return self.orderings[ordering]
+
+    def list(self, request, *args, **kwargs):
+        # Validators are cached under the same scope version as the pages, so
+        # the aggregate runs once per change rather than once per poll.
+        validators = response_cache.cached(
+            f'{type(self).__name__}:validators', self.get_cache_scope(), request, self.list_validators,
+        )
+        response = validators.precondition_response(request)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return validators.apply(response)
+
+    @action(detail=False)
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            page = self.paginate_queryset(search.matching(self.get_queryset(), query))
+            return self.get_paginated_response(self.get_serializer(page, many=True).data).data
+
+        data = response_cache.cached(f'{type(self).__name__}:search', self.get_cache_scope(), request, build)
+        return Response(data)
+
+    def list_validators(self):
+        return self.validators_from(self.get_queryset().aggregate(**self.list_aggregates()))
+
+    @staticmethod
+    def list_aggregates():
+        return {
+            'last_modified': Max('updated_at'), 'count': Count('id'),
+            'last_activity': Max('last_activity_at'), 'comments': Sum('comment_count'),
+        }
+
+    def validators_from(self, aggregates):
+        # No Last-Modified: deleting an older request, or two changes within a
+        # second, would leave it unchanged. The ETag has the count as well.
+        return Validators(
+            self.get_cache_scope(), aggregates['count'], aggregates['last_modified'],
+            aggregates['last_activity'], aggregates['comments'],
+        )
+
+    def object_validators(self):
+        try:
+            row = self.get_queryset().filter(pk=self.kwargs['pk']).values_list(
+                'pk', 'updated_at', 'comment_count', 'last_activity_at',
+            ).first()
+        except (TypeError, ValueError):
+            row = None
+        if row is None:
+            return None
+        return self.validators_for(*row)
+
+    @staticmethod
+    def validators_for(pk, updated_at, comment_count, last_activity_at):
+        # Comments change the counters but not updated_at.
+        return Validators(
+            pk, updated_at, comment_count, last_activity_at, last_modified=max(updated_at, last_activity_at),
+        )
+
+    def lock_object(self):
+        try:
+            list(HelpRequest.objects.select_for_update().filter(pk=self.kwargs['pk']).values_list('pk'))
+        except (TypeError, ValueError):
+            pass
+
+    def conditional(self, handler, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return self.checked(handler, request, *args, **kwargs)
+        # The row stays locked from the precondition check to the write, so
+        # a concurrent update cannot land in between and be overwritten.
+        with transaction.atomic():
+            self.lock_object()
+            return self.checked(handler, request, *args, **kwargs)
+
+    def checked(self, handler, request, *args, **kwargs):
+        validators = self.object_validators()
+        if validators is None:
+            # Missing or not visible; the handler answers with the right error.
+            return handler(request, *args, **kwargs)
+        response = validators.precondition_response(request)
+        if response is not None:
+            return validators.apply(response)
+        response = handler(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            return validators.apply(response)
+        if self.saved_validators is not None:
+            return self.saved_validators.apply(response)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self.conditional(super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return self.conditional(super().destroy, request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        self.saved_validators = self.validators_for(
+            instance.pk, instance.updated_at, instance.comment_count, instance.last_activity_at,
+        )
+
+
+class RestAllAdminsRequests(CachedListMixin, ListAPIView):
     permission_classes = [IsAdminUser]
+    serializer_class = RequestSerializer
 
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = RequestSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_cache_scope(self):
+        return response_cache.user_scope(self.request.user.pk)
 
     def get_queryset(self):
-        return HelpRequest.objects.filter(requester=self.request.user)
+        return RequestSerializer.setup_eager_loading(HelpRequest.objects.filter(requester=self.request.user))
 
 
-class RestForRestoration(APIView):
+class RestForRestoration(CachedListMixin, ListAPIView):
     permission_classes = [IsAdminUser]
-
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = RequestSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer_class = RequestSerializer
 
     def get_queryset(self):
-        return HelpRequest.objects.filter(status=StatusChoices.FOR_RESTORATION)
+        return RequestSerializer.setup_eager_loading(HelpRequest.objects.filter(status=StatusChoices.FOR_RESTORATION))
 
 
-class RestActive(APIView):
+class RestActive(CachedListMixin, ListAPIView):
     permission_classes = [IsAdminUser]
-
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = RequestSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer_class = RequestSerializer
 
     def get_queryset(self):
-        return HelpRequest.objects.filter(status=StatusChoices.ACTIVE)
+        return RequestSerializer.setup_eager_loading(HelpRequest.objects.filter(status=StatusChoices.ACTIVE))
 
 
 
 class CommentsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
+    # ?ordering= values: oldest first (the default) for archivers, newest first for threads.
+    orderings = {
+        'created_at': ('created_at', 'id'),
+        '-created_at': ('-created_at', '-id'),
+    }
+    forbidden_message = "Cannot check this help request."
+    invalid_after_message = "Must be the id of a comment of this request."
+    # The request is read once, with just what the visibility check and the
+    # validators need; its counters stand in for an aggregate.
+    help_requests = HelpRequest.objects.only('requester_id', 'comment_count', 'last_activity_at')
+
+    @property
+    def pagination_ordering(self):
+        ordering = self.request.query_params.get('ordering', 'created_at')
+        if ordering not in self.orderings:
+            raise ValidationError({'ordering': f"Must be one of: {', '.join(self.orderings)}."})
+        if 'after' in self.request.query_params and ordering != 'created_at':
+            raise ValidationError({'after': 'Comments after another one are listed oldest first.'})
+        return self.orderings[ordering]
 
     def get(self, request, *args, **kwargs):
-        help_request = get_object_or_404(HelpRequest, pk=self.kwargs.get('pk'))
-        if not request.user.is_superuser and request.user != help_request.requester:
-            return Response({"error": "Cannot check this help request."}, status=status.HTTP_403_FORBIDDEN)
-
-        queryset = self.get_queryset()
-        serializer = CommentSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-    def get_queryset(self):
-        help_request = get_object_or_404(HelpRequest, pk=self.kwargs.get('pk'))
-        if self.request.user == help_request.requester or self.request.user.is_superuser:
-            return help_request.comments.all()
+        help_request = get_object_or_404(self.help_requests, pk=self.kwargs.get('pk'))
+        if not self.can_read(help_request):
+            return Response({"error": self.forbidden_message}, status=status.HTTP_403_FORBIDDEN)
+
+        validators = self.validators_for(help_request)
+        response = validators.precondition_response(request)
+        if response is None:
+            anchor = self.anchor_query(help_request)
+            if anchor is not None:
+                anchor = self.checked_anchor(anchor.first())
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(self.get_queryset(help_request, anchor), request, view=self)
+            serializer = CommentSerializer(page, many=True)
+            response = paginator.get_paginated_response(serializer.data)
+        return validators.apply(response)
+
+    def can_read(self, help_request):
+        return self.request.user.is_superuser or self.request.user.pk == help_request.requester_id
+
+    @staticmethod
+    def validators_for(help_request):
+        # Like the request list, an ETag only: deleting a comment leaves
+        # last_activity_at as it was.
+        return Validators(help_request.pk, help_request.comment_count, help_request.last_activity_at)
+
+    def anchor_query(self, help_request):
+        # Tail mode: only the comments that came after comment `after`, whose
+        # key this looks up.
+        after = self.request.query_params.get('after')
+        if after is None:
+            return None
+        try:
+            after = int(after)
+        except ValueError:
+            raise ValidationError({'after': self.invalid_after_message})
+        return help_request.comments.filter(pk=after).values_list('created_at', 'id')
+
+    def checked_anchor(self, anchor):
+        if anchor is None:
+            raise ValidationError({'after': self.invalid_after_message})
+        return anchor
+
+    def get_queryset(self, help_request, anchor=None):
+        comments = help_request.comments.all()
+        if anchor is not None:
+            comments = comments.filter(keyset_condition(('created_at', 'id'), anchor))
+        return CommentSerializer.setup_eager_loading(comments)
 
     def post(self, request, pk):
         help_request = get_object_or_404(HelpRequest, pk=pk)
@@ -99,105 +323,243 @@ class CommentsView(APIView):
         return Response({"error": "Cannot add comments to this request."}, status=status.HTTP_403_FORBIDDEN)
 
 
-class RestApprove(APIView):
+class RestBulkComments(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BulkCommentsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = [(item['help_request'], item['message']) for item in serializer.validated_data['comments']]
+        results = [
+            {"help_request": pk, "outcome": outcome, "id": comment.pk if comment else None}
+            for (pk, _), (outcome, comment) in zip(items, bulk_comments.create_bulk(items, request.user))
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class RestRequestHistory(APIView):
+    permission_classes = [IsAuthenticated]
+    replica_reads = True
+    pagination_ordering = ('created_at', 'id')
+
+    def get(self, request, pk):
+        help_request = get_object_or_404(HelpRequest, pk=pk)
+        if not request.user.is_superuser and request.user != help_request.requester:
+            return Response({"error": "Cannot check this help request."}, status=status.HTTP_403_FORBIDDEN)
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(history.timeline(pk), request, view=self)
+        serializer = StatusTransitionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class RestTransitionStats(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request, *args, **kwargs):
-        pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if request.user == cur_request.requester:
-            return Response({"error": "You cannot change status on yours request."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = TransitionStatsSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": history.transition_stats(**serializer.validated_data)}, status=status.HTTP_200_OK)
+
+
+class RestExport(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        serializer = ExportSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        export_format, compress = params['type'], params['gzip']
+        requests = export.requests_to_export(params.get('since'), params.get('until'), params.get('status'))
+
+        filename = f'helpdesk.{export_format}' + ('.gz' if compress else '')
+        response = StreamingHttpResponse(
+            export.stream(requests, export_format, compress),
+            content_type='application/gzip' if compress else export.FORMATS[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-        if cur_request.status in [StatusChoices.ACTIVE, StatusChoices.FOR_RESTORATION]:
-            cur_request.status = StatusChoices.APPROVED
-            cur_request.save()
 
+class RestTransitionView(APIView):
+    permission_classes = [IsAdminUser]
+    transition = None
+    forbidden_message = "You cannot change status on yours request."
+    conflict_message = None
+
+    def get(self, request, *args, **kwargs):
+        pk = kwargs.get('pk')
+        outcome = transitions.apply(self.transition, pk, request.user)
+        if outcome == transitions.Outcome.DONE:
+            cur_request = RequestSerializer.setup_eager_loading(HelpRequest.objects.all()).get(pk=pk)
             serializer = RequestSerializer(instance=cur_request)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response({"error": "This request cannot be approved."}, status=status.HTTP_400_BAD_REQUEST)
+        return self.failure_response(outcome)
 
+    def failure_response(self, outcome):
+        if outcome == transitions.Outcome.NOT_FOUND:
+            raise Http404
+        if outcome == transitions.Outcome.FORBIDDEN:
+            return Response({"error": self.forbidden_message}, status=status.HTTP_403_FORBIDDEN)
+        return Response({"error": self.conflict_message}, status=status.HTTP_400_BAD_REQUEST)
 
-class RestDecline(APIView):
-    permission_classes = [IsAdminUser]
+
+class RestApprove(RestTransitionView):
+    transition = transitions.APPROVE
+    conflict_message = "This request cannot be approved."
+
+
+class RestDecline(RestTransitionView):
+    transition = transitions.DECLINE
+    conflict_message = "Cannot decline this request."
 
     def get(self, request, *args, **kwargs):
         pk = kwargs.get('pk')
         cur_request = get_object_or_404(HelpRequest, id=pk)
         if request.user == cur_request.requester:
-            return Response({"error": "You cannot change status on yours request."}, status=status.HTTP_403_FORBIDDEN)
+            return Response({"error": self.forbidden_message}, status=status.HTTP_403_FORBIDDEN)
         serializer = RequestSerializer(instance=cur_request)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, pk):
-        cur_request = get_object_or_404(HelpRequest, pk=pk)
-        if request.user == cur_request.requester:
-            return Response({"error": "You cannot change status on yours request."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = DeclinedRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        if cur_request.status == StatusChoices.ACTIVE:
-            serializer = DeclinedRequestSerializer(data=request.data)
+        outcome = transitions.apply(self.transition, pk, request.user, comment=serializer.validated_data['comment'])
+        if outcome == transitions.Outcome.DONE:
+            declined = DeclinedRequest.objects.select_related('declined_request__requester').get(declined_request_id=pk)
+            return Response(DeclinedRequestSerializer(declined).data, status=status.HTTP_201_CREATED)
+        return self.failure_response(outcome)
 
-            if serializer.is_valid():
-                serializer.save(declined_request=cur_request)
-                cur_request.status = StatusChoices.DECLINED
-                cur_request.save()
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return Response({"error": "Cannot decline this request."}, status=status.HTTP_400_BAD_REQUEST)
+
+class RestStartProcessing(RestTransitionView):
+    transition = transitions.START_PROCESSING
+    conflict_message = "Cannot initiate processing for this request."
 
 
-class RestStartProcessing(APIView):
+class RestCompleteProcessing(RestTransitionView):
+    transition = transitions.COMPLETE_PROCESSING
+    conflict_message = "Cannot finish processing for this request."
+
+
+class RestResendReviewProcessing(RestTransitionView):
+    permission_classes = [IsAuthenticated]
+    transition = transitions.RESEND_REVIEW
+    forbidden_message = "You cannot resend review, because you are not a reviewer."
+    conflict_message = "Cannot send this request for restoration."
+
+
+class RestBulkTransition(APIView):
     permission_classes = [IsAdminUser]
 
-    def get(self, request, *args, **kwargs):
-        pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if request.user == cur_request.requester:
-            return Response({"error": "You cannot change status on yours request."}, status=status.HTTP_403_FORBIDDEN)
+    def post(self, request, *args, **kwargs):
+        serializer = BulkTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        if cur_request.status == StatusChoices.APPROVED:
-            cur_request.status = StatusChoices.IN_PROCESS
-            cur_request.save()
+        data = serializer.validated_data
+        outcomes = transitions.apply_bulk(data['transition'], data['ids'], request.user, comments=data.get('comments'))
+        results = [{"id": pk, "outcome": outcome} for pk, outcome in outcomes.items()]
+        return Response({"results": results}, status=status.HTTP_200_OK)
 
-            serializer = RequestSerializer(instance=cur_request)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response({"error": "Cannot initiate processing for this request."},
-                        status=status.HTTP_400_BAD_REQUEST)
+
+class RestClaimNext(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        claim = claims.claim_next(request.user)
+        if claim is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(ClaimSerializer(claim).data, status=status.HTTP_201_CREATED)
 
 
-class RestCompleteProcessing(APIView):
+class RestClaim(APIView):
     permission_classes = [IsAdminUser]
+    not_held_message = "You do not hold a claim on this request."
 
-    def get(self, request, *args, **kwargs):
-        pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if request.user == cur_request.requester:
-            return Response({"error": "You cannot change status on yours request."}, status=status.HTTP_403_FORBIDDEN)
+    def post(self, request, pk):
+        expires_at = claims.renew(pk, request.user)
+        if expires_at is None:
+            return Response({"error": self.not_held_message}, status=status.HTTP_409_CONFLICT)
+        return Response({"request": pk, "expires_at": expires_at}, status=status.HTTP_200_OK)
 
-        if cur_request.status == StatusChoices.IN_PROCESS:
-            cur_request.status = StatusChoices.COMPLETED
-            cur_request.save()
+    def delete(self, request, pk):
+        if not claims.release(pk, request.user):
+            return Response({"error": self.not_held_message}, status=status.HTTP_409_CONFLICT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-            serializer = RequestSerializer(instance=cur_request)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response({"error": "Cannot finish processing for this request."}, status=status.HTTP_400_BAD_REQUEST)
+
+class RestDashboard(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response(rollups.dashboard(request.user), status=status.HTTP_200_OK)
 
 
-class RestResendReviewProcessing(APIView):
+class RestChanges(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        pk = kwargs.get('pk')
-        cur_request = get_object_or_404(HelpRequest, id=pk)
-        if request.user != cur_request.requester:
-            return Response({"error": "You cannot resend review, because you are not a reviewer."},
-                            status=status.HTTP_403_FORBIDDEN)
-        if cur_request.status == StatusChoices.DECLINED:
-            declined_req = get_object_or_404(DeclinedRequest, declined_request=cur_request)
-            declined_req.delete()
-            cur_request.status = StatusChoices.FOR_RESTORATION
-            cur_request.save()
+        # wait is only honoured under ASGI, where waiting holds no thread; see views_async.Changes.
+        try:
+            since, limit, _ = self.feed_params(request.query_params)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        events, has_more = changes.changes_since(request.user, since, limit)
+        cursor = events[-1].id if events else since
+        events = changes.latest_per_object(events)
+        return Response(
+            self.feed_page(cursor, has_more, events, changes.current_objects(events)), status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def feed_params(query_params):
+        """`(since, limit, wait)` from the query string; ValueError with the message for the client if invalid."""
+        try:
+            since = int(query_params.get('since', 0))
+            limit = int(query_params.get('limit', settings.CHANGES_FEED_BATCH_SIZE))
+        except ValueError:
+            raise ValueError("since and limit must be integers.") from None
+        if since < 0 or limit < 1:
+            raise ValueError("since and limit must be positive.")
+        try:
+            wait = float(query_params.get('wait', 0))
+        except ValueError:
+            wait = -1
+        if not 0 <= wait:  # NaN included
+            raise ValueError("wait must be a number of seconds.")
+        limit = min(limit, settings.CHANGES_FEED_MAX_BATCH_SIZE)
+        return since, limit, min(wait, settings.CHANGES_FEED_MAX_WAIT_SECONDS)
+
+    @staticmethod
+    def feed_page(cursor, has_more, events, objects):
+        objects = ChangeEventSerializer.serialize_objects(objects)
+        serializer = ChangeEventSerializer(events, many=True, context={'data': objects})
+        return {
+            "cursor": cursor,
+            "has_more": has_more,
+            "results": serializer.data,
+        }
+
+
+class RestResponseCacheStats(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(response_cache.stats(), status=status.HTTP_200_OK)
 
-            serializer = RequestSerializer(instance=cur_request)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response({"error": "Cannot send this request for restoration."}, status=status.HTTP_400_BAD_REQUEST)
 
+class RestDatabasePoolStats(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            alias: connections[alias].pool_stats()
+            for alias in connections if hasattr(connections[alias], 'pool_stats')
+        }, status=status.HTTP_200_OK)
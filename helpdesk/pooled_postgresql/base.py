@@ -0,0 +1,111 @@
+"""
+PostgreSQL with a connection pool per process and set of connection
+parameters: Django's close() returns the connection to the pool and the next
+connect() takes one from it, so requests no longer pay for a new connection.
+
+Configured by the POOL entry of the database settings: SIZE, TIMEOUT,
+MAX_LIFETIME and CHECK_AFTER; see ConnectionPool.
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as BaseDatabaseCreation
+from psycopg2 import OperationalError, extensions
+
+from .pool import ConnectionPool, PoolTimeout
+
+POOL_DEFAULTS = {
+    'SIZE': 10,
+    'TIMEOUT': 5,
+    'MAX_LIFETIME': 1800,
+    'CHECK_AFTER': 30,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PostgreSQLPool(ConnectionPool):
+    def is_usable(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def reset(self, connection):
+        if connection.closed:
+            return False
+        try:
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def close(self, connection):
+        connection.close()
+
+
+def get_pool(alias, conn_params, settings_dict):
+    options = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+    key = (alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            # A pool inherited through fork() shares its sockets with the parent.
+            pool = _pools[key] = PostgreSQLPool(
+                size=options['SIZE'], timeout=options['TIMEOUT'],
+                max_lifetime=options['MAX_LIFETIME'], check_after=options['CHECK_AFTER'],
+            )
+        return pool
+
+
+def pools():
+    with _pools_lock:
+        return [(alias, pool) for (alias, _), pool in _pools.items() if pool.pid == os.getpid()]
+
+
+def close_pools():
+    for _, pool in pools():
+        pool.close_all()
+
+
+class DatabaseCreation(BaseDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would block DROP DATABASE.
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, conn_params, self.settings_dict)
+        try:
+            connection = pool.checkout(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as error:
+            raise OperationalError(str(error)) from error
+        # What the stock get_new_connection() sets for new connections.
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+        )
+        self.pool = pool
+        return connection
+
+    def pool_stats(self):
+        return get_pool(self.alias, self.get_connection_params(), self.settings_dict).stats()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.in_atomic_block:
+            # Django keeps referring to a connection closed inside atomic().
+            self.pool.discard(self.connection)
+        else:
+            self.pool.checkin(self.connection)
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from collections import Counter
+
+STATS = ('checkouts', 'waits', 'timeouts', 'opened', 'health_checks', 'discarded_expired', 'discarded_unusable')
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of open database connections for one process.
+
+    `checkout(connect)` hands out the most recently returned idle connection,
+    opens a new one with `connect()` while fewer than `size` are open, and
+    otherwise waits up to `timeout` seconds for one to be returned.
+    Connections older than `max_lifetime` seconds are replaced instead of
+    reused, and those idle for more than `check_after` seconds are checked
+    with `is_usable()` first.
+    Subclasses provide `is_usable()`, `reset()` and `close()`.
+    """
+
+    def __init__(self, size, timeout, max_lifetime, check_after):
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.pid = os.getpid()
+        self._condition = threading.Condition()
+        # (connection, opened_at, returned_at), most recently returned last.
+        self._idle = []
+        # opened_at of every open connection, idle or in use.
+        self._opened_at = {}
+        # Slots taken by connections being opened.
+        self._reserved = 0
+        self._stats = Counter()
+
+    def is_usable(self, connection):
+        raise NotImplementedError
+
+    def reset(self, connection):
+        """Make a returned connection ready for its next user; False if it can't be."""
+        raise NotImplementedError
+
+    def close(self, connection):
+        raise NotImplementedError
+
+    def checkout(self, connect):
+        deadline = None
+        with self._condition:
+            self._stats['checkouts'] += 1
+            while not self._idle and len(self._opened_at) + self._reserved >= self.size:
+                if deadline is None:
+                    self._stats['waits'] += 1
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(f'No database connection was free within {self.timeout}s.')
+                self._condition.wait(remaining)
+            if not self._idle:
+                self._reserved += 1
+                connection = None
+            else:
+                connection, opened_at, returned_at = self._idle.pop()
+
+        if connection is None:
+            return self._open(connect)
+        now = time.monotonic()
+        if now - opened_at > self.max_lifetime:
+            return self._replace(connection, 'expired', connect)
+        if now - returned_at > self.check_after:
+            self._stats['health_checks'] += 1
+            if not self.is_usable(connection):
+                return self._replace(connection, 'unusable', connect)
+        return connection
+
+    def checkin(self, connection):
+        if connection not in self._opened_at:
+            # Checked out before close_all().
+            self._close_quietly(connection)
+            return
+        if not self.reset(connection):
+            self.discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, self._opened_at[connection], time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection):
+        """Close a checked out connection instead of returning it."""
+        with self._condition:
+            self._forget(connection, 'unusable')
+            self._condition.notify()
+        self._close_quietly(connection)
+
+    def _open(self, connect):
+        # Runs with a reserved slot, which becomes the new connection's.
+        try:
+            connection = connect()
+        except BaseException:
+            with self._condition:
+                self._reserved -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._reserved -= 1
+            self._opened_at[connection] = time.monotonic()
+            self._stats['opened'] += 1
+        return connection
+
+    def _replace(self, connection, reason, connect):
+        with self._condition:
+            self._forget(connection, reason)
+            self._reserved += 1
+        self._close_quietly(connection)
+        return self._open(connect)
+
+    def _forget(self, connection, reason):
+        if self._opened_at.pop(connection, None) is not None:
+            self._stats[f'discarded_{reason}'] += 1
+
+    def _close_quietly(self, connection):
+        try:
+            self.close(connection)
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Close the idle connections; those in use are closed when they are returned."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._opened_at.clear()
+            self._condition.notify_all()
+        for connection, _, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        with self._condition:
+            stats = {
+                'size': self.size,
+                'open': len(self._opened_at),
+                'idle': len(self._idle),
+                'in_use': len(self._opened_at) - len(self._idle),
+            }
+            stats.update((name, self._stats[name]) for name in STATS)
+        return stats
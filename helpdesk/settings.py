@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ LOCAL_APPS = [
     'help_request',
     'user_app',
     'comments',
+    'benchmarks',
 ]
 
 THIRD_APPS = [
@@ -60,9 +62,11 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'help_request.replicas.ReplicaMiddleware',
 ]
 
-ROOT_URLCONF = 'helpdesk.urls'
+# helpdesk.asgi switches to helpdesk.urls_asgi, where the read paths are async views.
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'helpdesk.urls')
 
 TEMPLATES = [
     {
@@ -86,28 +90,68 @@ WSGI_APPLICATION = 'helpdesk.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# The primary comes from DATABASE_* variables. DATABASE_REPLICAS is a
+# comma-separated list of read replicas, each given by its host, or by its
+# file for SQLite; reads are only sent there by ReplicaMiddleware.
+#
+# PostgreSQL connections come from a pool per process (helpdesk.pooled_postgresql)
+# and go back to it at the end of every request (CONN_MAX_AGE 0).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
-        'NAME': 'helpdeskdb',
-        'USER': 'examuser',
-        'PASSWORD': 'pass',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'ENGINE': os.environ.get('DATABASE_ENGINE', 'helpdesk.pooled_postgresql'),
+        'NAME': os.environ.get('DATABASE_NAME', 'helpdeskdb'),
+        'USER': os.environ.get('DATABASE_USER', 'examuser'),
+        'PASSWORD': os.environ.get('DATABASE_PASSWORD', 'pass'),
+        'HOST': os.environ.get('DATABASE_HOST', 'localhost'),
+        'PORT': os.environ.get('DATABASE_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'SIZE': int(os.environ.get('DATABASE_POOL_SIZE', 10)),
+            'TIMEOUT': float(os.environ.get('DATABASE_POOL_TIMEOUT', 5)),
+            'MAX_LIFETIME': float(os.environ.get('DATABASE_POOL_MAX_LIFETIME', 1800)),
+            'CHECK_AFTER': float(os.environ.get('DATABASE_POOL_CHECK_AFTER', 30)),
+        },
+        'TEST': {
+            'NAME': os.environ.get('DATABASE_TEST_NAME', 'helpdeskdb_tests'),
+        },
     },
-    'test': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
-        'NAME': 'helpdeskdb_tests',
-        'USER': 'examuser',
-        'PASSWORD': 'pass',
-        'HOST': 'localhost',
-        'PORT': '5432',
-    }
 }
 
-TEST = {
-    'NAME': 'helpdesk_test_db',
-}
+REPLICA_SETTING = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+for number, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        REPLICA_SETTING: replica.strip(),
+        # Tests run against the primary's test database through the replica aliases too.
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['help_request.replicas.ReplicaRouter']
+
+# How long a client that wrote keeps reading from the primary.
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+# A Redis-compatible server (REDIS_URL, needs the `redis` package) shares the
+# cache between processes; without it each process caches in local memory.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Cached request lists and boards; they are also invalidated on every change.
+RESPONSE_CACHE_SECONDS = 300
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -156,7 +200,50 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'help_request.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
+PAGINATION_MAX_PAGE_SIZE = 200
+
+# Cards per priority column on the HTML request boards, per load.
+BOARD_COLUMN_SIZE = 20
+
+BULK_TRANSITION_MAX_IDS = 10000
+
+BULK_COMMENTS_MAX_ITEMS = 5000
+
+# Days of request counts on the admin dashboard.
+DASHBOARD_DAYS = 30
+
+# Longest range of days the transition stats answer in one call.
+TRANSITION_STATS_MAX_DAYS = 366
+
+# How long an admin's claim on a request of the review queue lasts unless renewed.
+CLAIM_LEASE_SECONDS = 600
+
+# Changes feed batches; events younger than the settle delay are held back
+# until transactions that took earlier ids have committed.
+CHANGES_FEED_BATCH_SIZE = 500
+CHANGES_FEED_MAX_BATCH_SIZE = 1000
+CHANGES_FEED_SETTLE_SECONDS = 1
+# Longest ?wait= of a long poll of the feed (ASGI only).
+CHANGES_FEED_MAX_WAIT_SECONDS = 30
+
+# Server-sent event streams (ASGI only). One poller per process reads the
+# change log; a stream whose client falls more than a queue behind is closed,
+# and every stream is closed after its maximum age so the client reconnects.
+STREAM_POLL_SECONDS = 1
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_QUEUE_SIZE = 100
+STREAM_MAX_SECONDS = 300
+
 TOKEN_INACTIVITY_EXPIRED_SECONDS = 60
+
+# Authenticated tokens are cached per process and in the shared cache; the
+# inactivity stamp on the token row is written at most once per touch interval.
+TOKEN_LOCAL_CACHE_SECONDS = 5
+TOKEN_LOCAL_CACHE_SIZE = 10000
+TOKEN_CACHE_SECONDS = 60
+TOKEN_TOUCH_INTERVAL_SECONDS = 15
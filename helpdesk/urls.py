@@ -21,7 +21,7 @@ from . import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api-token-auth/', rest_views.obtain_auth_token),
+    path('api-token-auth/', rest_views.obtain_auth_token, name='api_token_auth'),
     path('', views.MainView.as_view(), name='main_view'),
     path('about/', views.AboutView.as_view(), name='about_view'),
     path('', include(('user_app.urls', 'user_app'), namespace='user')),
@@ -0,0 +1,14 @@
+"""
+URL configuration under ASGI, set by helpdesk.asgi: helpdesk.urls with the
+read paths of the REST API served by async views, under the same names.
+"""
+from django.urls import path, include
+
+from help_request.urls import asgi_urlpatterns
+from . import urls
+
+urlpatterns = [
+    path('requests/', include((asgi_urlpatterns, 'help_request'), namespace='requests'))
+    if getattr(pattern, 'namespace', None) == 'requests' else pattern
+    for pattern in urls.urlpatterns
+]
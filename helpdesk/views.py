@@ -2,6 +2,8 @@ from django.http import HttpResponseRedirect
 from django.shortcuts import reverse
 from django.views.generic import TemplateView
 
+from help_request import rollups
+
 
 class MainView(TemplateView):
     template_name = 'index.html'
@@ -12,6 +14,11 @@ class MainView(TemplateView):
             return HttpResponseRedirect(url)
         return super().get(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['dashboard'] = rollups.dashboard(self.request.user)
+        return context
+
 
 class AboutView(TemplateView):
     template_name = "about.html"
@@ -1,16 +1,99 @@
-from rest_framework.authentication import TokenAuthentication
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
 from rest_framework import exceptions
 
+# Per-process layer in front of the shared cache: key digest -> (expires at, token),
+# least recently used first and capped at TOKEN_LOCAL_CACHE_SIZE entries.
+_local_tokens = OrderedDict()
+_local_tokens_lock = threading.Lock()
+
+
+def _digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _token_cache_key(key):
+    return f'auth:token:{_digest(key)}'
+
+
+def _last_seen_cache_key(key):
+    return f'auth:last-seen:{_digest(key)}'
+
+
+def _touch_lock_cache_key(key):
+    return f'auth:touch:{_digest(key)}'
+
+
+def _get_local(digest):
+    with _local_tokens_lock:
+        cached = _local_tokens.get(digest)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del _local_tokens[digest]
+            return None
+        _local_tokens.move_to_end(digest)
+        return cached[1]
+
+
+def _set_local(digest, token):
+    with _local_tokens_lock:
+        _local_tokens[digest] = (time.monotonic() + settings.TOKEN_LOCAL_CACHE_SECONDS, token)
+        _local_tokens.move_to_end(digest)
+        while len(_local_tokens) > settings.TOKEN_LOCAL_CACHE_SIZE:
+            _local_tokens.popitem(last=False)
+
+
+def evict_token(key):
+    with _local_tokens_lock:
+        _local_tokens.pop(_digest(key), None)
+    cache.delete_many([_token_cache_key(key), _last_seen_cache_key(key)])
+
+
+def purge_expired_tokens(batch_size=1000):
+    """
+    Delete expired tokens of regular users in batches and return how many were removed.
+
+    The stored `created` stamp trails the real last use by at most
+    TOKEN_TOUCH_INTERVAL_SECONDS, so only tokens older than both windows are
+    guaranteed to be expired.
+    """
+    model = CustomTokenAuthentication().get_model()
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.TOKEN_INACTIVITY_EXPIRED_SECONDS + settings.TOKEN_TOUCH_INTERVAL_SECONDS
+    )
+    expired = model.objects.filter(created__lt=cutoff, user__is_superuser=False)
+    removed = 0
+    while True:
+        keys = list(expired.values_list('key', flat=True)[:batch_size])
+        if not keys:
+            return removed
+        removed += model.objects.filter(key__in=keys).delete()[0]
+
 
 class CustomTokenAuthentication(TokenAuthentication):
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views. Requests without a token never leave
+        the event loop, and the lookups of those with one take a single hop
+        to the request's thread rather than one per cache or database call.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        return await sync_to_async(self.authenticate)(request)
+
     def authenticate_credentials(self, key):
-        model = self.get_model()
-        try:
-            token = model.objects.get(key=key)
-        except model.DoesNotExist:
-            raise exceptions.AuthenticationFailed('Invalid token.')
+        token = self.get_token(key)
 
         if not token.user.is_active:
             raise exceptions.AuthenticationFailed('User inactive or deleted.')
@@ -18,11 +101,50 @@ class CustomTokenAuthentication(TokenAuthentication):
         if not token.user.is_authenticated:
             raise exceptions.AuthenticationFailed('User is not authenticated.')
 
-        if not token.user.is_superuser and (timezone.now() - token.created).total_seconds() > settings.TOKEN_INACTIVITY_EXPIRED_SECONDS:
+        now = timezone.now()
+        if not token.user.is_superuser and (now - self.get_last_seen(token)).total_seconds() > settings.TOKEN_INACTIVITY_EXPIRED_SECONDS:
+            # Deleted rather than left for the sweeper, so that logging in
+            # again hands out a new key instead of this one.
             token.delete()
             raise exceptions.AuthenticationFailed('Token deleted due to inactivity.')
 
-        token.created = timezone.now()
-        token.save()
+        self.touch(token, now)
 
         return token.user, token
+
+    def get_token(self, key):
+        digest = _digest(key)
+        token = _get_local(digest)
+        if token is not None:
+            return token
+
+        token = cache.get(_token_cache_key(key))
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            cache.set(_token_cache_key(key), token, settings.TOKEN_CACHE_SECONDS)
+
+        _set_local(digest, token)
+        return token
+
+    def get_last_seen(self, token):
+        last_seen = cache.get(_last_seen_cache_key(token.key))
+        if last_seen is None or last_seen < token.created:
+            return token.created
+        return last_seen
+
+    def touch(self, token, now):
+        cache.set(_last_seen_cache_key(token.key), now, settings.TOKEN_INACTIVITY_EXPIRED_SECONDS)
+
+        # The stored stamp only has to stay within one touch interval of the real
+        # last use, and the lock lets a single process per interval write it.
+        interval = settings.TOKEN_TOUCH_INTERVAL_SECONDS
+        if (now - token.created).total_seconds() < interval:
+            return
+        if not cache.add(_touch_lock_cache_key(token.key), True, interval):
+            return
+        self.get_model().objects.filter(key=token.key).update(created=now)
+        token.created = now
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from user_app.authentication import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete API tokens that expired due to inactivity.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = purge_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(f'Removed {removed} expired tokens.')
@@ -1,9 +1,16 @@
 from datetime import timedelta
+from io import StringIO
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
 from django.utils import timezone
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import AuthenticationFailed
+from user_app import authentication
 from user_app.authentication import CustomTokenAuthentication
 from helpdesk import settings
 
@@ -20,6 +27,10 @@ class CustomTokenAuthenticationTest(TestCase):
         )
         self.auth = CustomTokenAuthentication()
 
+    def tearDown(self):
+        authentication._local_tokens.clear()
+        cache.clear()
+
     def test_authenticate_with_valid_token(self):
         user, token = self.auth.authenticate_credentials('testToken')
         self.assertEqual(user, self.user)
@@ -42,6 +53,112 @@ class CustomTokenAuthenticationTest(TestCase):
 
         with self.assertRaises(AuthenticationFailed):
             self.auth.authenticate_credentials('testToken')
+        self.assertFalse(Token.objects.filter(key='testToken').exists())
+
+    def test_login_after_expiry_gets_a_working_token(self):
+        self.user.set_password('testPassword')
+        self.user.save()
+        Token.objects.filter(key='testToken').update(
+            created=timezone.now() - timedelta(seconds=settings.TOKEN_INACTIVITY_EXPIRED_SECONDS + 10)
+        )
+        url = reverse('requests:helprequest-list')
+        response = self.client.get(url, HTTP_AUTHORIZATION='Token testToken')
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(reverse('api_token_auth'), {'username': 'testUser', 'password': 'testPassword'})
+        key = response.json()['token']
+        self.assertNotEqual(key, 'testToken')
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f'Token {key}').status_code, 200)
+
+    def test_cached_token_is_authenticated_without_queries(self):
+        self.auth.authenticate_credentials('testToken')
+        with CaptureQueriesContext(connection) as context:
+            user, token = self.auth.authenticate_credentials('testToken')
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(user, self.user)
+
+    @override_settings(TOKEN_LOCAL_CACHE_SIZE=2)
+    def test_local_cache_keeps_the_most_recently_used_tokens(self):
+        keys = ['testToken', 'secondToken', 'thirdToken']
+        for key in keys[1:]:
+            Token.objects.create(user=get_user_model().objects.create(username=key), key=key)
+        for key in keys:
+            self.auth.get_token(key)
+        self.auth.get_token('secondToken')
+        self.auth.get_token('testToken')
+        self.assertEqual(
+            list(authentication._local_tokens),
+            [authentication._digest('secondToken'), authentication._digest('testToken')],
+        )
+
+    @override_settings(TOKEN_LOCAL_CACHE_SECONDS=0)
+    def test_expired_local_entries_are_dropped(self):
+        self.auth.get_token('testToken')
+        digest = authentication._digest('testToken')
+        self.assertIsNone(authentication._get_local(digest))
+        self.assertNotIn(digest, authentication._local_tokens)
+
+    def test_shared_cache_serves_other_processes(self):
+        self.auth.authenticate_credentials('testToken')
+        authentication._local_tokens.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.auth.authenticate_credentials('testToken')
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_recent_token_is_not_written(self):
+        with CaptureQueriesContext(connection) as context:
+            self.auth.authenticate_credentials('testToken')
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in context.captured_queries))
+
+    def test_stale_stamp_is_written_once_per_interval(self):
+        stale = timezone.now() - timedelta(seconds=settings.TOKEN_TOUCH_INTERVAL_SECONDS + 1)
+        Token.objects.filter(key='testToken').update(created=stale)
+
+        writes = []
+        for _ in range(3):
+            # Simulate separate processes that all start from the stale row.
+            authentication._local_tokens.clear()
+            cache.delete(authentication._token_cache_key('testToken'))
+            with CaptureQueriesContext(connection) as context:
+                self.auth.authenticate_credentials('testToken')
+            writes.append(sum(q['sql'].startswith('UPDATE') for q in context.captured_queries))
+        self.assertEqual(writes, [1, 0, 0])
+
+        self.token.refresh_from_db()
+        self.assertGreater(self.token.created, stale)
+
+    def test_recent_activity_keeps_token_alive(self):
+        self.auth.authenticate_credentials('testToken')
+        expired = timezone.now() - timedelta(seconds=settings.TOKEN_INACTIVITY_EXPIRED_SECONDS + 10)
+        Token.objects.filter(key='testToken').update(created=expired)
+        authentication._local_tokens.clear()
+        cache.delete(authentication._token_cache_key('testToken'))
+
+        user, token = self.auth.authenticate_credentials('testToken')
+        self.assertEqual(user, self.user)
+
+    def test_deleted_token_is_evicted(self):
+        self.auth.authenticate_credentials('testToken')
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials('testToken')
+
 
-        with self.assertRaises(Token.DoesNotExist):
-            Token.objects.get(key='testToken')
+class PurgeExpiredTokensTest(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create(username='testUser', password='testPassword')
+        self.other_user = user_model.objects.create(username='otherUser', password='testPassword')
+        self.superuser = user_model.objects.create(username='adminUser', password='adminPassword', is_superuser=True)
+        long_ago = timezone.now() - timedelta(days=1)
+        self.expired = Token.objects.create(user=self.user, key='expiredToken')
+        self.admin_token = Token.objects.create(user=self.superuser, key='adminToken')
+        self.fresh = Token.objects.create(user=self.other_user, key='freshToken')
+        Token.objects.filter(key__in=['expiredToken', 'adminToken']).update(created=long_ago)
+
+    def test_purge_removes_only_expired_regular_tokens(self):
+        call_command('purge_expired_tokens', batch_size=1, stdout=StringIO())
+        self.assertEqual(
+            set(Token.objects.values_list('key', flat=True)),
+            {'adminToken', 'freshToken'},
+        )